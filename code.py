@@ -17,12 +17,12 @@ All text above must be included in any redistribution.
 #pylint:disable=useless-super-delegation, too-many-locals
 
 import time
-import json
 from secrets import secrets
 import board
 from adafruit_pyportal import PyPortal
 from adafruit_bitmap_font import bitmap_font
 from adafruit_display_text.label import Label
+from adafruit_touchscreen import TouchSampler
 from digitalio import DigitalInOut, Direction, Pull
 import analogio
 import displayio
@@ -32,7 +32,7 @@ import adafruit_logging as logging
 DATA_SOURCE = 'http://api.openweathermap.org/data/2.5/weather?id='+secrets['city_id']
 DATA_SOURCE += '&appid='+secrets['openweather_token']
 # You'll need to get a token from openweather.org, looks like 'b6907d289e10d714a6e88b30761fae22'
-DATA_LOCATION = []
+DATA_LOCATION = (['weather', 0, 'icon'], ['main', 'temp'])
 
 ####################
 # setup hardware
@@ -40,6 +40,8 @@ DATA_LOCATION = []
 pyportal = PyPortal(url=DATA_SOURCE,
                     json_path=DATA_LOCATION,
                     status_neopixel=board.NEOPIXEL)
+# the main loop refreshes the display once a pass, with pyportal.frames.update()
+pyportal.frames.deferred = True
 
 light = analogio.AnalogIn(board.LIGHT)
 
@@ -47,6 +49,8 @@ snooze_button = DigitalInOut(board.D3)
 snooze_button.direction = Direction.INPUT
 snooze_button.pull = Pull.UP
 
+touch = TouchSampler(pyportal.touchscreen, rate=30)
+
 ####################
 # variables
 
@@ -69,8 +73,6 @@ mugsy_background = 'mugsy_background.bmp'
 
 # weather support
 
-icon_file = None
-icon_sprite = None
 celcius = secrets['celcius']
 
 # display/data refresh timers
@@ -90,13 +92,13 @@ low_light = False
 ####################
 # Load the fonts
 
-time_font = bitmap_font.load_font('/fonts/Anton-Regular-104.bdf')
+time_font = bitmap_font.load_font('/fonts/Anton-Regular-104.bbf')
 time_font.load_glyphs(b'0123456789:') # pre-load glyphs for fast printing
 
-alarm_font = bitmap_font.load_font('/fonts/Helvetica-Bold-36.bdf')
+alarm_font = bitmap_font.load_font('/fonts/Helvetica-Bold-36.bbf')
 alarm_font.load_glyphs(b'0123456789:')
 
-temperature_font = bitmap_font.load_font('/fonts/Arial-16.bdf')
+temperature_font = bitmap_font.load_font('/fonts/Arial-16.bbf')
 temperature_font.load_glyphs(b'0123456789CF')
 
 ####################
@@ -131,7 +133,97 @@ def touch_in_button(t, b):
     return in_horizontal and in_vertical
 
 
-touched = False
+####################
+# scheduling
+
+class Scheduler(object):
+    """Runs jobs when they are due and watches inputs for changes, sleeping in between
+    rather than spinning. Inputs are polled every poll_interval seconds while any are
+    watched, which bounds how long a button press waits to be noticed."""
+
+    def __init__(self, poll_interval=0.05):
+        self.poll_interval = poll_interval
+        self._jobs = []               # [deadline, sequence, interval, callback, name]
+        self._watchers = []           # [read, last value, callback]
+        self._sequence = 0
+        self._generation = 0
+
+
+    def every(self, name, interval, callback, first=None):
+        """Call callback(now) every interval seconds, starting at monotonic time first
+        (default: as soon as possible). Replaces any job with the same name."""
+        self.cancel(name)
+        if first is None:
+            first = time.monotonic()
+        self._sequence += 1
+        self._jobs.append([first, self._sequence, interval, callback, name])
+
+
+    def at(self, name, when, callback):
+        """Call callback(now) once, at monotonic time when."""
+        self.every(name, None, callback, first=when)
+
+
+    def reschedule(self, name, when):
+        """Move the next run of the named job to monotonic time when."""
+        for job in self._jobs:
+            if job[4] == name:
+                job[0] = when
+
+
+    def cancel(self, name):
+        """Remove the named job, if there is one."""
+        self._jobs = [job for job in self._jobs if job[4] != name]
+
+
+    def watch(self, read, callback):
+        """Call callback(value, now) whenever read() returns something different."""
+        self._watchers.append([read, read(), callback])
+
+
+    def clear(self):
+        """Remove all jobs and watchers."""
+        self._jobs = []
+        self._watchers = []
+        self._generation += 1
+
+
+    def run_once(self, max_delay=None):
+        """Handle any input changes and due jobs, then sleep until there's more to do,
+        or for at most max_delay seconds."""
+        generation = self._generation
+        now = time.monotonic()
+        for watcher in self._watchers:
+            value = watcher[0]()
+            if value != watcher[1]:
+                watcher[1] = value
+                watcher[2](value, now)
+                if generation != self._generation:
+                    return
+
+        due = [job for job in self._jobs if job[0] <= now]
+        due.sort(key=lambda job: (job[0], job[1]))
+        for job in due:
+            if job[2] is None:
+                self.cancel(job[4])
+            else:
+                job[0] = now + job[2]
+            job[3](now)
+            if generation != self._generation:
+                return
+
+        delay = self.poll_interval
+        if self._jobs:
+            delay = min(job[0] for job in self._jobs) - time.monotonic()
+            if self._watchers:
+                delay = min(delay, self.poll_interval)
+        if max_delay is not None:
+            delay = min(delay, max_delay)
+        if delay > 0:
+            time.sleep(delay)
+
+
+scheduler = Scheduler()
 
 ####################
 # states
@@ -149,25 +241,21 @@ class State(object):
         return ''
 
 
-    def tick(self, now):
-        """Handle a tick: one pass through the main loop"""
-        pass
-
-
     #pylint:disable=unused-argument
-    def touch(self, t, touched):
+    def touch(self, event):
         """Handle a touch event.
-        :param (x, y, z) - t: the touch location/strength"""
-        return bool(t)
+        :param TouchEvent event: what happened, and where"""
+        pass
 
 
     def enter(self):
-        """Just after the state is entered."""
+        """Just after the state is entered. Schedule the state's jobs here."""
         pass
 
 
     def exit(self):
         """Just before the state exits."""
+        scheduler.clear()
         clear_splash()
 
 
@@ -193,12 +281,10 @@ class Time_State(State):
         self.weather_icon = displayio.Group()
         self.weather_icon.x = 88
         self.weather_icon.y = 20
-        self.icon_file = None
 
         self.snooze_icon = displayio.Group()
         self.snooze_icon.x = 260
         self.snooze_icon.y = 70
-        self.snooze_file = None
 
         # each button has it's edges as well as the state to transition to when touched
         self.buttons = [dict(left=0, top=50, right=80, bottom=120, next_state='settings'),
@@ -223,105 +309,102 @@ class Time_State(State):
             low_light = False
 
 
-    def tick(self, now):
-        global alarm_armed, snooze_time, update_time, current_time
-
-        # is the snooze button pushed? Cancel the snooze if so.
-        if not snooze_button.value:
+    def snooze_button_changed(self, released, now):
+        """Cancel the snooze if the snooze button is pushed."""
+        global alarm_armed, snooze_time
+        if not released:
             if snooze_time:
                 self.snooze_icon.pop()
+                scheduler.cancel('snooze')
             snooze_time = None
             alarm_armed = False
 
-        # is snooze active and the snooze time has passed? Transition to alram is so.
-        if snooze_time and ((now - snooze_time) >= snooze_interval):
-            change_to_state('alarm')
-            return
 
-        # check light level and adjust background & backlight
-        #self.adjust_backlight_based_on_light()
+    def snooze_over(self, now):
+        """The snooze time has passed, sound the alarm again."""
+        change_to_state('alarm')
 
-        # only query the online time once per hour (and on first run)
-        if (not self.refresh_time) or ((now - self.refresh_time) > 3600):
-            logger.debug('Fetching time')
-            try:
-                pyportal.get_local_time(location=secrets['timezone'])
-                self.refresh_time = now
-            except RuntimeError as e:
-                self.refresh_time = now - 3000   # delay 10 minutes before retrying
-                logger.error('Some error occured, retrying! - %s', str(e))
-
-        # only query the weather every 10 minutes (and on first run)
-        if (not self.weather_refresh) or (now - self.weather_refresh) > 600:
-            logger.debug('Fetching weather')
+
+    def update_local_time(self, now):
+        """Query the online time, more rarely as the clock proves accurate (and on first run)."""
+        logger.debug('Fetching time')
+        try:
+            pyportal.get_local_time(location=secrets['timezone'])
+            self.refresh_time = now
+            scheduler.reschedule('local time', now + pyportal.time_sync_interval)
+        except RuntimeError as e:
+            # delay 10 minutes before retrying
+            self.refresh_time = now - pyportal.time_sync_interval + 600
+            scheduler.reschedule('local time', now + 600)
+            logger.error('Some error occured, retrying! - %s', str(e))
+
+
+    def update_weather(self, now):
+        """Start querying the weather, every 10 minutes (and on first run).
+        The fetch is stepped along by poll_weather so the clock and buttons keep working."""
+        logger.debug('Fetching weather')
+        pyportal.fetch_async()
+        scheduler.every('weather poll', 0, self.poll_weather)
+
+
+    def poll_weather(self, now):
+        """Move the weather fetch along, and show the weather once it's in."""
+        try:
+            value = pyportal.poll()
+            if pyportal.fetching:
+                return
+            scheduler.cancel('weather poll')
+            weather_icon_name, temperature = value
+
+            # set the icon/background
             try:
-                value = pyportal.fetch()
-                weather = json.loads(value)
-
-                # set the icon/background
-                weather_icon_name = weather['weather'][0]['icon']
-                try:
-                    self.weather_icon.pop()
-                except IndexError:
-                    pass
-                filename = "/icons/"+weather_icon_name+".bmp"
-                if filename:
-                    if self.icon_file:
-                        self.icon_file.close()
-                    self.icon_file = open(filename, "rb")
-                    icon = displayio.OnDiskBitmap(self.icon_file)
-                    try:
-                        icon_sprite = displayio.TileGrid(icon,
-                                                         pixel_shader=displayio.ColorConverter(),
-                                                         x=0, y=0)
-                    except TypeError:
-                        icon_sprite = displayio.TileGrid(icon,
-                                                         pixel_shader=displayio.ColorConverter(),
-                                                         position=(0, 0))
-
-
-                    self.weather_icon.append(icon_sprite)
-
-                temperature = weather['main']['temp'] - 273.15 # its...in kelvin
-                if celcius:
-                    temperature_text = '%3d C' % round(temperature)
-                else:
-                    temperature_text = '%3d F' % round(((temperature * 9 / 5) + 32))
-                self.text_areas[2].text = temperature_text
-                self.weather_refresh = now
-                try:
-                    board.DISPLAY.refresh(target_frames_per_second=60)
-                except AttributeError:
-                    board.DISPLAY.refresh_soon()
-                    board.DISPLAY.wait_for_frame()
-
-
-            except RuntimeError as e:
-                self.weather_refresh = now - 540   # delay a minute before retrying
-                logger.error("Some error occured, retrying! - %s", str(e))
-
-        if (not update_time) or ((now - update_time) > TIME_REFRESH_UPDATE):
-            # Update the time
-            update_time = now
-            current_time = time.localtime()
-
-            # Adjust hour for 12 hour format
-            if (current_time.tm_hour > 13):
-                adjusted_hour = current_time.tm_hour - 12
+                self.weather_icon.pop()
+            except IndexError:
+                pass
+            filename = "/icons/"+weather_icon_name+".bmp"
+            if filename:
+                # the icons are small and come round again, so keep them in memory
+                self.weather_icon.append(pyportal.sprite_cache.get(filename, in_memory=True))
+
+            temperature -= 273.15 # its...in kelvin
+            if celcius:
+                temperature_text = '%3d C' % round(temperature)
             else:
-                adjusted_hour = current_time.tm_hour
+                temperature_text = '%3d F' % round(((temperature * 9 / 5) + 32))
+            self.text_areas[2].text = temperature_text
+            self.weather_refresh = now
+            pyportal.frames.invalidate_label(self.text_areas[2])
+            # the icons are all 50x50
+            pyportal.frames.invalidate((self.weather_icon.x, self.weather_icon.y, 50, 50))
+
+        except RuntimeError as e:
+            scheduler.cancel('weather poll')
+            self.weather_refresh = now - 540   # delay a minute before retrying
+            scheduler.reschedule('weather', self.weather_refresh + 600)
+            logger.error("Some error occured, retrying! - %s", str(e))
+
+
+    def update_clock(self, now):
+        """Update the time display, then check if the alarm should sound."""
+        global alarm_armed, update_time, current_time
+        update_time = now
+        current_time = pyportal.localtime()
+
+        # Adjust hour for 12 hour format
+        if (current_time.tm_hour > 13):
+            adjusted_hour = current_time.tm_hour - 12
+        else:
+            adjusted_hour = current_time.tm_hour
 
-            time_string = '%02d:%02d' % (adjusted_hour,current_time.tm_min)
-            self.text_areas[0].text = time_string
-            try:
-                board.DISPLAY.refresh(target_frames_per_second=60)
-            except AttributeError:
-                board.DISPLAY.refresh_soon()
-                board.DISPLAY.wait_for_frame()
+        time_string = '%02d:%02d' % (adjusted_hour,current_time.tm_min)
+        self.text_areas[0].text = time_string
+        pyportal.frames.invalidate_label(self.text_areas[0])
 
+        # check light level and adjust background & backlight
+        #self.adjust_backlight_based_on_light()
 
-            # Check if alarm should sound
-        if current_time is not None and not snooze_time:
+        # Check if alarm should sound
+        if not snooze_time:
             minutes_now = current_time.tm_hour * 60 + current_time.tm_min
             minutes_alarm = alarm_hour * 60 + alarm_minute
             if minutes_now == minutes_alarm:
@@ -331,14 +414,13 @@ class Time_State(State):
                 alarm_armed = alarm_enabled
 
 
-    def touch(self, t, touched):
-        if t and not touched:             # only process the initial touch
+    def touch(self, event):
+        if event.kind == TouchSampler.DOWN:      # only process the initial touch
             for button_index in range(len(self.buttons)):
                 b = self.buttons[button_index]
-                if touch_in_button(t, b):
+                if touch_in_button((event.x, event.y), b):
                     change_to_state(b['next_state'])
                     break
-        return bool(t)
 
 
     def enter(self):
@@ -347,34 +429,29 @@ class Time_State(State):
             pyportal.splash.append(ta)
         pyportal.splash.append(self.weather_icon)
         if snooze_time:
-            if self.snooze_file:
-                self.snooze_file.close()
-            self.snooze_file = open('/icons/zzz.bmp', "rb")
-            icon = displayio.OnDiskBitmap(self.snooze_file)
-            try:
-                icon_sprite = displayio.TileGrid(icon,
-                                                 pixel_shader=displayio.ColorConverter(),
-                                                 x=0, y=0)
-            except TypeError:
-                icon_sprite = displayio.TileGrid(icon,
-                                                 pixel_shader=displayio.ColorConverter(),
-                                                 position=(0, 0))
-            self.snooze_icon.append(icon_sprite)
+            self.snooze_icon.append(pyportal.sprite_cache.get('/icons/zzz.bmp'))
             pyportal.splash.append(self.snooze_icon)
         if alarm_enabled:
             self.text_areas[1].text = '%2d:%02d' % (alarm_hour, alarm_minute)
         else:
             self.text_areas[1].text = '     '
-        try:
-            board.DISPLAY.refresh(target_frames_per_second=60)
-        except AttributeError:
-            board.DISPLAY.refresh_soon()
-            board.DISPLAY.wait_for_frame()
+        pyportal.frames.invalidate()
 
+        scheduler.watch(lambda: snooze_button.value, self.snooze_button_changed)
+        if snooze_time:
+            scheduler.at('snooze', snooze_time + snooze_interval, self.snooze_over)
+        # pick up the online time and weather timers where we left them
+        first_time = self.refresh_time + pyportal.time_sync_interval if self.refresh_time else None
+        scheduler.every('local time', pyportal.time_sync_interval, self.update_local_time,
+                        first=first_time)
+        first_weather = self.weather_refresh + 600 if self.weather_refresh else None
+        scheduler.every('weather', 600, self.update_weather, first=first_weather)
+        scheduler.every('clock', TIME_REFRESH_UPDATE, self.update_clock)
 
 
     def exit(self):
         super().exit()
+        pyportal.cancel_fetch()
         for _ in range(len(self.snooze_icon)):
             self.snooze_icon.pop()
 
@@ -391,20 +468,13 @@ class Mugsy_State(Time_State):
         return 'mugsy'
 
 
-    def tick(self, now):
-        # Once the job is done, go back to the main screen
-        change_to_state('time')
-
     def enter(self):
         global low_light
         low_light = False
         pyportal.set_backlight(1.00)
         pyportal.set_background(mugsy_background)
-        try:
-            board.DISPLAY.refresh(target_frames_per_second=60)
-        except AttributeError:
-            board.DISPLAY.refresh_soon()
-            board.DISPLAY.wait_for_frame()
+        # Once the job is done, go back to the main screen
+        scheduler.at('done', time.monotonic(), lambda now: change_to_state('time'))
 
 
 
@@ -416,7 +486,6 @@ class Alarm_State(State):
 
     def __init__(self):
         super().__init__()
-        self.sound_alarm_time = None
 
 
     @property
@@ -424,41 +493,33 @@ class Alarm_State(State):
         return 'alarm'
 
 
-    def tick(self, now):
+    def snooze_button_changed(self, released, now):
+        """Snooze if the snooze button is pushed."""
         global snooze_time
-
-        # is the snooze button pushed
-        if not snooze_button.value:
+        if not released:
             snooze_time = now
             change_to_state('time')
-            return
 
-        # is it time to sound the alarm?
-        if self.sound_alarm_time and (now - self.sound_alarm_time) > alarm_interval:
-            self.sound_alarm_time = now
-            pyportal.play_file(alarm_file)
+
+    def sound_alarm(self, now):
+        """Sound the alarm, every alarm_interval seconds."""
+        pyportal.play_file(alarm_file)
 
 
-    def touch(self, t, touched):
+    def touch(self, event):
         global snooze_time
-        if t and not touched:
+        if event.kind == TouchSampler.DOWN:
             snooze_time = None
             change_to_state('time')
-        return bool(t)
 
 
     def enter(self):
         global low_light
-        self.sound_alarm_time = time.monotonic() - alarm_interval
         pyportal.set_backlight(1.00)
         pyportal.set_background(alarm_background)
         low_light = False
-        try:
-            board.DISPLAY.refresh(target_frames_per_second=60)
-        except AttributeError:
-            board.DISPLAY.refresh_soon()
-            board.DISPLAY.wait_for_frame()
-
+        scheduler.watch(lambda: snooze_button.value, self.snooze_button_changed)
+        scheduler.every('sound alarm', alarm_interval, self.sound_alarm)
 
 
     def exit(self):
@@ -473,7 +534,6 @@ class Setting_State(State):
 
     def __init__(self):
         super().__init__()
-        self.previous_touch = None
         self.background = 'settings_background.bmp'
         text_area_configs = [dict(x=88, y=120, size=5, color=0xFFFFFF, font=time_font)]
 
@@ -490,9 +550,10 @@ class Setting_State(State):
         return 'settings'
 
 
-    def touch(self, t, touched):
+    def touch(self, event):
         global alarm_hour, alarm_minute, alarm_enabled
-        if t:
+        t = (event.x, event.y)
+        if event.kind == TouchSampler.DOWN:
             if touch_in_button(t, self.buttons[0]):   # on
                 logger.debug('ON touched')
                 alarm_enabled = True
@@ -500,42 +561,31 @@ class Setting_State(State):
             elif touch_in_button(t, self.buttons[1]):   # return
                 logger.debug('RETURN touched')
                 change_to_state('time')
+                return
             elif touch_in_button(t, self.buttons[2]): # off
                 logger.debug('OFF touched')
                 alarm_enabled = False
                 self.text_areas[0].text = '     '
-            elif alarm_enabled:
-                if not self.previous_touch:
-                    self.previous_touch = t
-                else:
-                    if touch_in_button(t, self.buttons[3]):   # HOURS
-                        logger.debug('HOURS touched')
-                        if t[1] < (self.previous_touch[1] - 5):   # moving up
-                            alarm_hour = (alarm_hour + 1) % 24
-                            logger.debug('Alarm hour now: %d', alarm_hour)
-                        elif t[1] > (self.previous_touch[1] + 5): # moving down
-                            alarm_hour = (alarm_hour - 1) % 24
-                            logger.debug('Alarm hour now: %d', alarm_hour)
-                        self.text_areas[0].text = '%02d:%02d' % (alarm_hour, alarm_minute)
-                    elif touch_in_button(t, self.buttons[4]): # MINUTES
-                        logger.debug('MINUTES touched')
-                        if t[1] < (self.previous_touch[1] - 5):   # moving up
-                            alarm_minute = (alarm_minute + 1) % 60
-                            logger.debug('Alarm minute now: %d', alarm_minute)
-                        elif t[1] > (self.previous_touch[1] + 5): # moving down
-                            alarm_minute = (alarm_minute - 1) % 60
-                            logger.debug('Alarm minute now: %d', alarm_minute)
-                        self.text_areas[0].text = '%02d:%02d' % (alarm_hour, alarm_minute)
-                    self.previous_touch = t
-            try:
-                board.DISPLAY.refresh(target_frames_per_second=60)
-            except AttributeError:
-                board.DISPLAY.refresh_soon()
-                board.DISPLAY.wait_for_frame()
-
+        elif event.kind == TouchSampler.MOVE and alarm_enabled:
+            # each step of a swipe up/down moves the hours or minutes along by one
+            if event.dy <= -5:
+                step = 1                            # moving up
+            elif event.dy >= 5:
+                step = -1                           # moving down
+            else:
+                return
+            if touch_in_button(t, self.buttons[3]):   # HOURS
+                alarm_hour = (alarm_hour + step) % 24
+                logger.debug('Alarm hour now: %d', alarm_hour)
+            elif touch_in_button(t, self.buttons[4]): # MINUTES
+                alarm_minute = (alarm_minute + step) % 60
+                logger.debug('Alarm minute now: %d', alarm_minute)
+            else:
+                return
+            self.text_areas[0].text = '%02d:%02d' % (alarm_hour, alarm_minute)
         else:
-            self.previous_touch = None
-        return bool(t)
+            return
+        pyportal.frames.invalidate_label(self.text_areas[0])
 
 
     def enter(self):
@@ -568,6 +618,7 @@ def change_to_state(state_name):
         logger.debug('Exiting %s', current_state.name)
         current_state.exit()
     current_state = states[state_name]
+    touch.clear()               # touches meant for the old state
     logger.debug('Entering %s', current_state.name)
     current_state.enter()
 
@@ -578,5 +629,8 @@ clear_splash()
 change_to_state("time")
 
 while True:
-    # touched = current_state.touch(pyportal.touchscreen.touch_point, touched) ## Comment out to remove "touched" routines
-    current_state.tick(time.monotonic())
+    next_sample = touch.poll()
+    for event in touch.events():
+        current_state.touch(event)
+    scheduler.run_once(max_delay=next_sample)
+    pyportal.frames.update()     # show whatever changed, in one refresh
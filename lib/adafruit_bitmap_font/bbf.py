@@ -0,0 +1,143 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2019 Scott Shawcroft for Adafruit Industries LLC
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+`adafruit_bitmap_font.bbf`
+====================================================
+
+Loads pre-rasterized BBF (binary bitmap font) files, as written by
+``tools/bdf2bbf.py``.
+
+A BBF file is a little endian header (magic ``BBF\\x00``, version, FONTBOUNDINGBOX
+and glyph count), a glyph table sorted by code point, then each glyph's bitmap
+as 1 bit per pixel rows padded to 32 bits, ready to be copied into a bitmap.
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://github.com/adafruit/circuitpython/releases
+
+"""
+
+import gc
+import struct
+from .glyph_cache import GlyphCache
+
+__version__ = "1.0.3"
+__repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Bitmap_Font.git"
+
+MAGIC = b"BBF\x00"
+VERSION = 1
+# magic, version, bounding box (width, height, x_offset, y_offset), glyph count
+HEADER = "<4sHhhhhI"
+# code point, width, height, dx, dy, shift_x, shift_y, offset of the bitmap rows
+ENTRY = "<IHHhhhhI"
+
+_HEADER_SIZE = struct.calcsize(HEADER)
+_ENTRY_SIZE = struct.calcsize(ENTRY)
+
+class BBF(GlyphCache):
+    """Loads glyphs from a BBF file in the given bitmap_class. ``atlas_tiles`` and
+    ``cache_bytes`` are passed on to `GlyphCache`."""
+    def __init__(self, f, bitmap_class, *, atlas_tiles=0, cache_bytes=0):
+        super().__init__(atlas_tiles=atlas_tiles, cache_bytes=cache_bytes)
+        self.file = f
+        self.name = f
+        self.file.seek(0)
+        self.bitmap_class = bitmap_class
+        header = self.file.read(_HEADER_SIZE)
+        if len(header) != _HEADER_SIZE:
+            raise ValueError("Unsupported file version")
+        magic, version, x, y, x_offset, y_offset, count = struct.unpack(HEADER, header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Unsupported file version")
+        self._bounding_box = (x, y, x_offset, y_offset)
+        self._count = count
+        self._entry = bytearray(_ENTRY_SIZE)
+        self._rows = bytearray(0)
+
+    def get_bounding_box(self):
+        """Return the maximum glyph size as a 4-tuple of: width, height, x_offset, y_offset"""
+        return self._bounding_box
+
+    def _find(self, code_point):
+        """Binary search the glyph table. Returns the unpacked entry or None."""
+        low = 0
+        high = self._count - 1
+        while low <= high:
+            middle = (low + high) // 2
+            self.file.seek(_HEADER_SIZE + middle * _ENTRY_SIZE)
+            self.file.readinto(self._entry)
+            entry = struct.unpack(ENTRY, self._entry)
+            if entry[0] == code_point:
+                return entry
+            if entry[0] < code_point:
+                low = middle + 1
+            else:
+                high = middle - 1
+        return None
+
+    def load_glyphs(self, code_points):
+        if isinstance(code_points, int):
+            code_points = (code_points,)
+        entries = []
+        for code_point in code_points:
+            if self._glyphs.get(code_point):
+                continue
+            entry = self._find(code_point)
+            if entry:
+                entries.append(entry)
+        # read the bitmaps in file order so the seeks only go forwards
+        entries.sort(key=lambda entry: entry[7])
+        for entry in entries:
+            self._load_glyph(entry)
+
+    def _load_glyph(self, entry):
+        code_point, width, height, dx, dy, shift_x, shift_y, offset = entry
+        stride = ((width + 31) // 32) * 4
+        size = stride * height
+        if len(self._rows) < size:
+            self._rows = None
+            gc.collect()
+            self._rows = bytearray(size)
+        rows = memoryview(self._rows)
+        target = self._start_glyph(width, height)
+        bitmap, origin, row_length, tile = target
+        if size:
+            self.file.seek(offset)
+            self.file.readinto(rows[:size])
+            if tile is None and hasattr(bitmap, "_load_row"):
+                for y in range(height):
+                    bitmap._load_row(y, rows[y * stride:(y + 1) * stride]) # pylint: disable=protected-access
+            else:
+                # atlas tiles, or no bulk row copy available: set the pixels one at a time
+                for y in range(height):
+                    start = y * stride
+                    pixel = origin + y * row_length
+                    for x in range(width):
+                        if rows[start + (x >> 3)] & (0x80 >> (x & 7)):
+                            bitmap[pixel + x] = 1
+        self._finish_glyph(code_point, target, width, height, dx, dy, shift_x, shift_y)
@@ -40,19 +40,31 @@ Implementation Notes
 """
 
 import gc
-try:
-    from displayio import Glyph
-except ImportError:
-    from fontio import Glyph
+import struct
 from .glyph_cache import GlyphCache
 
 __version__ = "1.0.3"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Bitmap_Font.git"
 
+# Sidecar index layout: magic, version, size of the font file it describes, FNV-1a
+# hash of the font's header (everything before the first STARTCHAR), FONTBOUNDINGBOX,
+# SIZE, number of entries. Then one (code point, offset of STARTCHAR) pair per glyph.
+_INDEX_MAGIC = b"BDFI"
+_INDEX_VERSION = 2
+_INDEX_HEADER = "<4sHIIhhhhhhhI"
+_INDEX_ENTRY = "<II"
+
 class BDF(GlyphCache):
-    """Loads glyphs from a BDF file in the given bitmap_class."""
-    def __init__(self, f, bitmap_class):
-        super().__init__()
+    """Loads glyphs from a BDF file in the given bitmap_class.
+
+    The file is scanned once to find where each glyph starts, so loading a glyph
+    later only reads that glyph. If ``index_filename`` is given the scan is saved
+    there and reused while it still matches the font file's size and header. Should
+    an edit slip past that, the first glyph that isn't where the index says it is
+    makes the file get scanned again. ``atlas_tiles`` and ``cache_bytes`` are passed
+    on to `GlyphCache`."""
+    def __init__(self, f, bitmap_class, index_filename=None, *, atlas_tiles=0, cache_bytes=0):
+        super().__init__(atlas_tiles=atlas_tiles, cache_bytes=cache_bytes)
         self.file = f
         self.name = f
         self.file.seek(0)
@@ -64,126 +76,193 @@ class BDF(GlyphCache):
         self.point_size = None
         self.x_resolution = None
         self.y_resolution = None
+        self._bounding_box = None
+        self._offsets = {}
+        self._index_filename = index_filename
+        self._scanned = False     # offsets came from the file itself, not the index
 
-    def get_bounding_box(self):
-        """Return the maximum glyph size as a 4-tuple of: width, height, x_offset, y_offset"""
+        if not (index_filename and self._read_index(index_filename)):
+            self._reindex()
+
+    def _reindex(self):
+        """Scan the font, and save the index if there's somewhere to"""
+        self._offsets = {}
+        self._build_index()
+        self._scanned = True
+        if self._index_filename:
+            self._write_index(self._index_filename)
+
+    def _file_size(self):
+        self.file.seek(0, 2)
+        return self.file.tell()
+
+    def _header_hash(self):
+        """FNV-1a of the font's header, which is everything before the first glyph"""
+        length = min(self._offsets.values()) if self._offsets else 0
+        value = 0x811C9DC5
+        self.file.seek(0)
+        while length > 0:
+            block = self.file.read(min(length, 256))
+            if not block:
+                break
+            length -= len(block)
+            for byte in block:
+                value = ((value ^ byte) * 0x01000193) & 0xFFFFFFFF
+        return value
+
+    def _build_index(self):
+        """Scan the whole file once, noting the header values and where each glyph starts"""
         self.file.seek(0)
+        position = 0
+        start = 0
+        in_bitmap = False
         while True:
             line = self.file.readline()
-            line = str(line, "utf-8")
             if not line:
                 break
-
-            if line.startswith("FONTBOUNDINGBOX "):
+            if in_bitmap:
+                in_bitmap = not line.startswith(b"ENDCHAR")
+            elif line.startswith(b"STARTCHAR"):
+                start = position
+            elif line.startswith(b"ENCODING"):
+                code_point = int(line.split()[1])
+                if code_point >= 0:
+                    self._offsets[code_point] = start
+            elif line.startswith(b"BITMAP"):
+                in_bitmap = True
+            elif line.startswith(b"FONTBOUNDINGBOX "):
                 _, x, y, x_offset, y_offset = line.split()
-                return (int(x), int(y), int(x_offset), int(y_offset))
-        return None
+                self._bounding_box = (int(x), int(y), int(x_offset), int(y_offset))
+            elif line.startswith(b"SIZE"):
+                _, point_size, x_resolution, y_resolution = line.split()
+                self.point_size = int(point_size)
+                self.x_resolution = int(x_resolution)
+                self.y_resolution = int(y_resolution)
+            position += len(line)
+
+    def _read_index(self, index_filename):
+        """Load a previously saved index. Returns False if it's missing or stale."""
+        try:
+            with open(index_filename, "rb") as index_file:
+                header = index_file.read(struct.calcsize(_INDEX_HEADER))
+                if len(header) != struct.calcsize(_INDEX_HEADER):
+                    return False
+                (magic, version, indexed_size, header_hash, x, y, x_offset, y_offset,
+                 point_size, x_resolution, y_resolution, count) = struct.unpack(_INDEX_HEADER,
+                                                                                header)
+                if (magic != _INDEX_MAGIC or version != _INDEX_VERSION or
+                        indexed_size != self._file_size()):
+                    return False
+                entry_size = struct.calcsize(_INDEX_ENTRY)
+                entries = index_file.read(count * entry_size)
+                if len(entries) != count * entry_size:
+                    return False
+        except OSError:
+            return False
+        for i in range(count):
+            code_point, offset = struct.unpack_from(_INDEX_ENTRY, entries, i * entry_size)
+            self._offsets[code_point] = offset
+        if self._header_hash() != header_hash:
+            self._offsets = {}
+            return False
+        self._bounding_box = (x, y, x_offset, y_offset)
+        self.point_size = point_size
+        self.x_resolution = x_resolution
+        self.y_resolution = y_resolution
+        return True
+
+    def _write_index(self, index_filename):
+        """Save the index next to the font. Skipped quietly if the filesystem is read-only."""
+        bounding_box = self._bounding_box or (0, 0, 0, 0)
+        file_size = self._file_size()
+        header_hash = self._header_hash()
+        try:
+            with open(index_filename, "wb") as index_file:
+                index_file.write(struct.pack(_INDEX_HEADER, _INDEX_MAGIC, _INDEX_VERSION,
+                                             file_size, header_hash,
+                                             bounding_box[0], bounding_box[1],
+                                             bounding_box[2], bounding_box[3],
+                                             self.point_size or 0, self.x_resolution or 0,
+                                             self.y_resolution or 0, len(self._offsets)))
+                for code_point in self._offsets:
+                    index_file.write(struct.pack(_INDEX_ENTRY, code_point,
+                                                 self._offsets[code_point]))
+        except OSError:
+            pass
+
+    def get_bounding_box(self):
+        """Return the maximum glyph size as a 4-tuple of: width, height, x_offset, y_offset"""
+        return self._bounding_box
 
     def load_glyphs(self, code_points):
-        # pylint: disable=too-many-statements,too-many-branches,too-many-nested-blocks,too-many-locals
-        metadata = True
-        character = False
-        code_point = None
-        bytes_per_row = 1
-        desired_character = False
-        current_info = {}
-        current_y = 0
-        rounded_x = 1
         if isinstance(code_points, int):
-            remaining = set()
-            remaining.add(code_points)
-        else:
-            remaining = set(code_points)
-        for code_point in remaining:
-            if code_point in self._glyphs and self._glyphs[code_point]:
-                remaining.remove(code_point)
-        if not remaining:
-            return
-
-        x, _, _, _ = self.get_bounding_box()
+            code_points = (code_points,)
+        starts = []
+        for code_point in code_points:
+            if self._glyphs.get(code_point):
+                continue
+            start = self._offsets.get(code_point)
+            if start is not None:
+                starts.append((start, code_point))
+        # visit the glyphs in file order so the seeks only go forwards
+        starts.sort()
+        for start, code_point in starts:
+            self.file.seek(start)
+            if not (self._scanned or self._glyph_starts(code_point)):
+                # the font changed under its index
+                self._reindex()
+                self.load_glyphs(code_points)
+                return
+            self.file.seek(start)
+            self._load_glyph()
 
-        self.file.seek(0)
+    def _glyph_starts(self, code_point):
+        """Whether the glyph for code_point starts at the current file position"""
+        if not self.file.readline().startswith(b"STARTCHAR"):
+            return False
+        line = self.file.readline()
+        try:
+            return line.startswith(b"ENCODING") and int(line.split()[1]) == code_point
+        except (IndexError, ValueError):
+            return False
+
+    def _load_glyph(self):
+        """Parse the glyph at the current file position, from STARTCHAR to ENDCHAR"""
+        # pylint: disable=too-many-locals
+        code_point = None
+        bounds = None
+        shift = None
         while True:
             line = self.file.readline()
-            if not line:
+            if not line or line.startswith(b"ENDCHAR"):
                 break
-            if line.startswith(b"CHARS "):
-                metadata = False
-            elif line.startswith(b"SIZE"):
-                _, self.point_size, self.x_resolution, self.y_resolution = line.split()
-            elif line.startswith(b"COMMENT"):
-                pass
-            elif line.startswith(b"STARTCHAR"):
-                # print(lineno, line.strip())
-                #_, character_name = line.split()
-                character = True
-            elif line.startswith(b"ENDCHAR"):
-                character = False
-                if desired_character:
-                    bounds = current_info["bounds"]
-                    shift = current_info["shift"]
-                    gc.collect()
-                    self._glyphs[code_point] = Glyph(current_info["bitmap"],
-                                                     0,
-                                                     bounds[0],
-                                                     bounds[1],
-                                                     bounds[2],
-                                                     bounds[3],
-                                                     shift[0],
-                                                     shift[1])
-                    remaining.remove(code_point)
-                    if not remaining:
-                        return
-                desired_character = False
+            if line.startswith(b"ENCODING"):
+                code_point = int(line.split()[1])
+            elif line.startswith(b"DWIDTH"):
+                _, shift_x, shift_y = line.split()
+                shift = (int(shift_x), int(shift_y))
             elif line.startswith(b"BBX"):
-                if desired_character:
-                    _, x, y, x_offset, y_offset = line.split()
-                    x = int(x)
-                    y = int(y)
-                    x_offset = int(x_offset)
-                    y_offset = int(y_offset)
-                    current_info["bounds"] = (x, y, x_offset, y_offset)
-                    current_info["bitmap"] = self.bitmap_class(x, y, 2)
+                _, x, y, x_offset, y_offset = line.split()
+                bounds = (int(x), int(y), int(x_offset), int(y_offset))
             elif line.startswith(b"BITMAP"):
-                if desired_character:
-                    rounded_x = x // 8
-                    if x % 8 > 0:
-                        rounded_x += 1
-                    bytes_per_row = rounded_x
-                    if bytes_per_row % 4 > 0:
-                        bytes_per_row += 4 - bytes_per_row % 4
-                    current_y = 0
-            elif line.startswith(b"ENCODING"):
-                _, code_point = line.split()
-                code_point = int(code_point)
-                if code_point in remaining:
-                    desired_character = True
-                    current_info = {"bitmap": None, "bounds": None, "shift": None}
-            elif line.startswith(b"DWIDTH"):
-                if desired_character:
-                    _, shift_x, shift_y = line.split()
-                    shift_x = int(shift_x)
-                    shift_y = int(shift_y)
-                    current_info["shift"] = (shift_x, shift_y)
-            elif line.startswith(b"SWIDTH"):
-                pass
-            elif character:
-                if desired_character:
-                    bits = int(line.strip(), 16)
-                    width = current_info["bounds"][0]
-                    start = current_y * width
+                target = self._start_glyph(bounds[0], bounds[1])
+                bitmap, origin, stride, _ = target
+                width = bounds[0]
+                rounded_x = width // 8
+                if width % 8 > 0:
+                    rounded_x += 1
+                for current_y in range(bounds[1]):
+                    bits = int(self.file.readline().strip(), 16)
+                    start = origin + current_y * stride
                     x = 0
                     for i in range(rounded_x):
                         val = (bits >> ((rounded_x-i-1)*8)) & 0xFF
                         for j in range(7, -1, -1):
                             if x >= width:
                                 break
-                            bit = 0
                             if val & (1 << j) != 0:
-                                bit = 1
-                            current_info["bitmap"][start + x] = bit
+                                bitmap[start + x] = 1
                             x += 1
-                    current_y += 1
-            elif metadata:
-                #print(lineno, line.strip())
-                pass
+        gc.collect()
+        self._finish_glyph(code_point, target, bounds[0], bounds[1], bounds[2], bounds[3],
+                           shift[0], shift[1])
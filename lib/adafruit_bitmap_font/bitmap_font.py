@@ -43,8 +43,14 @@ __version__ = "1.0.3"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Bitmap_Font.git"
 
 
-def load_font(filename, bitmap=None):
-    """Loads a font file. Returns None if unsupported."""
+def load_font(filename, bitmap=None, *, atlas_tiles=0, cache_bytes=0):
+    """Loads a font file. Returns None if unsupported.
+
+    ``atlas_tiles`` and ``cache_bytes`` control how BDF and BBF fonts keep their glyphs, see
+    `GlyphCache`.
+
+    BDF fonts keep a glyph index next to the font file (``filename + ".idx"``) so later loads
+    can skip scanning the whole font. The index is only saved when the filesystem is writable."""
     if not bitmap:
         import displayio
         bitmap = displayio.Bitmap
@@ -53,7 +59,11 @@ def load_font(filename, bitmap=None):
     #print(first_four)
     if filename.endswith("bdf") and first_four == b"STAR":
         from . import bdf
-        return bdf.BDF(font_file, bitmap)
+        return bdf.BDF(font_file, bitmap, index_filename=filename + ".idx",
+                       atlas_tiles=atlas_tiles, cache_bytes=cache_bytes)
+    if filename.endswith("bbf") and first_four == b"BBF\x00":
+        from . import bbf
+        return bbf.BBF(font_file, bitmap, atlas_tiles=atlas_tiles, cache_bytes=cache_bytes)
     if filename.endswith("pcf") and first_four == b"\x01fcp":
         import pcf
         return pcf.PCF(font_file)
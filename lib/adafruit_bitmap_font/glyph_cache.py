@@ -40,15 +40,47 @@ Implementation Notes
 """
 
 import gc
+try:
+    from displayio import Glyph
+except ImportError:
+    from fontio import Glyph
 
 __version__ = "1.0.3"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Bitmap_Font.git"
 
 
 class GlyphCache:
-    """Caches glyphs loaded by a subclass."""
-    def __init__(self):
+    """Caches glyphs loaded by a subclass.
+
+    By default each glyph gets its own bitmap and is kept forever.
+
+    :param int atlas_tiles: Pack glyphs into one shared bitmap with this many tiles, each the
+      size of the font's bounding box, instead of one bitmap per glyph. When every tile is
+      taken the least recently used glyph's tile is reused, so make room for every glyph
+      that is on screen at once. Atlas glyphs keep their own size and offsets, and sit in the
+      top left corner of their tile with the rest of the tile blank, so a TileGrid showing
+      one needs tiles the size of the bounding box (see `atlas`).
+    :param int cache_bytes: Limit on the memory used by glyphs with their own bitmap. The
+      least recently used glyphs are dropped to stay under it. 0 means no limit. The limit is
+      advisory: it counts the bitmaps the cache holds, but a dropped glyph that a Label still
+      shows (or keeps in its spare TileGrids) stays in memory until the Label lets go of it,
+      so leave room for the glyphs on screen on top of the limit."""
+    def __init__(self, *, atlas_tiles=0, cache_bytes=0):
         self._glyphs = {}
+        self._atlas_tiles = atlas_tiles
+        self._atlas = None
+        self._tiles = {}
+        self._tile_extents = [None] * atlas_tiles
+        self._cache_bytes = cache_bytes
+        self._cached_bytes = 0
+        self._sizes = {}
+        self._last_used = {}
+        self._clock = 0
+
+    @property
+    def atlas(self):
+        """The bitmap atlas glyphs share, or None. Its tiles are the size of the bounding box."""
+        return self._atlas
 
     def load_glyphs(self, code_points):
         """Loads displayio.Glyph objects into the GlyphCache from the font."""
@@ -56,6 +88,8 @@ class GlyphCache:
 
     def get_glyph(self, code_point):
         """Returns a displayio.Glyph for the given code point or None is unsupported."""
+        if self._atlas_tiles or self._cache_bytes:
+            self._touch(code_point)
         if code_point in self._glyphs:
             return self._glyphs[code_point]
 
@@ -65,3 +99,83 @@ class GlyphCache:
         self.load_glyphs(code_points)
         gc.collect()
         return self._glyphs[code_point]
+
+    def _touch(self, code_point):
+        self._clock += 1
+        self._last_used[code_point] = self._clock
+
+    def _least_recently_used(self, code_points):
+        oldest = None
+        for code_point in code_points:
+            if oldest is None or self._last_used.get(code_point, 0) < self._last_used.get(oldest, 0):
+                oldest = code_point
+        return oldest
+
+    def _evict(self, code_point):
+        del self._glyphs[code_point]
+        self._last_used.pop(code_point, None)
+        if code_point in self._tiles:
+            return self._tiles.pop(code_point)
+        self._cached_bytes -= self._sizes.pop(code_point)
+        return None
+
+    def _start_glyph(self, width, height):
+        """Find somewhere for the subclass to draw a glyph. Returns a tuple of the bitmap, the
+        index of the glyph's top left pixel in it, its row length and the atlas tile (or None).
+        Only set pixels need drawing, everything else is already 0."""
+        box = self.get_bounding_box()
+        if self._atlas_tiles and width and height and box:
+            if width <= box[0] and height <= box[1]:
+                return self._start_atlas_glyph(box, width, height)
+
+        if self._cache_bytes:
+            size = ((width + 31) // 32) * 4 * height
+            cached = [code_point for code_point in self._sizes]
+            while cached and self._cached_bytes + size > self._cache_bytes:
+                code_point = self._least_recently_used(cached)
+                cached.remove(code_point)
+                self._evict(code_point)
+            gc.collect()
+            self._cached_bytes += size
+        return (self.bitmap_class(width, height, 2), 0, width, None)
+
+    def _start_atlas_glyph(self, box, width, height):
+        stride = box[0] * self._atlas_tiles
+        if self._atlas is None:
+            self._atlas = self.bitmap_class(stride, box[1], 2)
+        if len(self._tiles) < self._atlas_tiles:
+            taken = [False] * self._atlas_tiles
+            for code_point in self._tiles:
+                taken[self._tiles[code_point]] = True
+            tile = taken.index(False)
+        else:
+            tile = self._evict(self._least_recently_used(self._tiles))
+        # blank out whatever glyph used the tile before
+        extent = self._tile_extents[tile]
+        if extent:
+            old_origin, old_width, old_height = extent
+            for y in range(old_height):
+                row = old_origin + y * stride
+                for x in range(old_width):
+                    self._atlas[row + x] = 0
+        origin = tile * box[0]
+        self._tile_extents[tile] = (origin, width, height)
+        return (self._atlas, origin, stride, tile)
+
+    def _finish_glyph(self, code_point, target, width, height, dx, dy, shift_x, shift_y):
+        """Store the glyph drawn into the ``target`` returned by _start_glyph"""
+        # pylint: disable=too-many-arguments
+        bitmap, _, _, tile = target
+        if tile is None:
+            if self._cache_bytes:
+                self._sizes[code_point] = ((width + 31) // 32) * 4 * height
+            tile = 0
+        else:
+            self._tiles[code_point] = tile
+        self._glyphs[code_point] = Glyph(bitmap, tile, width, height, dx, dy, shift_x, shift_y)
+        if self._atlas_tiles or self._cache_bytes:
+            self._touch(code_point)
+
+    def get_bounding_box(self):
+        """Return the maximum glyph size as a 4-tuple of: width, height, x_offset, y_offset"""
+        return None
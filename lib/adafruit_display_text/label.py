@@ -44,6 +44,107 @@ import displayio
 __version__ = "2.1.1"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Display_Text.git"
 
+# How many laid out strings to remember
+LAYOUT_CACHE_SIZE = 16
+
+_layouts = {}
+_layout_order = []      # keys of _layouts, least recently used first
+_font_metrics = {}      # only for fonts with a layout in _layouts
+
+def _layout(font, text, line_spacing):
+    """Where each glyph of text goes. Returns a tuple of (code point, x, y) for every glyph
+    shown, and the bounding box. Layouts are cached, so keep a ``font``'s glyph metrics
+    fixed once it has been used."""
+    # pylint: disable=too-many-locals
+    key = (font, text, line_spacing)
+    layout = _layouts.get(key)
+    if layout:
+        if _layout_order[-1] != key:
+            _layout_order.remove(key)
+            _layout_order.append(key)
+        return layout
+    metrics = _font_metrics.get(font)
+    if not metrics:
+        metrics = (font.get_glyph(ord('M')).height, font.get_bounding_box()[1])
+        _font_metrics[font] = metrics
+    m_height, height = metrics
+
+    x = 0
+    y = 0
+    y_offset = int((m_height - text.count('\n') * height * line_spacing) / 2)
+    #print("y offset from baseline", y_offset)
+    left = right = top = bottom = 0
+    placed = []
+    for character in text:
+        if character == '\n':
+            y += int(height * line_spacing)
+            x = 0
+            continue
+        glyph = font.get_glyph(ord(character))
+        if not glyph:
+            continue
+        right = max(right, x+glyph.width)
+        if y == 0:   # first line, find the Ascender height
+            top = min(top, -glyph.height+y_offset)
+        bottom = max(bottom, y-glyph.dy+y_offset)
+        placed.append((ord(character), x + glyph.dx, y - glyph.height - glyph.dy + y_offset))
+        x += glyph.shift_x
+    layout = (tuple(placed), (left, top, left+right, bottom-top))
+    if len(_layouts) >= LAYOUT_CACHE_SIZE:
+        oldest = _layout_order.pop(0)
+        del _layouts[oldest]
+        # let go of the font too, once nothing laid out in it is left
+        for other in _layout_order:
+            if other[0] is oldest[0]:
+                break
+        else:
+            if oldest[0] is not font:
+                del _font_metrics[oldest[0]]
+    _layouts[key] = layout
+    _layout_order.append(key)
+    return layout
+
+def measure(font, text, *, line_spacing=1.25):
+    """The (width, height) a `Label` showing ``text`` in ``font`` would have, without
+    making any display objects. Handy for centering text before making the label."""
+    _, boundingbox = _layout(font, text, line_spacing)
+    return (boundingbox[2], boundingbox[3])
+
+def _tile_size(font, glyph):
+    """The (width, height) of the tiles in glyph's bitmap. Glyphs packed into a font's atlas
+    sit in the top left corner of a tile the size of the font's bounding box."""
+    if glyph.bitmap is getattr(font, "atlas", None):
+        return font.get_bounding_box()[:2]
+    return (glyph.width, glyph.height)
+
+def _same_tiles(font, glyph, other):
+    """Whether a TileGrid made for glyph can show other by just changing its tile"""
+    if glyph.bitmap is not other.bitmap:
+        return False
+    # every tile of the atlas is the same size
+    return (glyph.bitmap is getattr(font, "atlas", None) or
+            (glyph.width == other.width and glyph.height == other.height))
+
+def _move(face, x, y):
+    """Move a TileGrid, if it isn't already there"""
+    try:
+        if face.position != (x, y):
+            face.position = (x, y)
+    except AttributeError:
+        if face.x != x or face.y != y:
+            face.x = x
+            face.y = y
+
+def _union(area, x, y, width, height):
+    """Grow the (x, y, w, h) area, which may be None, to cover the given rectangle"""
+    if area is None:
+        return (x, y, width, height)
+    left = min(area[0], x)
+    top = min(area[1], y)
+    right = max(area[0] + area[2], x + width)
+    bottom = max(area[1] + area[3], y + height)
+    return (left, top, right - left, bottom - top)
+
 class Label(displayio.Group):
     """A label displaying a string of text. The origin point set by ``x`` and ``y``
        properties will be the left edge of the bounding box, and in the center of a M
@@ -75,69 +176,95 @@ class Label(displayio.Group):
         self._line_spacing = line_spacing
         self._boundingbox = None
 
+        # the glyph and position shown by each TileGrid in this group, in order
+        self._shown = []
+        # TileGrids no longer shown, kept to be reused, as (glyph, TileGrid) tuples
+        self._spare = []
+        self._dirty_area = None
+
         if text:
             self._update_text(text)
 
 
-    def _update_text(self, new_text): # pylint: disable=too-many-locals
-        x = 0
-        y = 0
-        i = 0
-        old_c = 0
-        y_offset = int((self.font.get_glyph(ord('M')).height -
-                        new_text.count('\n') * self.height * self.line_spacing) / 2)
-        #print("y offset from baseline", y_offset)
-        left = right = top = bottom = 0
-        for character in new_text:
-            if character == '\n':
-                y += int(self.height * self._line_spacing)
-                x = 0
-                continue
-            glyph = self.font.get_glyph(ord(character))
-            if not glyph:
-                continue
-            right = max(right, x+glyph.width)
-            if y == 0:   # first line, find the Ascender height
-                top = min(top, -glyph.height+y_offset)
-            bottom = max(bottom, y-glyph.dy+y_offset)
-            position_y = y - glyph.height - glyph.dy + y_offset
-            position_x = x + glyph.dx
-            if not self._text or old_c >= len(self._text) or character != self._text[old_c]:
-                try:
-                    face = displayio.TileGrid(glyph.bitmap, pixel_shader=self.palette,
-                                              default_tile=glyph.tile_index,
-                                              tile_width=glyph.width, tile_height=glyph.height,
-                                              position=(position_x, position_y))
-                except TypeError:
-                    face = displayio.TileGrid(glyph.bitmap, pixel_shader=self.palette,
-                                              default_tile=glyph.tile_index,
-                                              tile_width=glyph.width, tile_height=glyph.height,
-                                              x=position_x, y=position_y)
-                if i < len(self):
-                    self[i] = face
-                else:
-                    self.append(face)
-            elif self._text and character == self._text[old_c]:
-                try:
-                    self[i].position = (position_x, position_y)
-                except AttributeError:
-                    self[i].x = position_x
-                    self[i].y = position_y
-
-            x += glyph.shift_x
-
-            # TODO skip this for control sequences or non-printables.
-            i += 1
-            old_c += 1
-            # skip all non-prinables in the old string
-            while (self._text and old_c < len(self._text) and
-                   (self._text[old_c] == '\n' or not self.font.get_glyph(ord(self._text[old_c])))):
-                old_c += 1
-        # Remove the rest
-        while len(self) > i:
-            self.pop()
+    def _update_text(self, new_text):
+        placed, self._boundingbox = _layout(self.font, new_text, self._line_spacing)
+        dirty = None
+        for i, (code_point, position_x, position_y) in enumerate(placed):
+            glyph = self.font.get_glyph(code_point)
+            dirty = self._show_glyph(i, glyph, position_x, position_y, dirty)
+        # Put the rest aside for reuse
+        while len(self) > len(placed):
+            glyph, position_x, position_y = self._shown.pop()
+            dirty = _union(dirty, position_x, position_y, glyph.width, glyph.height)
+            self._put_aside(glyph, self.pop())
         self._text = new_text
-        self._boundingbox = (left, top, left+right, bottom-top)
+        self._dirty_area = dirty
+
+    def _show_glyph(self, i, glyph, position_x, position_y, dirty):
+        """Make the i'th TileGrid show glyph at the position, changing as little as possible.
+        Returns dirty grown to cover anything that changed."""
+        # pylint: disable=too-many-arguments
+        if i < len(self._shown):
+            shown, old_x, old_y = self._shown[i]
+            if shown is glyph and old_x == position_x and old_y == position_y:
+                return dirty
+            dirty = _union(dirty, old_x, old_y, shown.width, shown.height)
+            if _same_tiles(self.font, shown, glyph):
+                face = self[i]
+                if shown.tile_index != glyph.tile_index:
+                    face[0] = glyph.tile_index
+                _move(face, position_x, position_y)
+            else:
+                face = self._take_face(glyph, position_x, position_y)
+                old_face = self[i]
+                self[i] = face
+                self._put_aside(shown, old_face)
+            self._shown[i] = (glyph, position_x, position_y)
+        else:
+            self.append(self._take_face(glyph, position_x, position_y))
+            self._shown.append((glyph, position_x, position_y))
+        return _union(dirty, position_x, position_y, glyph.width, glyph.height)
+
+    def _take_face(self, glyph, position_x, position_y):
+        """A TileGrid showing glyph, reused from the spares when possible"""
+        for j, (spare_glyph, face) in enumerate(self._spare):
+            if _same_tiles(self.font, spare_glyph, glyph):
+                self._spare.pop(j)
+                if spare_glyph.tile_index != glyph.tile_index:
+                    face[0] = glyph.tile_index
+                _move(face, position_x, position_y)
+                return face
+        tile_width, tile_height = _tile_size(self.font, glyph)
+        try:
+            face = displayio.TileGrid(glyph.bitmap, pixel_shader=self.palette,
+                                      default_tile=glyph.tile_index,
+                                      tile_width=tile_width, tile_height=tile_height,
+                                      position=(position_x, position_y))
+        except TypeError:
+            face = displayio.TileGrid(glyph.bitmap, pixel_shader=self.palette,
+                                      default_tile=glyph.tile_index,
+                                      tile_width=tile_width, tile_height=tile_height,
+                                      x=position_x, y=position_y)
+        return face
+
+    def _put_aside(self, glyph, face):
+        """Keep a TileGrid that is no longer shown for reuse, up to max_glyphs of them"""
+        self._spare.append((glyph, face))
+        if len(self._spare) > self.width:
+            self._spare.pop(0)
+
+    def measure(self, text):
+        """The (width, height) ``text`` would take up in this label's font and line spacing,
+        without changing the label."""
+        return measure(self.font, text, line_spacing=self._line_spacing)
+
+    @property
+    def dirty_area(self):
+        """An (x, y, w, h) tuple covering every glyph added, removed, moved or changed by the
+        last text update, or None if nothing changed. Like `bounding_box` the first two
+        numbers are offset from the x, y origin of this group. Only that area of the display
+        needs refreshing."""
+        return self._dirty_area
 
     @property
     def bounding_box(self):
@@ -137,7 +137,8 @@ class ESP_SPIcontrol:  # pylint: disable=too-many-public-methods
         self._buffer = bytearray(10)
         self._pbuf = bytearray(1)  # buffer for param read
         self._sendbuf = bytearray(256)  # buffer for command sending
-        self._socknum_ll = [[0]]      # pre-made list of list of socket #
+        self._socknum_ll = [bytearray(1)]   # pre-made list of socket # param
+        self._size_param = bytearray(2)     # pre-made 16 bit size param
 
         self._spi_device = SPIDevice(spi, cs_pin, baudrate=8000000)
         self._cs = cs_pin
@@ -215,8 +216,9 @@ class ESP_SPIcontrol:  # pylint: disable=too-many-public-methods
                 ptr += 1
             self._sendbuf[ptr] = len(param) & 0xFF
             ptr += 1
-            for j, par in enumerate(param):
-                self._sendbuf[ptr+j] = par
+            if not isinstance(param, (bytes, bytearray, memoryview)):
+                param = bytes(param)
+            self._sendbuf[ptr:ptr+len(param)] = param
             ptr += len(param)
         self._sendbuf[ptr] = _END_CMD
 
@@ -279,11 +281,16 @@ class ESP_SPIcontrol:  # pylint: disable=too-many-public-methods
                 raise RuntimeError("ESP32 timed out on SPI select")
 
             self._wait_spi_char(spi, _START_CMD)
-            self._check_data(spi, cmd | _REPLY_FLAG)
+            self._read_bytes(spi, self._buffer, 0, 2)
+            if self._buffer[0] != cmd | _REPLY_FLAG:
+                raise RuntimeError("Expected %02X but got %02X" %
+                                   (cmd | _REPLY_FLAG, self._buffer[0]))
             if num_responses is not None:
-                self._check_data(spi, num_responses)
+                if self._buffer[1] != num_responses:
+                    raise RuntimeError("Expected %02X but got %02X" %
+                                       (num_responses, self._buffer[1]))
             else:
-                num_responses = self._read_byte(spi)
+                num_responses = self._buffer[1]
             for num in range(num_responses):
                 param_len = self._read_byte(spi)
                 if param_len_16:
@@ -300,6 +307,33 @@ class ESP_SPIcontrol:  # pylint: disable=too-many-public-methods
             print("Read %d: " % len(responses[0]), responses)
         return responses
 
+    def _wait_response_into(self, cmd, buffer):
+        """Wait for ready, then read a reply with a single 16 bit long parameter
+        straight into buffer. Returns the length of the parameter"""
+        self._wait_for_ready()
+
+        with self._spi_device as spi:
+            times = time.monotonic()
+            while (time.monotonic() - times) < 1: # wait up to 1000ms
+                if self._ready.value:  # ok ready to send!
+                    break
+            else:
+                raise RuntimeError("ESP32 timed out on SPI select")
+
+            self._wait_spi_char(spi, _START_CMD)
+            # the reply flagged command, the number of parameters and the length
+            self._read_bytes(spi, self._buffer, 0, 4)
+            if self._buffer[0] != cmd | _REPLY_FLAG or self._buffer[1] != 1:
+                raise RuntimeError("Unexpected reply %02X with %d parameters" %
+                                   (self._buffer[0], self._buffer[1]))
+            param_len = (self._buffer[2] << 8) | self._buffer[3]
+            if param_len > len(buffer):
+                raise RuntimeError("Reply of %d bytes is too long" % param_len)
+            if param_len:
+                self._read_bytes(spi, buffer, 0, param_len)
+            self._check_data(spi, _END_CMD)
+        return param_len
+
     def _send_command_get_response(self, cmd, params=None, *,
                                    reply_params=1, sent_param_len_16=False,
                                    recv_param_len_16=False):
@@ -560,13 +594,17 @@ class ESP_SPIcontrol:  # pylint: disable=too-many-public-methods
         if self._debug:
             print("Writing:", buffer)
         self._socknum_ll[0][0] = socket_num
-        resp = self._send_command_get_response(_SEND_DATA_TCP_CMD,
-                                               (self._socknum_ll[0], buffer),
-                                               sent_param_len_16=True)
-
-        sent = resp[0][0]
-        if sent != len(buffer):
-            raise RuntimeError("Failed to send %d bytes (sent %d)" % (len(buffer), sent))
+        # the firmware reports how much was sent in a byte, so send at most 64 at a time
+        # and then check that it all went out just once at the end
+        view = memoryview(buffer)
+        for start in range(0, len(buffer), 64):
+            chunk = view[start:start + 64]
+            resp = self._send_command_get_response(_SEND_DATA_TCP_CMD,
+                                                   (self._socknum_ll[0], chunk),
+                                                   sent_param_len_16=True)
+            sent = resp[0][0]
+            if sent != len(chunk):
+                raise RuntimeError("Failed to send %d bytes (sent %d)" % (len(chunk), sent))
 
         resp = self._send_command_get_response(_DATA_SENT_TCP_CMD, self._socknum_ll)
         if resp[0][0] != 1:
@@ -594,6 +632,18 @@ class ESP_SPIcontrol:  # pylint: disable=too-many-public-methods
                                                recv_param_len_16=True)
         return bytes(resp[0])
 
+    def socket_readinto(self, socket_num, buffer):
+        """Read whatever has arrived on the socket, up to the length of the bytearray or
+        memoryview 'buffer', straight into it. This takes a single command, so there's no
+        need to ask how much is available first. Returns how many bytes were read"""
+        self._socknum_ll[0][0] = socket_num
+        size = len(buffer)
+        self._size_param[0] = size & 0xFF
+        self._size_param[1] = (size >> 8) & 0xFF
+        self._send_command(_GET_DATABUF_TCP_CMD, (self._socknum_ll[0], self._size_param),
+                           param_len_16=True)
+        return self._wait_response_into(_GET_DATABUF_TCP_CMD, buffer)
+
     def socket_connect(self, socket_num, dest, port, conn_mode=TCP_MODE):
         """Open and verify we connected a socket to a destination IP address or hostname
         using the ESP32's internal reference number. By default we use
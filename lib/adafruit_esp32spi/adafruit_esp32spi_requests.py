@@ -47,6 +47,8 @@ license='MIT'
 # pylint: disable=no-name-in-module
 
 import gc
+import os
+import time
 import adafruit_esp32spi.adafruit_esp32spi_socket as socket
 
 _the_interface = None   # pylint: disable=invalid-name
@@ -68,6 +70,13 @@ class Response:
         self.reason = None
         self._read_so_far = 0
         self.headers = {}
+        # body bytes left to read (in this chunk, if chunked), None if we don't know
+        self._remaining = None
+        self._chunked = False
+        # called with the socket instead of closing it, if the connection can be reused
+        self._release = None
+        # the _Saving the body is written to as it's read, if the reply is being cached
+        self._saving = None
 
     def __enter__(self):
         return self
@@ -77,27 +86,95 @@ class Response:
 
     def close(self):
         """Close, delete and collect the response data"""
+        if self._saving:
+            self._saving.finish(False)
+            self._saving = None
         if self.socket:
             self.socket.close()
             del self.socket
         del self._cached
         gc.collect()
 
+    def _done(self, complete):
+        """Hand the socket back for reuse if the whole body was read, otherwise close it"""
+        if self._saving:
+            self._saving.finish(complete)
+            self._saving = None
+        if not self.socket:
+            return
+        if complete and self._release:
+            self._release(self.socket)
+        else:
+            self.socket.close()
+        self.socket = None
+
+    def _body_size(self, size):
+        """How many of the next 'size' bytes are body (or the current chunk of it),
+        or 0 once the whole body has been read"""
+        if not self.socket:
+            return 0
+        if self._chunked and not self._remaining:
+            # the start of the next chunk, which begins with its size in hex
+            self._remaining = int(self.socket.readline().split(b";", 1)[0], 16)
+            if not self._remaining:
+                while self.socket.readline():   # skip any trailers
+                    pass
+                self._done(True)
+                return 0
+        if self._remaining is not None:
+            size = min(size, self._remaining)
+            if not size:
+                self._done(True)
+        return size
+
+    def _body_read(self, data):
+        """Account for the bytes 'data' of the body having been read"""
+        count = len(data)
+        if not count:
+            self._done(False)    # the server stopped sending
+            return
+        if self._saving:
+            self._saving.write(data)
+        self._read_so_far += count
+        if self._remaining is not None:
+            self._remaining -= count
+            if not self._remaining:
+                if self._chunked:
+                    self.socket.readline()   # the end of the chunk
+                else:
+                    self._done(True)
+
+    def _read_body(self, size):
+        """Read up to 'size' more bytes of the body, undoing any chunked encoding.
+        Returns b'' once the whole body has been read"""
+        size = self._body_size(size)
+        if not size:
+            return b""
+        data = self.socket.read(size)
+        self._body_read(data)
+        return data
+
     @property
     def content(self):
         """The HTTP content direct from the socket, as bytes"""
         #print(self.headers)
-        try:
-            content_length = int(self.headers['content-length'])
-        except KeyError:
-            content_length = 0
-        #print("Content length:", content_length)
         if self._cached is None:
             try:
-                self._cached = self.socket.read(content_length)
+                if self._chunked:
+                    content = bytearray()
+                    while True:
+                        chunk = self._read_body(socket.MAX_PACKET)
+                        if not chunk:
+                            break
+                        content.extend(chunk)
+                    self._cached = content
+                elif self._remaining is None:
+                    # no length was given, so take what has arrived
+                    self._cached = self.socket.read(0)
+                else:
+                    self._cached = self._read_body(self._remaining)
             finally:
-                self.socket.close()
-                self.socket = None
+                self._done(False)    # if there's still some left, give up on it
         #print("Buffer length:", len(self._cached))
         return self._cached
 
@@ -122,25 +199,38 @@ class Response:
             raise NotImplementedError("Unicode not supported")
 
         while True:
-            chunk = self.socket.read(chunk_size)
+            chunk = self._read_body(chunk_size)
             if chunk:
                 yield chunk
             else:
                 return
 
-# pylint: disable=too-many-branches, too-many-statements, unused-argument, too-many-arguments, too-many-locals
-def request(method, url, data=None, json=None, headers=None, stream=False, timeout=1):
-    """Perform an HTTP request to the given url which we will parse to determine
-    whether to use SSL ('https://') or not. We can also send some provided 'data'
-    or a json dictionary which we will stringify. 'headers' is optional HTTP headers
-    sent along. 'stream' will determine if we buffer everything, or whether to only
-    read only when requested
-    """
-    global _the_interface   # pylint: disable=global-statement, invalid-name
-
-    if not headers:
-        headers = {}
-
+    def readinto(self, buf, *, wait=True):
+        """Read the next part of the body into the bytearray or memoryview 'buf',
+        returning how many bytes were read, which is 0 once the body is all read.
+        With 'wait' False only what has already arrived is read, and like a non-blocking
+        stream it returns None if nothing has yet"""
+        if not wait and self.socket and (self._chunked or self._remaining != 0):
+            available = self.socket.available()
+            if not available:
+                if self.socket.connected():
+                    return None
+                self._body_read(b"")    # the server is done
+                return 0
+        size = self._body_size(len(buf))
+        if not size:
+            return 0
+        if not wait:
+            # reading the size of a chunk may have used up what had arrived
+            size = min(size, self.socket.available())
+            if not size:
+                return None
+        count = self.socket.readinto(buf, size)
+        self._body_read(memoryview(buf)[:count])
+        return count
+
+def _parse_url(url):
+    """Split url into its protocol, host, port and path"""
     try:
         proto, dummy, host, path = url.split("/", 3)
         # replace spaces in path
@@ -158,79 +248,574 @@ def request(method, url, data=None, json=None, headers=None, stream=False, timeo
     if ":" in host:
         host, port = host.split(":", 1)
         port = int(port)
-
+    return proto, host, port, path
+
+def _socket_for(proto, host, port):
+    """A new socket for host and port, with the connection type and address to connect
+    it to"""
+    if proto == "https:":
+        # for SSL we need to know the host name
+        return socket.socket(), _the_interface.TLS_MODE, (host, port)
     addr_info = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0]
     sock = socket.socket(addr_info[0], addr_info[1], addr_info[2])
-    resp = Response(sock)  # our response
-
-    sock.settimeout(timeout)  # socket read timeout
+    return sock, _the_interface.TCP_MODE, addr_info[-1]
 
+def _connect(proto, host, port):
+    """A new socket connected to host and port"""
+    sock, conntype, address = _socket_for(proto, host, port)
     try:
-        if proto == "https:":
-            conntype = _the_interface.TLS_MODE
-            sock.connect((host, port), conntype)  # for SSL we need to know the host name
-        else:
-            conntype = _the_interface.TCP_MODE
-            sock.connect(addr_info[-1], conntype)
-        sock.write(b"%s /%s HTTP/1.0\r\n" % (method, path))
-        if "Host" not in headers:
-            sock.write(b"Host: %s\r\n" % host)
-        if "User-Agent" not in headers:
-            sock.write(b"User-Agent: Adafruit CircuitPython\r\n")
-        # Iterate over keys to avoid tuple alloc
-        for k in headers:
-            sock.write(k.encode())
-            sock.write(b": ")
-            sock.write(headers[k].encode())
-            sock.write(b"\r\n")
-        if json is not None:
-            assert data is None
-            try:
-                import json as json_module
-            except ImportError:
-                import ujson as json_module
-            data = json_module.dumps(json)
-            sock.write(b"Content-Type: application/json\r\n")
-        if data:
-            sock.write(b"Content-Length: %d\r\n" % len(data))
+        sock.connect(address, conntype)
+    except:
+        sock.close()
+        raise
+    return sock
+
+def _connect_steps(resp, proto, host, port):
+    """Generator that connects a new socket to host and port for resp, yielding while
+    the connection is being made"""
+    resp.socket, conntype, address = _socket_for(proto, host, port)
+    resp.socket.start_connect(address, conntype)
+    stamp = time.monotonic()
+    while not resp.socket.connected():
+        if time.monotonic() - stamp > 3:
+            raise RuntimeError("Failed to connect to host", host)
+        yield
+
+# pylint: disable=too-many-arguments
+def _send(sock, method, host, path, headers, data, json, version=b"HTTP/1.0"):
+    """Write the request line, headers and any data to sock"""
+    sock.write(b"%s /%s %s\r\n" % (method.encode(), path.encode(), version))
+    if "Host" not in headers:
+        sock.write(b"Host: %s\r\n" % host.encode())
+    if "User-Agent" not in headers:
+        sock.write(b"User-Agent: Adafruit CircuitPython\r\n")
+    # Iterate over keys to avoid tuple alloc
+    for k in headers:
+        sock.write(k.encode())
+        sock.write(b": ")
+        sock.write(headers[k].encode())
         sock.write(b"\r\n")
-        if data:
-            sock.write(bytes(data, 'utf-8'))
-
+    if json is not None:
+        assert data is None
+        try:
+            import json as json_module
+        except ImportError:
+            import ujson as json_module
+        data = json_module.dumps(json)
+        sock.write(b"Content-Type: application/json\r\n")
+    if data:
+        sock.write(b"Content-Length: %d\r\n" % len(data))
+    sock.write(b"\r\n")
+    if data:
+        sock.write(bytes(data, 'utf-8'))
+# pylint: enable=too-many-arguments
+
+def _receive(sock, resp):
+    """Read the status line and headers of the reply into resp"""
+    line = sock.readline()
+    #print(line)
+    line = line.split(None, 2)
+    status = int(line[1])
+    reason = ""
+    if len(line) > 2:
+        reason = line[2].rstrip()
+    while True:
         line = sock.readline()
-        #print(line)
-        line = line.split(None, 2)
-        status = int(line[1])
-        reason = ""
-        if len(line) > 2:
-            reason = line[2].rstrip()
-        while True:
-            line = sock.readline()
-            if not line or line == b"\r\n":
-                break
+        if not line or line == b"\r\n":
+            break
+
+        #print("**line: ", line)
+        title, content = line.split(b': ', 1)
+        if title and content:
+            title = str(title.lower(), 'utf-8')
+            content = str(content, 'utf-8')
+            resp.headers[title] = content
+
+        if line.startswith(b"Location:") and not 200 <= status <= 299:
+            raise NotImplementedError("Redirects not yet supported")
+
+    resp.status_code = status
+    resp.reason = reason
+    # pylint: disable=protected-access
+    if "chunked" in resp.headers.get("transfer-encoding", ""):
+        resp._chunked = True
+        resp._remaining = 0
+    elif "content-length" in resp.headers:
+        resp._remaining = int(resp.headers["content-length"])
+
+# pylint: disable=too-many-arguments
+def _exchange_steps(resp, method, host, path, headers, data, json, timeout, version):
+    """Generator that sends a request on resp's socket, yielding while it waits for
+    the reply, then reads the status line and headers into resp"""
+    sock = resp.socket
+    _send(sock, method, host, path, headers, data, json, version)
+    stamp = time.monotonic()
+    # the first check sends the request, as writes are held back until we read
+    while not sock.available():
+        if not sock.connected() and not sock.available():
+            raise RuntimeError("Connection closed before the reply")
+        if time.monotonic() - stamp > timeout:
+            raise RuntimeError("Didn't receive full response, failing out")
+        yield
+    sock.settimeout(timeout)
+    _receive(sock, resp)
+# pylint: enable=too-many-arguments
+
+# pylint: disable=too-many-arguments, unused-argument
+def request(method, url, data=None, json=None, headers=None, stream=False, timeout=1):
+    """Perform an HTTP request to the given url which we will parse to determine
+    whether to use SSL ('https://') or not. We can also send some provided 'data'
+    or a json dictionary which we will stringify. 'headers' is optional HTTP headers
+    sent along. 'stream' will determine if we buffer everything, or whether to only
+    read only when requested
+    """
+    if not headers:
+        headers = {}
 
-            #print("**line: ", line)
-            title, content = line.split(b': ', 1)
-            if title and content:
-                title = str(title.lower(), 'utf-8')
-                content = str(content, 'utf-8')
-                resp.headers[title] = content
+    proto, host, port, path = _parse_url(url)
+    sock = _connect(proto, host, port)
+    resp = Response(sock)  # our response
 
-            if line.startswith(b"Transfer-Encoding:"):
-                if b"chunked" in line:
-                    raise ValueError("Unsupported " + line)
-            elif line.startswith(b"Location:") and not 200 <= status <= 299:
-                raise NotImplementedError("Redirects not yet supported")
+    sock.settimeout(timeout)  # socket read timeout
 
+    try:
+        _send(sock, method, host, path, headers, data, json)
+        _receive(sock, resp)
     except:
         sock.close()
         raise
 
-    resp.status_code = status
-    resp.reason = reason
     return resp
-# pylint: enable=too-many-branches, too-many-statements, unused-argument
-# pylint: enable=too-many-arguments, too-many-locals
+# pylint: enable=too-many-arguments, unused-argument
+
+# pylint: disable=too-many-arguments
+def request_steps(resp, method, url, data=None, json=None, headers=None, timeout=5):
+    """Generator that makes the same request as `request`, a step at a time so other work
+    can carry on in between: each step polls the ESP32 once, or sends the request. Once
+    it's done, 'resp' (made with ``Response(None)``) has the status and headers, and the
+    body can be read as it arrives with ``resp.readinto(buf, wait=False)``. 'timeout' is
+    how long to wait for the reply. Closing the generator early closes the socket"""
+    if not headers:
+        headers = {}
+    proto, host, port, path = _parse_url(url)
+    try:
+        for _ in _connect_steps(resp, proto, host, port):
+            yield
+        for _ in _exchange_steps(resp, method, host, path, headers, data, json, timeout,
+                                 b"HTTP/1.0"):
+            yield
+    except:
+        resp._done(False)   # pylint: disable=protected-access
+        raise
+# pylint: enable=too-many-arguments
+
+class Session:
+    """Sends HTTP/1.1 requests, keeping the connection to each server open afterwards
+    so the next request to the same host, port and protocol doesn't have to connect
+    (and do a TLS handshake) again. Up to 'max_idle' connections are kept, each for
+    at most 'idle_timeout' seconds. The ESP32 only has a few sockets, so keep this small!
+    """
+
+    def __init__(self, max_idle=2, idle_timeout=30):
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self._idle = []    # [(proto, host, port), socket, monotonic time it went idle]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close all the idle connections"""
+        for entry in self._idle:
+            entry[1].close()
+        self._idle = []
+
+    def _take(self, key):
+        """Remove and return an idle connection for key, or None if there isn't one"""
+        now = time.monotonic()
+        found = None
+        idle = []
+        for entry in self._idle:
+            if now - entry[2] > self.idle_timeout or not entry[1].connected():
+                entry[1].close()
+            elif found is None and entry[0] == key:
+                found = entry[1]
+            else:
+                idle.append(entry)
+        self._idle = idle
+        return found
+
+    def _release(self, key, sock):
+        """Keep sock for reuse, closing the longest idle connection if there are too many"""
+        self._idle.append([key, sock, time.monotonic()])
+        while len(self._idle) > self.max_idle:
+            self._idle.pop(0)[1].close()
+
+    @staticmethod
+    def _keep_alive(headers):
+        """headers, asking for the connection to be kept open"""
+        if not headers:
+            headers = {}
+        if "Connection" not in headers:
+            headers = dict(headers)
+            headers["Connection"] = "keep-alive"
+        return headers
+
+    def _received(self, resp, method, key):
+        """Set resp up to hand its connection back to us once its body has been read"""
+        # pylint: disable=protected-access
+        if resp.headers.get("connection", "").lower() != "close":
+            resp._release = lambda s: self._release(key, s)
+        if method == "HEAD" or resp.status_code in (204, 304):
+            # there's no body
+            resp._chunked = False
+            resp._remaining = 0
+
+    # pylint: disable=too-many-arguments
+    def request(self, method, url, data=None, json=None, headers=None, stream=False, timeout=1):
+        """Perform an HTTP request like `request`, reusing an idle connection to the
+        server if we have one. Unless 'stream' is set, the body is read straight away
+        so the connection can be reused by the next request."""
+        headers = self._keep_alive(headers)
+        proto, host, port, path = _parse_url(url)
+        key = (proto, host, port)
+        sock = self._take(key)
+        while True:
+            reused = sock is not None
+            if not reused:
+                sock = _connect(proto, host, port)
+            sock.settimeout(timeout)
+            resp = Response(sock)
+            try:
+                _send(sock, method, host, path, headers, data, json, b"HTTP/1.1")
+                _receive(sock, resp)
+                break
+            except (RuntimeError, IndexError, ValueError):
+                sock.close()
+                # the server may have dropped an idle connection, so try a fresh one
+                if not reused:
+                    raise
+                sock = None
+            except:
+                sock.close()
+                raise
+
+        self._received(resp, method, key)
+        if not stream:
+            resp.content    # pylint: disable=pointless-statement
+        return resp
+
+    def request_steps(self, resp, method, url, data=None, json=None, headers=None,
+                      timeout=5):
+        """Generator that makes a request a step at a time like `request_steps`, reusing
+        an idle connection to the server if we have one. Once the whole body has been
+        read the connection is kept for the next request."""
+        headers = self._keep_alive(headers)
+        proto, host, port, path = _parse_url(url)
+        key = (proto, host, port)
+        resp.socket = self._take(key)
+        try:
+            if resp.socket:
+                try:
+                    for _ in _exchange_steps(resp, method, host, path, headers, data, json,
+                                             timeout, b"HTTP/1.1"):
+                        yield
+                except (RuntimeError, IndexError, ValueError):
+                    # the server may have dropped the idle connection, so try a fresh one
+                    resp.socket.close()
+                    resp.socket = None
+                    resp.headers = {}
+            if not resp.socket:
+                for _ in _connect_steps(resp, proto, host, port):
+                    yield
+                for _ in _exchange_steps(resp, method, host, path, headers, data, json,
+                                         timeout, b"HTTP/1.1"):
+                    yield
+        except:
+            resp._done(False)   # pylint: disable=protected-access
+            raise
+        self._received(resp, method, key)
+    # pylint: enable=too-many-arguments
+
+    def head(self, url, **kw):
+        """Send HTTP HEAD request"""
+        return self.request("HEAD", url, **kw)
+
+    def get(self, url, **kw):
+        """Send HTTP GET request"""
+        return self.request("GET", url, **kw)
+
+    def post(self, url, **kw):
+        """Send HTTP POST request"""
+        return self.request("POST", url, **kw)
+
+    def put(self, url, **kw):
+        """Send HTTP PUT request"""
+        return self.request("PUT", url, **kw)
+
+    def patch(self, url, **kw):
+        """Send HTTP PATCH request"""
+        return self.request("PATCH", url, **kw)
+
+    def delete(self, url, **kw):
+        """Send HTTP DELETE request"""
+        return self.request("DELETE", url, **kw)
+
+def _fnv1a(text):
+    """A 32 bit FNV-1a hash of text, which unlike hash() won't change between versions"""
+    value = 0x811C9DC5
+    for byte in text.encode():
+        value = ((value ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return value
+
+def _max_age(headers):
+    """How many seconds a reply can be used for without checking with the server, going
+    by its Cache-Control header: 0 if it has to be checked every time, None if it
+    mustn't be kept at all"""
+    max_age = 0
+    for directive in headers.get("cache-control", "").split(","):
+        directive = directive.strip().lower()
+        if directive == "no-store":
+            return None
+        if directive == "no-cache":
+            max_age = -1
+        elif directive.startswith("max-age=") and max_age >= 0:
+            try:
+                max_age = int(directive[8:])
+            except ValueError:
+                pass
+    return min(max(max_age, 0), 999999999)
+
+class _CachedBody:
+    """Stands in for the socket of a Response, reading the body of a cached reply from
+    its file"""
+
+    def __init__(self, file, size):
+        self._file = file
+        self._left = size
+
+    def read(self, size=0):
+        """Read up to 'size' bytes, or the rest if 'size' is 0"""
+        data = self._file.read(min(size, self._left) if size else self._left)
+        self._left -= len(data)
+        return data
+
+    def readinto(self, buf, nbytes=0):
+        """Read up to 'nbytes' (or as many as fit) into 'buf', returning how many were read"""
+        view = memoryview(buf)
+        count = self._file.readinto(view[:min(nbytes or len(view), self._left)])
+        self._left -= count
+        return count
+
+    def available(self):
+        """How many bytes are left"""
+        return self._left
+
+    def connected(self):    # pylint: disable=no-self-use
+        """There's no more coming than is in the file"""
+        return False
+
+    def close(self):
+        """Close the file"""
+        self._file.close()
+
+class _Saving:
+    """Writes a reply's body to a temporary file as it's read, and puts it in place of
+    the cached reply only once the whole body is in, so a cut-off one is never used"""
+
+    def __init__(self, file, filename):
+        self._file = file
+        self._filename = filename
+        self._failed = False
+
+    def write(self, data):
+        """Save the next part of the body"""
+        if self._failed:
+            return
+        try:
+            self._file.write(data)
+        except OSError:
+            self._failed = True     # most likely the filesystem is full
+
+    def finish(self, complete):
+        """Keep the saved reply if 'complete' is True, otherwise throw it away"""
+        temporary = self._filename + ".tmp"
+        try:
+            self._file.close()
+            if complete and not self._failed:
+                try:
+                    os.remove(self._filename)
+                except OSError:
+                    pass
+                os.rename(temporary, self._filename)
+            else:
+                os.remove(temporary)
+        except OSError:
+            pass
+
+class ResponseCache:
+    """Keeps the replies to GET requests in files in 'directory', to save fetching them
+    again. While a reply is fresh, going by its ``Cache-Control: max-age``, it's used
+    without asking the server at all. After that, if it came with an ETag or
+    Last-Modified header, the server is asked to only send it again if it has changed.
+    Replies marked ``no-store`` aren't kept. Requests go through 'session' if one is
+    given, otherwise each makes a new connection.
+
+    A reply is saved as its body is read, so it's only kept if the body is read to the
+    end. Cached replies are read from their files the same way, a piece at a time.
+    If the filesystem can't be written (say CIRCUITPY is read-only) nothing is kept.
+    """
+
+    def __init__(self, directory, session=None):
+        self.directory = directory
+        self._session = session
+
+    def filename(self, url):
+        """The file the reply to url is kept in"""
+        return "%s/%08x" % (self.directory, _fnv1a(url))
+
+    def get(self, url, headers=None, timeout=1):
+        """Send an HTTP GET request like `get`, unless the cached reply is fresh. The body
+        is left to be read, and a cached reply's is read from its file"""
+        filename, entry = self._lookup(url)
+        resp = Response(None)
+        if self._serve_fresh(resp, filename, entry):
+            return resp
+        headers = self._conditional(headers, entry)
+        if self._session:
+            resp = self._session.request("GET", url, headers=headers, stream=True,
+                                         timeout=timeout)
+        else:
+            resp = request("GET", url, headers=headers, timeout=timeout)
+        self._received(resp, filename, entry)
+        return resp
+
+    def get_steps(self, resp, url, headers=None, timeout=5):
+        """Generator that sends an HTTP GET request a step at a time like `request_steps`,
+        unless the cached reply is fresh. Either way, once it's done 'resp' is the reply,
+        and the body can be read with ``resp.readinto(buf, wait=False)``"""
+        filename, entry = self._lookup(url)
+        if self._serve_fresh(resp, filename, entry):
+            return
+        headers = self._conditional(headers, entry)
+        if self._session:
+            steps = self._session.request_steps(resp, "GET", url, headers=headers,
+                                                timeout=timeout)
+        else:
+            steps = request_steps(resp, "GET", url, headers=headers, timeout=timeout)
+        for _ in steps:
+            yield
+        self._received(resp, filename, entry)
+
+    def _lookup(self, url):
+        """The file the reply to url is kept in, and the (ETag, Last-Modified, time saved,
+        max-age) the reply was saved with, or None if it hasn't been"""
+        filename = self.filename(url)
+        try:
+            with open(filename, "rb") as file:
+                etag, modified, saved, max_age = str(file.readline(), "utf-8").rstrip(
+                    "\n").split("\t")
+            return filename, (etag, modified, int(saved), int(max_age))
+        except (OSError, ValueError):
+            return filename, None
+
+    @staticmethod
+    def _serve(resp, filename, entry):
+        """Turn resp into the cached reply in filename, with its body read from the file"""
+        # pylint: disable=protected-access
+        file = open(filename, "rb")
+        try:
+            size = os.stat(filename)[6] - len(file.readline())
+        except:
+            file.close()
+            raise
+        resp.socket = _CachedBody(file, size)
+        resp.status_code = 200
+        resp.reason = b"OK"
+        resp.headers = {}
+        if entry[0]:
+            resp.headers["etag"] = entry[0]
+        if entry[1]:
+            resp.headers["last-modified"] = entry[1]
+        resp._chunked = False
+        resp._remaining = size
+        resp._release = None
+
+    def _serve_fresh(self, resp, filename, entry):
+        """Turn resp into the cached reply if it's still fresh. Returns whether it was"""
+        if not entry or not entry[2] <= time.time() < entry[2] + entry[3]:
+            return False
+        try:
+            self._serve(resp, filename, entry)
+        except OSError:
+            return False
+        return True
+
+    @staticmethod
+    def _conditional(headers, entry):
+        """headers, plus the ETag and Last-Modified of the cached reply, so the server
+        can tell us if it hasn't changed"""
+        if not entry or not (entry[0] or entry[1]):
+            return headers
+        headers = dict(headers or {})
+        if entry[0]:
+            headers["If-None-Match"] = entry[0]
+        if entry[1]:
+            headers["If-Modified-Since"] = entry[1]
+        return headers
+
+    def _received(self, resp, filename, entry):
+        """Turn resp into the cached reply if the server says it hasn't changed, or set
+        it up to be saved as it's read if it's a new reply that can be kept"""
+        # pylint: disable=protected-access
+        max_age = _max_age(resp.headers)
+        if resp.status_code == 304 and entry:
+            resp._done(resp._remaining == 0)
+            if max_age:
+                # it's fresh again, so start its max-age over
+                try:
+                    with open(filename, "r+b") as file:
+                        file.seek(len(entry[0].encode()) + len(entry[1].encode()) + 2)
+                        file.write(b"%010d\t%010d" % (time.time(), max_age))
+                except OSError:
+                    pass
+            try:
+                self._serve(resp, filename, entry)
+            except OSError:
+                raise RuntimeError("Cached reply is missing")
+            return
+        if resp.status_code != 200:
+            return
+        if max_age is None:
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+            return
+        etag = resp.headers.get("etag", "")
+        modified = resp.headers.get("last-modified", "")
+        # the end of a body without a length can't be told from it being cut off
+        if not (etag or modified or max_age) or (resp._remaining is None and
+                                                 not resp._chunked):
+            return
+        try:
+            try:
+                os.mkdir(self.directory)
+            except OSError:
+                pass    # already there
+            file = open(filename + ".tmp", "wb")
+            try:
+                file.write(b"%s\t%s\t%010d\t%010d\n" % (etag.encode(), modified.encode(),
+                                                         time.time(), max_age))
+            except:
+                file.close()
+                raise
+        except OSError:
+            return
+        resp._saving = _Saving(file, filename)
 
 def head(url, **kw):
     """Send HTTP HEAD request"""
@@ -31,7 +31,6 @@ A socket compatible interface thru the ESP SPI command set
 
 
 import time
-import gc
 from micropython import const
 
 _the_interface = None   # pylint: disable=invalid-name
@@ -39,19 +38,56 @@ def set_interface(iface):
     """Helper to set the global internet interface"""
     global _the_interface   # pylint: disable=global-statement, invalid-name
     _the_interface = iface
+    _dns_cache.clear()
 
 SOCK_STREAM = const(1)
 AF_INET = const(2)
 
 MAX_PACKET = const(4000)
 
+# The ESP32 doesn't tell us how long a lookup is good for, so we pick: addresses are
+# kept for DNS_TTL seconds, and failed lookups aren't retried for DNS_NEGATIVE_TTL
+DNS_TTL = 300
+DNS_NEGATIVE_TTL = 30
+DNS_CACHE_SIZE = const(8)
+_dns_cache = {}     # host -> (packed address or None if the lookup failed, expiry time)
+
+def _resolve(host):
+    """Look up host, using the cache if we can"""
+    now = time.monotonic()
+    entry = _dns_cache.get(host)
+    if entry and now < entry[1]:
+        if entry[0] is None:
+            raise RuntimeError("Failed to request hostname")
+        return entry[0]
+    if len(_dns_cache) >= DNS_CACHE_SIZE and host not in _dns_cache:
+        # make room by dropping whichever entry expires first
+        oldest = min(_dns_cache, key=lambda h: _dns_cache[h][1])
+        del _dns_cache[oldest]
+    try:
+        ipaddr = _the_interface.get_host_by_name(host)
+    except RuntimeError:
+        _dns_cache[host] = (None, now + DNS_NEGATIVE_TTL)
+        raise
+    _dns_cache[host] = (ipaddr, now + DNS_TTL)
+    return ipaddr
+
+def preresolve(*hosts):
+    """Look up hosts ahead of time so connecting to them later doesn't have to wait
+    for DNS. Hosts that can't be found are remembered as such, rather than raising"""
+    for host in hosts:
+        try:
+            _resolve(host)
+        except RuntimeError:
+            pass
+
 # pylint: disable=too-many-arguments, unused-argument
 def getaddrinfo(host, port, family=0, socktype=0, proto=0, flags=0):
     """Given a hostname and a port name, return a 'socket.getaddrinfo'
     compatible list of tuples. Honestly, we ignore anything but host & port"""
     if not isinstance(port, int):
         raise RuntimeError("Port must be an integer")
-    ipaddr = _the_interface.get_host_by_name(host)
+    ipaddr = _resolve(host)
     return [(AF_INET, socktype, proto, '', (ipaddr, port))]
 # pylint: enable=too-many-arguments, unused-argument
 
@@ -64,7 +100,12 @@ class socket:
             raise RuntimeError("Only AF_INET family supported")
         if type != SOCK_STREAM:
             raise RuntimeError("Only SOCK_STREAM type supported")
-        self._buffer = b''
+        # received data waits in a ring buffer, starting at _start and _count bytes long
+        self._buffer = bytearray(MAX_PACKET)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._count = 0
+        self._outgoing = []     # writes waiting to be sent together
         self._socknum = _the_interface.get_socket()
         self.settimeout(0)
 
@@ -77,72 +118,145 @@ class socket:
             conntype = _the_interface.TCP_MODE
         if not _the_interface.socket_connect(self._socknum, host, port, conn_mode=conntype):
             raise RuntimeError("Failed to connect to host", host)
-        self._buffer = b''
+        self._start = self._count = 0
+
+    def start_connect(self, address, conntype=None):
+        """Start connecting the socket like `connect` does, without waiting for the
+        connection to be made. Poll `connected` to find out when it has been"""
+        host, port = address
+        if conntype is None:
+            conntype = _the_interface.TCP_MODE
+        _the_interface.socket_open(self._socknum, host, port, conn_mode=conntype)
+        self._start = self._count = 0
+
+    def write(self, data):
+        """Send some data to the socket. Writes are held back and sent all together
+        the next time we read (or close), so a request goes out in as few SPI
+        transactions as possible"""
+        self._outgoing.append(data)
+
+    def _flush(self):
+        """Send any held back writes"""
+        if self._outgoing:
+            data = b''.join(self._outgoing)
+            self._outgoing = []
+            _the_interface.socket_write(self._socknum, data)
 
-    def write(self, data):         # pylint: disable=no-self-use
-        """Send some data to the socket"""
-        _the_interface.socket_write(self._socknum, data)
-        gc.collect()
+    def _fill(self):
+        """Move what the interface has received into the free space after the buffered
+        data, returning how many bytes were moved"""
+        self._flush()
+        size = len(self._buffer)
+        if not self._count:
+            self._start = 0
+        end = (self._start + self._count) % size
+        if end < self._start or self._count == size:
+            space = self._start - end
+        else:
+            space = size - end
+        received = _the_interface.socket_readinto(self._socknum, self._view[end:end + space])
+        self._count += received
+        return received
+
+    def _take(self, dest, size):
+        """Move 'size' buffered bytes into the memoryview 'dest'"""
+        first = min(size, len(self._buffer) - self._start)
+        dest[:first] = self._view[self._start:self._start + first]
+        if size > first:
+            dest[first:size] = self._view[:size - first]
+        self._start = (self._start + size) % len(self._buffer)
+        self._count -= size
+
+    def _take_bytes(self, size):
+        """Remove 'size' buffered bytes, returning them as bytes"""
+        start = self._start
+        if start + size <= len(self._buffer):
+            data = bytes(self._view[start:start + size])
+        else:
+            data = bytes(self._view[start:]) + bytes(self._view[:start + size - len(self._buffer)])
+        self._start = (start + size) % len(self._buffer)
+        self._count -= size
+        return data
 
     def readline(self):
         """Attempt to return as many bytes as we can up to but not including '\r\n'"""
         #print("Socket readline")
         stamp = time.monotonic()
-        while b'\r\n' not in self._buffer:
+        size = len(self._buffer)
+        scanned = 1
+        while True:
+            # look for the end of a line in what's buffered, picking up where we left off
+            while scanned < self._count:
+                if (self._buffer[(self._start + scanned) % size] == 0x0A and
+                        self._buffer[(self._start + scanned - 1) % size] == 0x0D):
+                    firstline = self._take_bytes(scanned - 1)
+                    self._start = (self._start + 2) % size
+                    self._count -= 2
+                    return firstline
+                scanned += 1
+            if self._count == size:
+                self.close()
+                raise RuntimeError("Line too long for the receive buffer")
             # there's no line already in there, read some more
-            avail = min(_the_interface.socket_available(self._socknum), MAX_PACKET)
-            if avail:
-                self._buffer += _the_interface.socket_read(self._socknum, avail)
+            if self._fill():
+                stamp = time.monotonic()
             elif self._timeout > 0 and time.monotonic() - stamp > self._timeout:
                 self.close()  # Make sure to close socket so that we don't exhaust sockets.
                 raise RuntimeError("Didn't receive full response, failing out")
-        firstline, self._buffer = self._buffer.split(b'\r\n', 1)
-        gc.collect()
-        return firstline
+
+    def readinto(self, buf, nbytes=0):
+        """Read up to 'nbytes' (default: as many as fit) into the bytearray or memoryview
+        'buf', waiting for them until there's a gap of more than the timeout. Returns
+        how many bytes were read"""
+        self._flush()
+        view = memoryview(buf)
+        size = nbytes or len(view)
+        received = 0
+        stamp = time.monotonic()
+        while received < size:
+            if self._count:
+                count = min(self._count, size - received)
+                self._take(view[received:], count)
+                received += count
+                continue
+            # nothing is buffered, so go straight to the caller's buffer
+            count = min(size - received, MAX_PACKET)
+            count = _the_interface.socket_readinto(self._socknum,
+                                                   view[received:received + count])
+            if count:
+                stamp = time.monotonic()
+                received += count
+            elif self._timeout > 0 and time.monotonic() - stamp > self._timeout:
+                break
+        return received
 
     def read(self, size=0):
         """Read up to 'size' bytes from the socket, this may be buffered internally!
         If 'size' isnt specified, return everything in the buffer."""
         #print("Socket read", size)
         if size == 0:   # read as much as we can at the moment
-            while True:
-                avail = min(_the_interface.socket_available(self._socknum), MAX_PACKET)
-                if avail:
-                    self._buffer += _the_interface.socket_read(self._socknum, avail)
-                else:
-                    break
-            gc.collect()
-            ret = self._buffer
-            self._buffer = b''
-            gc.collect()
-            return ret
-        stamp = time.monotonic()
+            received = b''
+            while self._fill() or self._count:
+                received += self._take_bytes(self._count)
+            return received
+        if self._count >= size:
+            return self._take_bytes(size)
+        buf = bytearray(size)
+        received = self.readinto(buf)
+        if received == size:
+            return bytes(buf)
+        return bytes(memoryview(buf)[:received])
 
-        to_read = size - len(self._buffer)
-        received = []
-        while to_read > 0:
-            #print("Bytes to read:", to_read)
-            avail = min(_the_interface.socket_available(self._socknum), MAX_PACKET)
-            if avail:
-                stamp = time.monotonic()
-                recv = _the_interface.socket_read(self._socknum, min(to_read, avail))
-                received.append(recv)
-                to_read -= len(recv)
-                gc.collect()
-            if self._timeout > 0 and time.monotonic() - stamp > self._timeout:
-                break
-        #print(received)
-        self._buffer += b''.join(received)
+    def available(self):
+        """How many received bytes can be read without waiting. Sends any held back
+        writes, and checks with the interface for more if none are buffered"""
+        if not self._count:
+            self._fill()
+        return self._count
 
-        ret = None
-        if len(self._buffer) == size:
-            ret = self._buffer
-            self._buffer = b''
-        else:
-            ret = self._buffer[:size]
-            self._buffer = self._buffer[size:]
-        gc.collect()
-        return ret
+    def connected(self):
+        """Whether the socket is still connected to the remote end"""
+        return _the_interface.socket_connected(self._socknum)
 
     def settimeout(self, value):
         """Set the read timeout for sockets, if value is 0 it will block"""
@@ -150,5 +264,8 @@ class socket:
 
     def close(self):
         """Close the socket, after reading whatever remains"""
-        _the_interface.socket_close(self._socknum)
+        try:
+            self._flush()
+        finally:
+            _the_interface.socket_close(self._socknum)
 # pylint: enable=unused-argument, redefined-builtin, invalid-name
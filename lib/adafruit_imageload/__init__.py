@@ -32,7 +32,7 @@ Load pixel values (indices or colors) into a bitmap and colors into a palette.
 __version__ = "0.9.1"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_ImageLoad.git"
 
-def load(filename, *, bitmap=None, palette=None):
+def load(filename, *, bitmap=None, palette=None, region=None):
     """Load pixel values (indices or colors) into a bitmap and colors into a palette.
 
        bitmap is the desired type. It must take width, height and color_depth in the constructor. It
@@ -40,14 +40,57 @@ def load(filename, *, bitmap=None, palette=None):
 
        palette is the desired pallete type. The constructor should take the number of colors and
        support assignment to indices via [].
+
+       region is the part of the image to load, as an (x, y, width, height) tuple. Only those
+       pixels are decoded, into a bitmap the size of the region.
     """
     with open(filename, "rb") as file:
-        header = file.read(3)
-        file.seek(0)
-        if header.startswith(b"BM"):
-            from . import bmp
-            return bmp.load(file, bitmap=bitmap, palette=palette)
-        if header.startswith(b"P"):
-            from . import pnm
-            return pnm.load(file, header, bitmap=bitmap, palette=palette)
-        raise RuntimeError("Unsupported image format")
+        return _load(file, bitmap, palette, region)
+
+
+def load_sprite(filename, index, tile_width, tile_height, *, bitmap=None, palette=None):
+    """Load one tile of a sprite sheet, an image made of a grid of same sized tiles numbered from
+       0 left to right then top to bottom, the way `displayio.TileGrid` numbers them.
+
+       Takes the same bitmap and palette types as `load`.
+    """
+    with open(filename, "rb") as file:
+        width, height = _size(file)
+        columns = width // tile_width
+        if not 0 <= index < columns * (height // tile_height):
+            raise IndexError("sprite index out of range")
+        region = ((index % columns) * tile_width, (index // columns) * tile_height,
+                  tile_width, tile_height)
+        return _load(file, bitmap, palette, region)
+
+
+def size(filename):
+    """The width and height of the image in filename, read from its header"""
+    with open(filename, "rb") as file:
+        return _size(file)
+
+
+def _load(file, bitmap, palette, region):
+    file.seek(0)
+    header = file.read(3)
+    file.seek(0)
+    if header.startswith(b"BM"):
+        from . import bmp
+        return bmp.load(file, bitmap=bitmap, palette=palette, region=region)
+    if header.startswith(b"P"):
+        from . import pnm
+        return pnm.load(file, header, bitmap=bitmap, palette=palette, region=region)
+    raise RuntimeError("Unsupported image format")
+
+
+def _size(file):
+    file.seek(0)
+    header = file.read(3)
+    file.seek(0)
+    if header.startswith(b"BM"):
+        from . import bmp
+        return bmp.size(file)
+    if header.startswith(b"P"):
+        from . import pnm
+        return pnm.size(file)
+    raise RuntimeError("Unsupported image format")
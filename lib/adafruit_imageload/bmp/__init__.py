@@ -32,33 +32,73 @@ Load pixel values (indices or colors) into a bitmap and colors into a palette fr
 __version__ = "0.9.1"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_ImageLoad.git"
 
-def load(file, *, bitmap=None, palette=None):
+def size(file):
+    """The width and height of the bmp image in the open ``file``"""
+    file.seek(0x12)
+    width = int.from_bytes(file.read(4), 'little')
+    height = int.from_bytes(file.read(4), 'little')
+    if height >= 0x80000000:
+        height = 0x100000000 - height
+    return width, height
+
+
+def load(file, *, bitmap=None, palette=None, region=None):
     """Loads a bmp image from the open ``file``.
 
        Returns tuple of bitmap object and palette object.
 
+       Indexed images, including RLE8 and RLE4 compressed ones, load their palette as is. True
+       color (16, 24 or 32 bit) images have no palette of their own: with a ``palette`` type
+       they're quantized to at most 256 colors as they load, otherwise the bitmap values are the
+       pixels' colors in RGB565.
+
        :param object bitmap: Type to store bitmap data. Must have API similar to `displayio.Bitmap`.
          Will be skipped if None
        :param object palette: Type to store the palette. Must have API similar to
-         `displayio.Palette`. Will be skipped if None"""
-    file.seek(10)
-    data_start = int.from_bytes(file.read(4), 'little')
-    # f.seek(14)
-    # bmp_header_length = int.from_bytes(file.read(4), 'little')
-    # print(bmp_header_length)
-    file.seek(0x12) # Width of the bitmap in pixels
-    width = int.from_bytes(file.read(4), 'little')
-    height = int.from_bytes(file.read(4), 'little')
-    file.seek(0x1c) # Number of bits per pixel
-    color_depth = int.from_bytes(file.read(2), 'little')
-    file.seek(0x2e) # Number of colors in the color palette
-    colors = int.from_bytes(file.read(4), 'little')
+         `displayio.Palette`. Will be skipped if None
+       :param tuple region: The part of the image to load, as (x, y, width, height). The rows
+         outside it aren't read and the columns outside it aren't decoded. Loads all of it if
+         None"""
+    file.seek(0)
+    header = file.read(0x42)
+    data_start = int.from_bytes(header[0x0a:0x0e], 'little')
+    header_size = int.from_bytes(header[0x0e:0x12], 'little')
+    if header_size < 40:
+        raise NotImplementedError("OS/2 BMP unsupported")
+    width = int.from_bytes(header[0x12:0x16], 'little')
+    height = int.from_bytes(header[0x16:0x1a], 'little')
+    # A negative height means the rows are stored top to bottom
+    top_down = height >= 0x80000000
+    if top_down:
+        height = 0x100000000 - height
+    color_depth = int.from_bytes(header[0x1c:0x1e], 'little')
+    compression = int.from_bytes(header[0x1e:0x22], 'little')
+    colors = int.from_bytes(header[0x2e:0x32], 'little')
+    if region is None:
+        region = (0, 0, width, height)
+    elif (region[0] < 0 or region[1] < 0 or region[2] <= 0 or region[3] <= 0 or
+          region[0] + region[2] > width or region[1] + region[3] > height):
+        raise ValueError("Region outside the image")
 
-    if colors == 0 and color_depth >= 16:
-        raise NotImplementedError("True color BMP unsupported")
+    if color_depth >= 16:
+        if compression == 3:    # BI_BITFIELDS: the red, green and blue masks follow the header
+            masks = (int.from_bytes(header[0x36:0x3a], 'little'),
+                     int.from_bytes(header[0x3a:0x3e], 'little'),
+                     int.from_bytes(header[0x3e:0x42], 'little'))
+        elif compression == 0:
+            masks = (0x7c00, 0x03e0, 0x001f) if color_depth == 16 else (0xff0000, 0xff00, 0xff)
+        else:
+            raise NotImplementedError("Compressed true color BMP unsupported")
+        from . import truecolor
+        return truecolor.load(file, width, height, data_start, color_depth, masks,
+                              top_down=top_down, region=region, bitmap=bitmap,
+                              palette=palette)
 
+    if compression not in (0, 1, 2):
+        raise NotImplementedError("BMP compression %d unsupported" % compression)
     if colors == 0:
         colors = 2 ** color_depth
     from . import indexed
-    return indexed.load(file, width, height, data_start, colors, color_depth, bitmap=bitmap,
-                        palette=palette)
+    return indexed.load(file, width, height, data_start, colors, color_depth,
+                        palette_start=0x0e + header_size, compression=compression,
+                        top_down=top_down, region=region, bitmap=bitmap, palette=palette)
@@ -32,7 +32,11 @@ Load pixel values (indices or colors) into a bitmap and colors into a palette fr
 __version__ = "0.9.1"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_ImageLoad.git"
 
-def load(file, width, height, data_start, colors, color_depth, *, bitmap=None, palette=None):
+# how much compressed data to read at a time
+_RLE_BLOCK = 256
+
+def load(file, width, height, data_start, colors, color_depth, *, palette_start=None,
+         compression=0, top_down=False, region=None, bitmap=None, palette=None):
     """Loads indexed bitmap data into bitmap and palette objects.
 
        :param file file: The open bmp file
@@ -40,12 +44,19 @@ def load(file, width, height, data_start, colors, color_depth, *, bitmap=None, p
        :param int height: Image height in pixels
        :param int data_start: Byte location where the data starts (after headers)
        :param int colors: Number of distinct colors in the image
-       :param int color_depth: Number of bits used to store a value"""
+       :param int color_depth: Number of bits used to store a value
+       :param int palette_start: Byte location of the palette, if it isn't right before the data
+       :param int compression: 0 for none, 1 for RLE8 or 2 for RLE4
+       :param bool top_down: Whether the first row in the file is the top one
+       :param tuple region: The (x, y, width, height) of the part of the image to load, or None
+         for all of it"""
     # pylint: disable=too-many-arguments,too-many-locals
     if palette:
         palette = palette(colors)
 
-        file.seek(data_start - colors * 4)
+        if palette_start is None:
+            palette_start = data_start - colors * 4
+        file.seek(palette_start)
         for value in range(colors):
             c_bytes = file.read(4)
             # Need to swap red & blue bytes (bytes 0 and 2)
@@ -55,27 +66,109 @@ def load(file, width, height, data_start, colors, color_depth, *, bitmap=None, p
                                              c_bytes[3:1]]))
 
     if bitmap:
-        minimum_color_depth = 1
-        while colors > 2 ** minimum_color_depth:
-            minimum_color_depth *= 2
-
-        bitmap = bitmap(width, height, colors)
+        region_x, region_y, region_width, region_height = region or (0, 0, width, height)
+        bitmap = bitmap(region_width, region_height, colors)
         file.seek(data_start)
-        line_size = width // (8 // color_depth)
-        if line_size % 4 != 0:
-            line_size += (4 - line_size % 4)
+        if compression:
+            _load_rle(file, bitmap, height, color_depth,
+                      (region_x, region_y, region_width, region_height))
+            return bitmap, palette
 
-        chunk = bytearray(line_size)
-        mask = (1 << minimum_color_depth) - 1
+        # Rows are padded to a multiple of 4 bytes
+        line_size = (width * color_depth + 31) // 32 * 4
+        # Only the bytes holding the region's columns are read
+        first_byte = region_x * color_depth // 8
+        chunk = bytearray(((region_x + region_width) * color_depth + 7) // 8 - first_byte)
+        skip = region_x * color_depth % 8 // color_depth
+        table = _unpack_table(color_depth)
 
-        for y in range(height - 1, -1, -1):
+        for row in range(region_height):
+            y = region_y + row
+            file.seek(data_start + (y if top_down else height - 1 - y) * line_size + first_byte)
             file.readinto(chunk)
-            pixels_per_byte = 8 // color_depth
-            offset = y * width
-
-            for x in range(width):
-                i = x // pixels_per_byte
-                pixel = (chunk[i] >> (8 - color_depth*(x % pixels_per_byte + 1))) & mask
-                bitmap[offset + x] = pixel
+            if table:
+                values = b''.join([table[byte] for byte in chunk])
+            else:
+                values = chunk
+            # displayio.Bitmap can only be set a value at a time, there's no way to store a row
+            offset = row * region_width
+            for x in range(region_width):
+                bitmap[offset + x] = values[skip + x]
 
     return bitmap, palette
+
+
+def _unpack_table(color_depth):
+    """The values packed into each possible byte, for depths below 8 bits, as a list of bytes
+    indexed by the byte. None for 8 bits, where a byte is a value."""
+    if color_depth >= 8:
+        return None
+    per_byte = 8 // color_depth
+    mask = (1 << color_depth) - 1
+    return [bytes([(byte >> (8 - color_depth * (i + 1))) & mask for i in range(per_byte)])
+            for byte in range(256)]
+
+
+def _load_rle(file, bitmap, height, color_depth, region):
+    """Decode BI_RLE8 or BI_RLE4 data, from the bottom row up, into bitmap, keeping the pixels
+    inside region. Pixels the data skips over are left at 0."""
+    # pylint: disable=too-many-branches,too-many-locals
+    region_x, region_y, region_width, region_height = region
+    data = b''
+    i = 0
+    x = 0
+    y = height - 1
+    while y >= region_y:
+        if i + 2 > len(data):
+            data, i = _more(file, data, i, 2)
+            if len(data) < 2:
+                break   # the data ran out without an end of bitmap
+        count = data[i]
+        value = data[i + 1]
+        i += 2
+        if count:
+            # a run of count pixels: one value for RLE8, two alternating values for RLE4
+            if color_depth == 8:
+                pair = (value, value)
+            else:
+                pair = (value >> 4, value & 0x0f)
+            if y < region_y + region_height:
+                offset = (y - region_y) * region_width - region_x
+                for j in range(max(x, region_x), min(x + count, region_x + region_width)):
+                    bitmap[offset + j] = pair[(j - x) & 1]
+            x += count
+        elif value == 0:    # end of line
+            x = 0
+            y -= 1
+        elif value == 1:    # end of bitmap
+            break
+        elif value == 2:    # move right and up
+            if i + 2 > len(data):
+                data, i = _more(file, data, i, 2)
+                if len(data) < 2:
+                    raise ValueError("RLE data ends in the middle of a move")
+            x += data[i]
+            y -= data[i + 1]
+            i += 2
+        else:
+            # value pixels stored as they are, padded to a multiple of 2 bytes
+            size = value if color_depth == 8 else (value + 1) // 2
+            if i + size + (size & 1) > len(data):
+                data, i = _more(file, data, i, size + (size & 1))
+                if len(data) < size:
+                    raise ValueError("RLE data ends in the middle of a run")
+            raw = data[i:i + size]
+            i += size + (size & 1)
+            if color_depth != 8:
+                raw = b''.join([bytes((byte >> 4, byte & 0x0f)) for byte in raw])
+            if y < region_y + region_height:
+                offset = (y - region_y) * region_width - region_x
+                for j in range(max(x, region_x), min(x + value, region_x + region_width)):
+                    bitmap[offset + j] = raw[j - x]
+            x += value
+
+
+def _more(file, data, i, need):
+    """The unused part of data, from index i on, followed by at least need more bytes of file
+    if it has them, and the index to carry on from (0)"""
+    return data[i:] + file.read(max(_RLE_BLOCK, need)), 0
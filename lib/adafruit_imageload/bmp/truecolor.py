@@ -0,0 +1,187 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2018 Scott Shawcroft for Adafruit Industries LLC
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+`adafruit_imageload.bmp.truecolor`
+====================================================
+
+Load pixel values into a bitmap from a 16, 24 or 32 bit BMP, either as RGB565 colors or as
+indices into a palette built while loading.
+
+"""
+
+__version__ = "0.9.1"
+__repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_ImageLoad.git"
+
+MAX_COLORS = 256
+
+
+def load(file, width, height, data_start, color_depth, masks, *, top_down=False, region=None,
+         bitmap=None, palette=None):
+    """Loads true color bitmap data into bitmap and palette objects. Without a palette the bitmap
+       values are RGB565 colors; with one, colors are quantized to at most `MAX_COLORS` as they
+       load, keeping them exact to RGB565 for as long as they fit.
+
+       :param file file: The open bmp file
+       :param int width: Image width in pixels
+       :param int height: Image height in pixels
+       :param int data_start: Byte location where the data starts (after headers)
+       :param int color_depth: Number of bits used to store a pixel: 16, 24 or 32
+       :param masks: The red, green and blue bit masks of 16 and 32 bit pixels
+       :param bool top_down: Whether the first row in the file is the top one
+       :param tuple region: The (x, y, width, height) of the part of the image to load, or None
+         for all of it"""
+    # pylint: disable=too-many-arguments,too-many-locals
+    if not bitmap and not palette:
+        return None, None
+    if color_depth not in (16, 24, 32):
+        raise NotImplementedError("%d bit BMP unsupported" % color_depth)
+    region_x, region_y, region_width, region_height = region or (0, 0, width, height)
+    quantizer = _Quantizer() if palette else None
+    if bitmap:
+        bitmap = bitmap(region_width, region_height, MAX_COLORS if palette else 65536)
+    channels = None if color_depth == 24 else [_channel(mask) for mask in masks]
+
+    # Rows are padded to a multiple of 4 bytes, and only the region's columns are read
+    line_size = (width * color_depth + 31) // 32 * 4
+    pixel_size = color_depth // 8
+    chunk = bytearray(region_width * pixel_size)
+    for row in range(region_height):
+        y = region_y + row
+        file.seek(data_start + (y if top_down else height - 1 - y) * line_size +
+                  region_x * pixel_size)
+        file.readinto(chunk)
+        colors = _row_colors(chunk, region_width, color_depth, channels)
+        if quantizer:
+            values, remap = quantizer.indices(colors)
+            if remap and bitmap:
+                # the palette has been merged down, so what's loaded so far has to follow
+                for i in range(row * region_width):
+                    bitmap[i] = remap[bitmap[i]]
+        else:
+            values = [((c >> 8) & 0xf800) | ((c >> 5) & 0x07e0) | ((c >> 3) & 0x1f)
+                      for c in colors]
+        if bitmap:
+            # a value at a time, as Bitmap has nothing that stores a row
+            offset = row * region_width
+            for x in range(region_width):
+                bitmap[offset + x] = values[x]
+
+    if palette:
+        palette = palette(len(quantizer.colors))
+        for value, color in enumerate(quantizer.colors):
+            palette[value] = color
+    return bitmap, palette
+
+
+def _channel(mask):
+    """How to get an 8 bit channel out of a pixel with this bit mask: the mask, the shift that
+    brings it down to bit 0 and a table scaling it up to 0-255"""
+    shift = 0
+    while mask and not (mask >> shift) & 1:
+        shift += 1
+    bits = 0
+    while (mask >> (shift + bits)) & 1:
+        bits += 1
+    if bits > 8:
+        # only the top 8 bits matter
+        shift += bits - 8
+        mask &= 0xff << shift
+        bits = 8
+    top = (1 << bits) - 1
+    return mask, shift, bytes([value * 255 // top for value in range(top + 1)]) if top else b'\0'
+
+
+def _row_colors(chunk, width, color_depth, channels):
+    """The row of pixels in chunk as 0xRRGGBB colors"""
+    if color_depth == 24:
+        return [(chunk[i + 2] << 16) | (chunk[i + 1] << 8) | chunk[i]
+                for i in range(0, width * 3, 3)]
+    (red_mask, red_shift, red), (green_mask, green_shift, green), \
+        (blue_mask, blue_shift, blue) = channels
+    if color_depth == 16:
+        pixels = [chunk[i] | (chunk[i + 1] << 8) for i in range(0, width * 2, 2)]
+    else:
+        pixels = [chunk[i] | (chunk[i + 1] << 8) | (chunk[i + 2] << 16) | (chunk[i + 3] << 24)
+                  for i in range(0, width * 4, 4)]
+    return [(red[(p & red_mask) >> red_shift] << 16) |
+            (green[(p & green_mask) >> green_shift] << 8) |
+            blue[(p & blue_mask) >> blue_shift] for p in pixels]
+
+
+class _Quantizer:
+    """Gives colors palette indices as they come. Colors are told apart to RGB565, what the
+    display shows, until there are more than `MAX_COLORS` of them; then every channel loses a
+    bit, merging colors that now look the same, until they fit again."""
+
+    def __init__(self):
+        self.colors = []        # the palette, as 0xRRGGBB
+        self._index = {}        # reduced color -> palette index
+        self._drop = (3, 2, 3)  # bits dropped from red, green and blue
+
+    def _key(self, color):
+        red, green, blue = self._drop
+        return ((color >> (16 + red)) << 16) | (((color >> 8) & 0xff) >> green) << 8 | \
+            ((color & 0xff) >> blue)
+
+    def indices(self, colors):
+        """The palette indices of a row of colors, as a bytearray, and a bytearray mapping the
+        indices of earlier rows to their new ones if the palette had to be merged, or None"""
+        values = bytearray(len(colors))
+        remap = None
+        index = self._index
+        for x, color in enumerate(colors):
+            key = self._key(color)
+            value = index.get(key)
+            if value is None and len(self.colors) == MAX_COLORS:
+                merged = self._merge()
+                for i in range(x):
+                    values[i] = merged[values[i]]
+                remap = merged if remap is None else bytearray(merged[v] for v in remap)
+                index = self._index
+                key = self._key(color)
+                value = index.get(key)
+            if value is None:
+                value = len(self.colors)
+                self.colors.append(color)
+                index[key] = value
+            values[x] = value
+        return values, remap
+
+    def _merge(self):
+        """Drop a bit from every channel until a color can be added, returning a bytearray
+        mapping old palette indices to new ones"""
+        remap = bytearray(range(len(self.colors)))
+        while len(self.colors) >= MAX_COLORS:
+            self._drop = tuple(min(bits + 1, 7) for bits in self._drop)
+            colors = []
+            index = {}
+            merged = bytearray(len(self.colors))
+            for old, color in enumerate(self.colors):
+                key = self._key(color)
+                if key not in index:
+                    index[key] = len(colors)
+                    colors.append(color)
+                merged[old] = index[key]
+            remap = bytearray(merged[value] for value in remap)
+            self.colors = colors
+            self._index = index
+        return remap
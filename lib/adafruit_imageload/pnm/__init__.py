@@ -33,71 +33,132 @@ __version__ = "0.9.1"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_ImageLoad.git"
 
 
-def load(file, header, *, bitmap=None, palette=None):
+def size(file):
+    """The width and height of the netpbm image in the open ``file``"""
+    values = _header(file, 2)
+    return values[0], values[1]
+
+
+def load(file, header, *, bitmap=None, palette=None, region=None):
     """
     Scan for netpbm format info, skip over comments, and and delegate to a submodule
     to do the actual data loading.
     Formats P1, P4 have two space padded pieces of information: width and height.
     All other formats have three: width, height, and max color value.
     This load function will move the file stream pointer to the start of data in all cases.
+    region is the (x, y, width, height) of the part of the image to load, or None for all
+    of it.
     """
-    # pylint: disable=too-many-branches
     magic_number = header[:2]
+    if magic_number not in [b"P1", b"P2", b"P3", b"P4", b"P5", b"P6"]:
+        raise RuntimeError("Unsupported image format {}".format(magic_number))
+    pnm_header = _header(file, 2 if magic_number in [b"P1", b"P4"] else 3)
+    width, height = pnm_header[0], pnm_header[1]
+    if region is None:
+        region = (0, 0, width, height)
+    elif (
+        region[0] < 0
+        or region[1] < 0
+        or region[2] <= 0
+        or region[3] <= 0
+        or region[0] + region[2] > width
+        or region[1] + region[3] > height
+    ):
+        raise ValueError("Region outside the image")
+
+    if magic_number in [b"P1", b"P4"]:
+        if magic_number == b"P1":
+            from . import pbm_ascii as loader
+        else:
+            from . import pbm_binary as loader
+        return loader.load(
+            file, width, height, region=region, bitmap=bitmap, palette=palette
+        )
+
+    max_value = pnm_header[2]
+    if max_value > 255:
+        raise NotImplementedError("16 bit files are not supported")
+    if magic_number in [b"P2", b"P5"]:
+        from . import pgm
+
+        return pgm.load(
+            file, magic_number, pnm_header, region=region, bitmap=bitmap, palette=palette
+        )
+    if magic_number == b"P3":
+        from . import ppm_ascii as loader
+    else:
+        from . import ppm_binary as loader
+    return loader.load(
+        file, width, height, max_value, region=region, bitmap=bitmap, palette=palette
+    )
+
+
+def _header(file, count):
+    """
+    Read the first count numbers of the header, skipping comments. Leaves the file at the
+    start of the data, just past the single whitespace that ends the header.
+    """
     file.seek(2)
-    pnm_header = []
+    values = []
     next_value = bytearray()
-    while True:
-        # We have all we need at length 3 for formats P2, P3, P5, P6
-        if len(pnm_header) == 3:
-            if magic_number in [b"P2", b"P5"]:
-                from . import pgm
-
-                return pgm.load(
-                    file, magic_number, pnm_header, bitmap=bitmap, palette=palette
-                )
-
-            if magic_number == b"P3":
-                from . import ppm_ascii
-
-                return ppm_ascii.load(
-                    file, pnm_header[0], pnm_header[1], bitmap=bitmap, palette=palette
-                )
-
-            if magic_number == b"P6":
-                from . import ppm_binary
-
-                return ppm_binary.load(
-                    file, pnm_header[0], pnm_header[1], bitmap=bitmap, palette=palette
-                )
-
-        if len(pnm_header) == 2 and magic_number in [b"P1", b"P4"]:
-            bitmap = bitmap(pnm_header[0], pnm_header[1], 1)
-            if palette:
-                palette = palette(1)
-                palette[0] = b"\xFF\xFF\xFF"
-            if magic_number.startswith(b"P1"):
-                from . import pbm_ascii
-
-                return pbm_ascii.load(
-                    file, pnm_header[0], pnm_header[1], bitmap=bitmap, palette=palette
-                )
-
-            from . import pbm_binary
-
-            return pbm_binary.load(
-                file, pnm_header[0], pnm_header[1], bitmap=bitmap, palette=palette
-            )
-
+    while len(values) < count:
         next_byte = file.read(1)
         if next_byte == b"":
-            raise RuntimeError("Unsupported image format {}".format(magic_number))
+            raise RuntimeError("Unsupported image format")
         if next_byte == b"#":  # comment found, seek until a newline or EOF is found
             while file.read(1) not in [b"", b"\n"]:  # EOF or NL
                 pass
-        elif not next_byte.isdigit():  # boundary found in header data
-            if next_value:
-                # pull values until space is found
-                pnm_header.append(int("".join(["%c" % char for char in next_value])))
-                next_value = bytearray()  # reset the byte array
-        else:
+        elif next_byte.isdigit():
             next_value += next_byte  # push the digit into the byte array
+        elif next_value:  # boundary found in header data
+            values.append(int("".join(["%c" % char for char in next_value])))
+            next_value = bytearray()  # reset the byte array
+    return values
+
+
+def ascii_values(file, *, digits=False, block_size=256):
+    """
+    Generator of the whitespace separated decimal values in the rest of the file, read
+    a block at a time. With digits, each digit is a value of its own, as in P1 files.
+    """
+    value = -1
+    comment = False
+    while True:
+        block = file.read(block_size)
+        if not block:
+            break
+        for byte in block:
+            if comment:
+                comment = byte not in (10, 13)  # comments run to the end of the line
+            elif 48 <= byte <= 57:  # a digit
+                if digits:
+                    yield byte - 48
+                elif value < 0:
+                    value = byte - 48
+                else:
+                    value = value * 10 + byte - 48
+            else:
+                if value >= 0:
+                    yield value
+                    value = -1
+                comment = byte == 35  # "#"
+    if value >= 0:
+        yield value
+
+
+def ascii_rows(file, width, height, region, channels=1, *, digits=False):
+    """
+    Generator of the rows of the region, as lists of values with channels values a
+    pixel, from the ascii data in the rest of the file. Rows below the region aren't read.
+    """
+    values = ascii_values(file, digits=digits)
+    left = region[0] * channels
+    right = (region[0] + region[2]) * channels
+    row_size = width * channels
+    for y in range(region[1] + region[3]):
+        try:
+            row = [next(values) for _ in range(row_size)]
+        except StopIteration:
+            raise ValueError("Image data ends early")
+        if y >= region[1]:
+            yield row[left:right]
@@ -34,19 +34,30 @@ __version__ = "0.9.1"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_ImageLoad.git"
 
 
-def load(file, width, height, bitmap=None, palette=None):
+def load(file, width, height, *, region=None, bitmap=None, palette=None):
     """
-    Load a P1 'PBM' ascii image into the displayio.Bitmap
+    Load a P1 'PBM' ascii image into the displayio.Bitmap, 1 being black and 0 white
     """
-    next_byte = True
-    for y in range(height):
-        x = 0
-        while next_byte:
-            next_byte = file.read(1)
-            if not next_byte.isdigit():
-                continue
-            bitmap[x, y] = 1 if next_byte == b"1" else 0
-            if x == width - 1:
-                break
-            x += 1
+    from . import ascii_rows
+
+    region = region or (0, 0, width, height)
+    if palette:
+        palette = build_palette(palette)
+    if bitmap:
+        bitmap = bitmap(region[2], region[3], 2)
+        offset = 0
+        for row in ascii_rows(file, width, height, region, digits=True):
+            for x, value in enumerate(row):
+                bitmap[offset + x] = value
+            offset += region[2]
     return bitmap, palette
+
+
+def build_palette(palette_class):
+    """
+    construct the two color Palette of a PBM image: 0 is white and 1 black
+    """
+    palette = palette_class(2)
+    palette[0] = 0xFFFFFF
+    palette[1] = 0x000000
+    return palette
@@ -34,41 +34,37 @@ __version__ = "0.9.1"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_ImageLoad.git"
 
 
-def load(file, width, height, bitmap=None, palette=None):
+def load(file, width, height, *, region=None, bitmap=None, palette=None):
     """
-    Load a P4 'PBM' binary image into the displayio.Bitmap
+    Load a P4 'PBM' binary image into the displayio.Bitmap, a row at a time, reading
+    only the rows and bytes of the region
     """
-    x = 0
-    y = 0
-    while True:
-        next_byte = file.read(1)
-        if not next_byte:
-            break  # out of bits
-        for bit in iterbits(next_byte):
-            bitmap[x, y] = bit
-            x += 1
-            if x > width - 1:
-                y += 1
-                x = 0
-            if y > height - 1:
-                break
-    return bitmap, palette
-
+    from .pbm_ascii import build_palette
 
-def iterbits(b):
-    """
-    generator to iterate over the bits in a byte (character)
-    """
-    in_char = reverse(int.from_bytes(b, "little"))
-    for i in range(8):
-        yield (in_char >> i) & 1
+    region = region or (0, 0, width, height)
+    if palette:
+        palette = build_palette(palette)
+    if bitmap:
+        bitmap = bitmap(region[2], region[3], 2)
+        data_start = file.tell()
+        line_size = (width + 7) // 8
+        first_byte = region[0] // 8
+        chunk = bytearray((region[0] + region[2] + 7) // 8 - first_byte)
+        skip = region[0] % 8
+        table = bit_table()
+        for row in range(region[3]):
+            file.seek(data_start + (region[1] + row) * line_size + first_byte)
+            file.readinto(chunk)
+            values = b"".join([table[byte] for byte in chunk])
+            offset = row * region[2]
+            for x in range(region[2]):
+                bitmap[offset + x] = values[skip + x]
+    return bitmap, palette
 
 
-def reverse(b):
+def bit_table():
     """
-    reverse bit order so the iterbits works
+    the 8 bits of each possible byte, most significant first, as a list of bytes
+    indexed by the byte
     """
-    b = (b & 0xF0) >> 4 | (b & 0x0F) << 4
-    b = (b & 0xCC) >> 2 | (b & 0x33) << 2
-    b = (b & 0xAA) >> 1 | (b & 0x55) << 1
-    return b
+    return [bytes([(byte >> (7 - i)) & 1 for i in range(8)]) for byte in range(256)]
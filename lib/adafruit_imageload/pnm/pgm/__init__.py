@@ -30,9 +30,10 @@ Load pixel values (indices or colors) into a bitmap and colors into a palette.
 """
 
 
-def load(file, magic_number, header, *, bitmap=None, palette=None):
+def load(file, magic_number, header, *, region=None, bitmap=None, palette=None):
     """
-    Perform the load of Netpbm greyscale images (P2, P5)
+    Perform the load of Netpbm greyscale images (P2, P5). Each grey level is its own
+    value, so the palette is known from the header and the data is read once.
     """
     if header[2] > 256:
         raise NotImplementedError("16 bit files are not supported")
@@ -42,11 +43,25 @@ def load(file, magic_number, header, *, bitmap=None, palette=None):
     if magic_number == b"P2":  # To handle ascii PGM files.
         from . import ascii as pgm_ascii
 
-        return pgm_ascii.load(file, width, height, bitmap=bitmap, palette=palette)
+        return pgm_ascii.load(
+            file, width, height, header[2], region=region, bitmap=bitmap, palette=palette
+        )
 
     if magic_number == b"P5":  # To handle binary PGM files.
         from . import binary
 
-        return binary.load(file, width, height, bitmap=bitmap, palette=palette)
+        return binary.load(
+            file, width, height, header[2], region=region, bitmap=bitmap, palette=palette
+        )
 
     raise NotImplementedError("Was not able to send image")
+
+
+def build_palette(palette_class, max_value):
+    """
+    construct the Palette of the grey levels from black at 0 to white at max_value
+    """
+    palette = palette_class(max_value + 1)
+    for level in range(max_value + 1):
+        palette[level] = (level * 255 // max_value) * 0x010101
+    return palette
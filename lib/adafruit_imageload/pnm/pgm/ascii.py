@@ -30,47 +30,22 @@ Load pixel values (indices or colors) into a bitmap and colors into a palette.
 """
 
 
-def load(file, width, height, bitmap=None, palette=None):
+def load(file, width, height, max_value=255, *, region=None, bitmap=None, palette=None):
     """
     Load a PGM ascii file (P2)
     """
-    data_start = file.tell()  # keep this so we can rewind
-    palette_colors = set()
-    pixel = bytearray()
-    # build a set of all colors present in the file, so palette and bitmap can be constructed
-    while True:
-        byte = file.read(1)
-        if byte == b"":
-            break
-        if not byte.isdigit():
-            int_pixel = int("".join(["%c" % char for char in pixel]))
-            palette_colors.add(int_pixel)
-            pixel = bytearray()
-        pixel += byte
+    # pylint: disable=too-many-arguments
+    from .. import ascii_rows
+    from . import build_palette
+
+    region = region or (0, 0, width, height)
     if palette:
-        palette = build_palette(palette, palette_colors)
+        palette = build_palette(palette, max_value)
     if bitmap:
-        bitmap = bitmap(width, height, len(palette_colors))
-        palette_colors = list(palette_colors)
-        file.seek(data_start)
-        for y in range(height):
-            for x in range(width):
-                pixel = bytearray()
-                while True:
-                    byte = file.read(1)
-                    if not byte.isdigit():
-                        break
-                    pixel += byte
-                int_pixel = int("".join(["%c" % char for char in pixel]))
-                bitmap[x, y] = palette_colors.index(int_pixel)
+        bitmap = bitmap(region[2], region[3], max_value + 1)
+        offset = 0
+        for row in ascii_rows(file, width, height, region):
+            for x, level in enumerate(row):
+                bitmap[offset + x] = level
+            offset += region[2]
     return bitmap, palette
-
-
-def build_palette(palette_class, palette_colors):
-    """
-    construct the Palette, and populate it with the set of palette_colors
-    """
-    palette = palette_class(len(palette_colors))
-    for counter, color in enumerate(palette_colors):
-        palette[counter] = bytes([color, color, color])
-    return palette
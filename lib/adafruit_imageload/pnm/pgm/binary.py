@@ -30,35 +30,25 @@ Load pixel values (indices or colors) into a bitmap and colors into a palette.
 """
 
 
-def load(file, width, height, bitmap=None, palette=None):
+def load(file, width, height, max_value=255, *, region=None, bitmap=None, palette=None):
     """
-    Load a P5 format file (binary), handle PGM (greyscale)
+    Load a P5 format file (binary), handle PGM (greyscale), reading only the region's
+    rows, a row at a time
     """
-    palette_colors = set()
-    data_start = file.tell()
-    for y in range(height):
-        data_line = iter(bytes(file.read(width)))
-        for pixel in data_line:
-            palette_colors.add(pixel)
+    # pylint: disable=too-many-arguments
+    from . import build_palette
 
+    region = region or (0, 0, width, height)
     if palette:
-        palette = build_palette(palette, palette_colors)
+        palette = build_palette(palette, max_value)
     if bitmap:
-        bitmap = bitmap(width, height, len(palette_colors))
-        palette_colors = list(palette_colors)
-        file.seek(data_start)
-        for y in range(height):
-            data_line = iter(bytes(file.read(width)))
-            for x, pixel in enumerate(data_line):
-                bitmap[x, y] = palette_colors.index(pixel)
+        bitmap = bitmap(region[2], region[3], max_value + 1)
+        data_start = file.tell()
+        chunk = bytearray(region[2])
+        for row in range(region[3]):
+            file.seek(data_start + (region[1] + row) * width + region[0])
+            file.readinto(chunk)
+            offset = row * region[2]
+            for x, level in enumerate(chunk):
+                bitmap[offset + x] = level
     return bitmap, palette
-
-
-def build_palette(palette_class, palette_colors):
-    """
-    construct the Palette, and populate it with the set of palette_colors
-    """
-    palette = palette_class(len(palette_colors))
-    for counter, color in enumerate(palette_colors):
-        palette[counter] = bytes([color, color, color])
-    return palette
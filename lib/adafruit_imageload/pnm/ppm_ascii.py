@@ -34,56 +34,43 @@ __version__ = "0.9.1"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_ImageLoad.git"
 
 
-def load(file, width, height, bitmap=None, palette=None):
+def load(file, width, height, max_value=255, *, region=None, bitmap=None, palette=None):
     """
     :param stream file: infile with the position set at start of data
     :param int width:
     :param int height:
-    :param int max_colors: color space of file
+    :param int max_value: the value of full brightness
+    :param tuple region: the (x, y, width, height) of the part of the image to load
     :param bitmap: displayio.Bitmap class
     :param palette: displayio.Palette class
     :return tuple:
+
+    The bitmap's value count has to be known before it's filled in, so this reads the
+    data twice: once to collect the colors and again to store their indices.
     """
-    palette_colors = set()
+    from . import ascii_rows
+    from .ppm_binary import build_palette
+
+    region = region or (0, 0, width, height)
     data_start = file.tell()
-    for triplet in read_three_colors(file):
-        palette_colors.add(triplet)
+    palette_colors = {}
+    for row in ascii_rows(file, width, height, region, 3):
+        for i in range(0, len(row), 3):
+            color = (row[i] << 16) | (row[i + 1] << 8) | row[i + 2]
+            if color not in palette_colors:
+                palette_colors[color] = len(palette_colors)
 
     if palette:
-        palette = palette(len(palette_colors))
-        for counter, color in enumerate(palette_colors):
-            palette[counter] = color
+        palette = build_palette(palette, palette_colors, max_value)
     if bitmap:
         file.seek(data_start)
-        bitmap = bitmap(width, height, len(palette_colors))
-        palette_colors = list(palette_colors)
-        for y in range(height):
-            for x in range(width):
-                for color in read_three_colors(file):
-                    bitmap[x, y] = palette_colors.index(color)
-                    break  # exit the inner generator
+        bitmap = bitmap(region[2], region[3], len(palette_colors))
+        offset = 0
+        for row in ascii_rows(file, width, height, region, 3):
+            for x in range(region[2]):
+                i = x * 3
+                bitmap[offset + x] = palette_colors[
+                    (row[i] << 16) | (row[i + 1] << 8) | row[i + 2]
+                ]
+            offset += region[2]
     return bitmap, palette
-
-
-def read_three_colors(file):
-    """
-    Generator to read integer values from file, in groups of three.
-    Each value can be len 1-3, for values 0 - 255, space padded.
-    :return tuple[int]:
-    """
-    triplet = []
-    color = bytearray()
-    while True:
-        this_byte = file.read(1)
-        if this_byte.isdigit():
-            color += this_byte
-        # not a digit means we completed one number (found a space separator or EOF)
-        elif color or (triplet and this_byte == b""):
-            triplet.append(int("".join(["%c" % char for char in color])))
-            color = bytearray()
-        if len(triplet) == 3:  # completed one pixel
-            yield bytes(tuple(triplet))
-            triplet = []
-        # short circuit must be after all other cases, so we yield the last pixel before returning
-        if this_byte == b"":
-            return
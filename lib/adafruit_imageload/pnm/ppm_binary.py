@@ -34,36 +34,59 @@ __version__ = "0.9.1"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_ImageLoad.git"
 
 
-def load(file, width, height, bitmap=None, palette=None):
-    """Load pixel values (indices or colors) into a bitmap and for a binary
-    ppm, return None for pallet."""
+def load(file, width, height, max_value=255, *, region=None, bitmap=None, palette=None):
+    """Load pixel values (indices) into a bitmap and colors into a palette from a
+    binary ppm.
 
+    The bitmap's value count has to be known before it's filled in, so this reads the
+    region's rows twice: once to collect the colors and again to store their indices."""
+    # pylint: disable=too-many-arguments
+    region = region or (0, 0, width, height)
     data_start = file.tell()
-    palette_colors = set()
-    line_size = width * 3
-
-    for y in range(height):
-        data_line = iter(bytes(file.read(line_size)))
-        for red in data_line:
-            # red, green, blue
-            palette_colors.add((red, next(data_line), next(data_line)))
+    palette_colors = {}
+    for row in _rows(file, data_start, width, region):
+        for color in row:
+            if color not in palette_colors:
+                palette_colors[color] = len(palette_colors)
 
     if palette:
-        palette = palette(len(palette_colors))
-        for counter, color in enumerate(palette_colors):
-            palette[counter] = bytes(color)
+        palette = build_palette(palette, palette_colors, max_value)
     if bitmap:
-        bitmap = bitmap(width, height, len(palette_colors))
-        file.seek(data_start)
-        palette_colors = list(palette_colors)
-        for y in range(height):
-            x = 0
-            data_line = iter(bytes(file.read(line_size)))
-            for red in data_line:
-                # red, green, blue
-                bitmap[x, y] = palette_colors.index(
-                    (red, next(data_line), next(data_line))
-                )
-                x += 1
-
+        bitmap = bitmap(region[2], region[3], len(palette_colors))
+        offset = 0
+        for row in _rows(file, data_start, width, region):
+            for x, color in enumerate(row):
+                bitmap[offset + x] = palette_colors[color]
+            offset += region[2]
     return bitmap, palette
+
+
+def _rows(file, data_start, width, region):
+    """
+    Generator of the region's rows as lists of 0xRRGGBB ints, read a row at a time
+    """
+    chunk = bytearray(region[2] * 3)
+    for y in range(region[1], region[1] + region[3]):
+        file.seek(data_start + (y * width + region[0]) * 3)
+        file.readinto(chunk)
+        yield [
+            (chunk[i] << 16) | (chunk[i + 1] << 8) | chunk[i + 2]
+            for i in range(0, len(chunk), 3)
+        ]
+
+
+def build_palette(palette_class, palette_colors, max_value=255):
+    """
+    construct the Palette from a dict of 0xRRGGBB colors to indices, scaling them up to
+    full brightness if max_value isn't 255
+    """
+    palette = palette_class(len(palette_colors))
+    for color, index in palette_colors.items():
+        if max_value != 255:
+            color = (
+                ((color >> 16) * 255 // max_value) << 16
+                | (((color >> 8) & 0xFF) * 255 // max_value) << 8
+                | (color & 0xFF) * 255 // max_value
+            )
+        palette[index] = color
+    return palette
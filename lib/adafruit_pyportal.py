@@ -55,6 +55,7 @@ import neopixel
 
 from adafruit_esp32spi import adafruit_esp32spi, adafruit_esp32spi_wifimanager
 import adafruit_esp32spi.adafruit_esp32spi_requests as requests
+import adafruit_esp32spi.adafruit_esp32spi_socket as socket
 try:
     from adafruit_display_text.text_area import TextArea  # pylint: disable=unused-import
     print("*** WARNING ***\nPlease update your library bundle to the latest 'adafruit_display_text' version as we've deprecated 'text_area' in favor of 'label'")  # pylint: disable=line-too-long
@@ -92,6 +93,12 @@ TIME_SERVICE_STRFTIME = '&fmt=%25Y-%25m-%25d+%25H%3A%25M%3A%25S.%25L+%25j+%25u+%
 LOCALFILE = "local.txt"
 # pylint: enable=line-too-long
 
+# how often to sync the time, in seconds: the interval doubles after each sync that finds
+# the clock within TIME_SYNC_TOLERANCE seconds, and halves after one that doesn't
+TIME_SYNC_MIN_INTERVAL = 3600
+TIME_SYNC_MAX_INTERVAL = 3 * 86400
+TIME_SYNC_TOLERANCE = 0.5
+
 
 class Fake_Requests:
     """For faking 'requests' using a local file instead of the network."""
@@ -106,6 +113,560 @@ class Fake_Requests:
         return json.loads(self.text)
 
 
+def _ticks_ms():
+    """Milliseconds since boot, as an int. monotonic() is a float, which can't count
+    milliseconds after a few hours with CircuitPython's 30 bit floats"""
+    try:
+        return time.monotonic_ns() // 1000000
+    except AttributeError:
+        return int(time.monotonic() * 1000)
+
+
+def _fnv1a(text):
+    """A 32 bit FNV-1a hash of text, which unlike hash() won't change between versions"""
+    value = 0x811C9DC5
+    for byte in text.encode():
+        value = ((value ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return value
+
+
+def _tile_grid(bitmap, pixel_shader, position):
+    """A TileGrid of bitmap at position, whichever way this version of displayio wants it"""
+    try:
+        return displayio.TileGrid(bitmap, pixel_shader=pixel_shader,
+                                  x=position[0], y=position[1])
+    except TypeError:
+        return displayio.TileGrid(bitmap, pixel_shader=pixel_shader, position=position)
+
+
+class FrameScheduler:
+    """Collects the areas of the display that have changed and refreshes them together, at
+    most once a frame, instead of everything that changes something waiting on a refresh of
+    its own. Mark changes with `invalidate` or `invalidate_label`, then call `update` once
+    everything for this go round the main loop has been changed.
+
+    PyPortal's own changes, like `PyPortal.set_background`, refresh the display straight
+    away unless `deferred` is set, so only set it if your main loop calls `update`.
+
+    :param display: The display to refresh, e.g. ``board.DISPLAY``.
+    :param int frames_per_second: The most refreshes to do in a second.
+    """
+
+    def __init__(self, display, frames_per_second=60):
+        self._display = display
+        self.frames_per_second = frames_per_second
+        self._width = getattr(display, "width", 320)
+        self._height = getattr(display, "height", 240)
+        self._dirty = None
+        self._last_refresh = None
+        self.deferred = False
+
+    @property
+    def dirty_area(self):
+        """An (x, y, w, h) tuple covering every area marked since the last refresh, or None
+        if nothing needs refreshing"""
+        return self._dirty
+
+    def invalidate(self, area=None):
+        """Mark an area as needing a refresh.
+
+        :param area: The (x, y, w, h) area that changed. Defaults to the whole display.
+        """
+        if area is None:
+            area = (0, 0, self._width, self._height)
+        left = max(0, area[0])
+        top = max(0, area[1])
+        right = min(self._width, area[0] + area[2])
+        bottom = min(self._height, area[1] + area[3])
+        if right <= left or bottom <= top:
+            return  # off the display
+        if self._dirty:
+            left = min(left, self._dirty[0])
+            top = min(top, self._dirty[1])
+            right = max(right, self._dirty[0] + self._dirty[2])
+            bottom = max(bottom, self._dirty[1] + self._dirty[3])
+        self._dirty = (left, top, right - left, bottom - top)
+
+    def invalidate_label(self, label):
+        """Mark whatever the last change to a label's text touched as needing a refresh.
+
+        :param label: A `Label` in a group at the display's origin, whose text was just set.
+        """
+        area = label.dirty_area
+        if area:
+            self.invalidate((label.x + area[0], label.y + area[1], area[2], area[3]))
+
+    def update(self):
+        """Refresh the display if anything has been marked, waiting out what's left of the
+        frame if the last refresh was too recent. Returns whether it refreshed."""
+        if not self._dirty:
+            return False
+        if self._last_refresh is not None:
+            wait = self._last_refresh + 1 / self.frames_per_second - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+        try:
+            self._display.refresh(target_frames_per_second=self.frames_per_second)
+        except AttributeError:
+            self._display.refresh_soon()
+            self._display.wait_for_frame()
+        self._last_refresh = time.monotonic()
+        self._dirty = None
+        return True
+
+
+class SpriteCache:
+    """Keeps the bitmaps of image files ready to show, so showing the same image again doesn't
+    go back to the filesystem. Each `get` makes a new TileGrid of the bitmap, since a TileGrid
+    can only be in one Group at a time. The least recently used bitmaps are let go when there
+    are too many, except for the one named by ``pinned``, which `PyPortal` sets to the
+    background it's showing. A bitmap read from its file stops working once it's let go, as
+    its file is closed then, so keep ``max_files`` above how many of those are on the display
+    at once.
+
+    :param int max_bytes: How much RAM the bitmaps loaded into memory may take up together.
+    :param int max_files: How many bitmaps may be kept as open files.
+    :param bool in_memory: Whether to load bitmaps into memory by default, which uses RAM but
+                           makes them quicker to draw, rather than reading them from their files
+                           as they're needed. Bitmaps ``adafruit_imageload`` can't load are
+                           always read from their files.
+    """
+
+    def __init__(self, max_bytes=32768, max_files=8, *, in_memory=False):
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.in_memory = in_memory
+        # filename -> [bitmap, pixel shader, bytes of RAM or the open file, last use]
+        self._sprites = {}
+        self.pinned = None
+        self._clock = 0
+        self._bytes = 0
+        self._files = 0
+
+    def get(self, filename, position=(0, 0), *, in_memory=None):
+        """A TileGrid showing the bitmap in filename, at position.
+
+        :param str filename: The bitmap file.
+        :param position: Where to put the TileGrid in its Group, as an (x, y) tuple.
+        :param bool in_memory: Overrides the cache's ``in_memory`` for this bitmap, if it's
+                               not already cached.
+        """
+        self._clock += 1
+        entry = self._sprites.get(filename)
+        if entry:
+            entry[3] = self._clock
+            return _tile_grid(entry[0], entry[1], position)
+
+        if in_memory is None:
+            in_memory = self.in_memory
+        entry = None
+        size = self._bitmap_bytes(filename) if in_memory else None
+        if size is not None and size <= self.max_bytes:
+            self._make_room(size, 0)
+            try:
+                import adafruit_imageload
+                bitmap, palette = adafruit_imageload.load(filename, bitmap=displayio.Bitmap,
+                                                          palette=displayio.Palette)
+                entry = [bitmap, palette, size, self._clock]
+                self._bytes += size
+            except (NotImplementedError, RuntimeError, ValueError, MemoryError):
+                pass    # we'll read it from the file instead
+        if entry is None:
+            self._make_room(0, 1)
+            file = open(filename, "rb")
+            entry = [displayio.OnDiskBitmap(file), displayio.ColorConverter(), file, self._clock]
+            self._files += 1
+        self._sprites[filename] = entry
+        return _tile_grid(entry[0], entry[1], position)
+
+    def forget(self, filename):
+        """Let go of the bitmap of filename if it's cached, closing its file if it's read from
+        one, e.g. because the file is about to be replaced or deleted"""
+        entry = self._sprites.pop(filename, None)
+        if entry is None:
+            return
+        if isinstance(entry[2], int):
+            self._bytes -= entry[2]
+        else:
+            entry[2].close()
+            self._files -= 1
+
+    def clear(self):
+        """Let go of all the cached bitmaps"""
+        for filename in list(self._sprites):
+            self.forget(filename)
+        gc.collect()
+
+    def _make_room(self, size, files):
+        """Let go of the least recently used bitmaps until there's room for size more bytes
+        and this many more files"""
+        while self._bytes + size > self.max_bytes or self._files + files > self.max_files:
+            oldest = None
+            for filename in self._sprites:
+                if filename != self.pinned and (oldest is None or
+                                                self._sprites[filename][3] <
+                                                self._sprites[oldest][3]):
+                    oldest = filename
+            if oldest is None:
+                break
+            self.forget(oldest)
+        gc.collect()
+
+    @staticmethod
+    def _bitmap_bytes(filename):
+        """How much RAM the bitmap in filename would take once loaded, going by the BMP
+        header, or None if it's not something we know"""
+        try:
+            with open(filename, "rb") as file:
+                header = file.read(0x32)
+        except OSError:
+            return None
+        if len(header) < 0x32 or header[:2] != b"BM":
+            return None
+        width = int.from_bytes(header[0x12:0x16], 'little')
+        height = int.from_bytes(header[0x16:0x1a], 'little')
+        colors = int.from_bytes(header[0x2e:0x32], 'little')
+        depth = int.from_bytes(header[0x1c:0x1e], 'little')
+        if depth > 8:
+            # true color is quantized to a palette of up to 256 colors as it loads
+            return (width * 8 + 31) // 32 * 4 * height + 256 * 4
+        if colors == 0:
+            colors = 2 ** depth
+        bits = 1     # displayio stores values in 1, 2, 4, 8 or 16 bits
+        while colors > 2 ** bits:
+            bits *= 2
+        return (width * bits + 31) // 32 * 4 * height + colors * 4
+
+
+def _writable(directory):
+    """Whether files can be made in directory, which is made if it isn't there. CIRCUITPY is
+    read-only to code.py unless boot.py remounts it."""
+    try:
+        try:
+            os.mkdir(directory)
+        except OSError:
+            pass    # already there
+        probe = directory + "/.probe"
+        with open(probe, "wb"):
+            pass
+        os.remove(probe)
+    except OSError:
+        return False
+    return True
+
+
+class ImageCache:
+    """Keeps downloaded images on the filesystem, each named by a hash of what it is (its key),
+    so showing one again doesn't need the network. The least recently used are deleted once
+    the images take up more than max_bytes. The images and when they were last used are listed
+    in an index file in the directory, so they're remembered across resets. To spare the flash,
+    the index is only written when an image is added or deleted, so uses since then are
+    forgotten by a reset.
+
+    :param str directory: Where to keep the images.
+    :param int max_bytes: How much space the images may take up together. The newest image is
+                          always kept, even if it's bigger.
+    :param on_remove: Called with the filename of an image just before it's deleted.
+    """
+
+    def __init__(self, directory, max_bytes, *, on_remove=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.on_remove = on_remove
+        self._images = {}   # filename -> [key, bytes, last use]
+        self._clock = 0
+        try:
+            os.mkdir(directory)
+        except OSError:
+            pass    # already there
+        self._load_index()
+
+    def filename(self, key):
+        """The file the image for key is, or would be, saved in"""
+        return "%s/%08x.bmp" % (self.directory, _fnv1a(key))
+
+    def get(self, key):
+        """The file the image for key is saved in, or None if it isn't cached"""
+        filename = self.filename(key)
+        entry = self._images.get(filename)
+        if entry is None or entry[0] != key:
+            return None
+        try:
+            os.stat(filename)
+        except OSError:
+            del self._images[filename]  # someone deleted it
+            return None
+        self._clock += 1
+        entry[2] = self._clock
+        return filename
+
+    def add(self, key):
+        """Record that the image for key has been saved in ``filename(key)``, deleting the
+        least recently used images until they fit in max_bytes again"""
+        filename = self.filename(key)
+        self._clock += 1
+        self._images[filename] = [key, os.stat(filename)[6], self._clock]
+        total = 0
+        for entry in self._images.values():
+            total += entry[1]
+        while total > self.max_bytes and len(self._images) > 1:
+            oldest = None
+            for name in self._images:
+                if oldest is None or self._images[name][2] < self._images[oldest][2]:
+                    oldest = name
+            total -= self._images.pop(oldest)[1]
+            self._remove(oldest)
+        self._save_index()
+
+    def _remove(self, filename):
+        if self.on_remove:
+            self.on_remove(filename)
+        try:
+            os.remove(filename)
+        except OSError:
+            pass
+
+    def _load_index(self):
+        """Read the index, and delete any images in the directory it doesn't list, and what's
+        left of downloads that never finished. Other files are left alone."""
+        try:
+            with open(self.directory + "/index", "r") as file:
+                for line in file:
+                    try:
+                        name, size, used, key = line.rstrip("\n").split("\t", 3)
+                        self._images["%s/%s" % (self.directory, name)] = [key, int(size),
+                                                                         int(used)]
+                        self._clock = max(self._clock, int(used))
+                    except ValueError:
+                        pass    # a damaged line, forget that image
+        except OSError:
+            pass    # nothing cached yet
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            filename = "%s/%s" % (self.directory, name)
+            if filename not in self._images and self._ours(name):
+                self._remove(filename)
+
+    @staticmethod
+    def _ours(name):
+        """Whether name is that of one of our images, or of a download of one"""
+        parts = name.split(".", 1)
+        if len(parts[0]) != 8 or len(parts) < 2 or parts[1] not in ("bmp", "bmp.part",
+                                                                     "bmp.part.tag"):
+            return False
+        try:
+            int(parts[0], 16)
+        except ValueError:
+            return False
+        return True
+
+    def _save_index(self):
+        index = self.directory + "/index"
+        try:
+            with open(index + ".tmp", "w") as file:
+                for filename, (key, size, used) in self._images.items():
+                    file.write("%s\t%d\t%d\t%s\n" % (filename[len(self.directory) + 1:],
+                                                     size, used, key))
+            try:
+                os.remove(index)
+            except OSError:
+                pass
+            os.rename(index + ".tmp", index)
+        except OSError as error:
+            print("Couldn't save the image cache index:", error)
+
+
+class _JSONPathScanner:
+    """Finds the values at a list of json paths in a JSON document that is fed to it a chunk
+    at a time, as it arrives, keeping only those values instead of parsing the whole
+    document."""
+    # pylint: disable=too-many-instance-attributes
+
+    # what the next byte of the document can be
+    _VALUE = 0      # the start of a value, or the end of an empty list
+    _KEY = 1        # an object's key, or the end of an empty object
+    _COLON = 2      # the ':' after a key
+    _NEXT = 3       # a ',' or the end of the object or list the last value is in
+    _RAW = 4        # more of the value being read over
+    _DONE = 5       # nothing, the document or everything we're looking for is done
+
+    def __init__(self, paths):
+        self._paths = [tuple(path) for path in paths]
+        self._found = {}
+        self._document = None
+        for path in self._paths:
+            for x in path:
+                if isinstance(x, int) and x < 0:
+                    # counting back from the end of a list needs the whole document
+                    self._document = bytearray()
+        self._state = self._VALUE
+        self._containers = []   # [whether it's an object, key or index] for each we're in
+        self._raw = None        # the value being read over, if we want it
+        self._is_key = False
+        self._scalar = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, data):
+        """Scan the next chunk of the document. Returns True once everything we're looking
+        for has been found, or the document is over, so there's no need to read any more."""
+        if self._document is not None:
+            self._document.extend(data)
+            return False
+        for byte in data:
+            if self._state == self._RAW and self._raw_byte(byte):
+                continue
+            if self._state == self._DONE:
+                break
+            if byte not in (0x20, 0x0A, 0x0D, 0x09):
+                self._structure(byte)
+        return self._state == self._DONE
+
+    def values(self):
+        """Finish scanning, returning a dict of the values found, by path index"""
+        if self._document is not None:
+            import json
+            json_out = json.loads(self._document)
+            self._document = None
+            for i, wanted in enumerate(self._paths):
+                try:
+                    self._found[i] = PyPortal._json_traverse(json_out, wanted)
+                except (KeyError, IndexError, TypeError):
+                    pass
+            return self._found
+        if self._state == self._RAW and self._scalar and not self._containers:
+            self._end_raw()     # a document that's just a number runs up to its end
+        if self._state != self._DONE:
+            raise ValueError("JSON ended early")
+        return self._found
+
+    def _path(self):
+        return tuple(container[1] for container in self._containers)
+
+    def _structure(self, byte):
+        """Handle a byte that isn't part of a value being read over"""
+        state = self._state
+        if state == self._VALUE:
+            if byte == 0x5D and self._containers and not self._containers[-1][0]:
+                self._close()
+            else:
+                self._start_value(byte)
+        elif state == self._KEY:
+            if byte == 0x7D:
+                self._close()
+            elif byte == 0x22:
+                self._is_key = True
+                self._start_raw(byte, bytearray())
+            else:
+                raise ValueError("Expected a key")
+        elif state == self._COLON:
+            if byte != 0x3A:
+                raise ValueError("Expected ':' after key")
+            self._state = self._VALUE
+        else:
+            container = self._containers[-1]
+            if byte == 0x2C:
+                if container[0]:
+                    self._state = self._KEY
+                else:
+                    container[1] += 1
+                    self._state = self._VALUE
+            elif byte == (0x7D if container[0] else 0x5D):
+                self._close()
+            else:
+                raise ValueError("Expected ',' or the end of a list or object")
+
+    def _start_value(self, byte):
+        """Handle the value starting with byte: keep it if we want it, look inside it if
+        something we want is in there, otherwise read over it"""
+        path = self._path()
+        depth = len(path)
+        if path in self._paths:
+            self._start_raw(byte, bytearray())
+        elif (byte in (0x7B, 0x5B) and
+              [p for p in self._paths if len(p) > depth and p[:depth] == path]):
+            self._containers.append([byte == 0x7B, 0])
+            self._state = self._KEY if byte == 0x7B else self._VALUE
+        else:
+            self._start_raw(byte, None)
+
+    def _start_raw(self, byte, out):
+        """Start reading over the value starting with byte, adding it to the bytearray
+        out unless that's None"""
+        self._raw = out
+        self._scalar = byte not in (0x7B, 0x5B, 0x22)
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._state = self._RAW
+        self._raw_byte(byte)
+
+    def _raw_byte(self, byte):
+        """Read over the next byte of a value. Returns False if byte comes after the
+        value instead, which happens at the end of a number, true, false or null."""
+        if self._scalar:
+            if byte in (0x2C, 0x7D, 0x5D, 0x20, 0x0A, 0x0D, 0x09):
+                self._end_raw()
+                return False
+            if self._raw is not None:
+                self._raw.append(byte)
+            return True
+        if self._raw is not None:
+            self._raw.append(byte)
+        if self._in_string:
+            if self._escaped:
+                self._escaped = False
+            elif byte == 0x5C:
+                self._escaped = True
+            elif byte == 0x22:
+                self._in_string = False
+                if not self._depth:
+                    self._end_raw()
+        elif byte == 0x22:
+            self._in_string = True
+        elif byte in (0x7B, 0x5B):
+            self._depth += 1
+        elif byte in (0x7D, 0x5D):
+            self._depth -= 1
+            if not self._depth:
+                self._end_raw()
+        return True
+
+    def _end_raw(self):
+        """The value being read over is complete"""
+        import json
+        raw = self._raw
+        self._raw = None
+        if self._is_key:
+            self._is_key = False
+            self._containers[-1][1] = json.loads(raw)
+            self._state = self._COLON
+            return
+        if raw is not None:
+            path = self._path()
+            depth = len(path)
+            value = json.loads(raw)
+            for i, wanted in enumerate(self._paths):
+                if wanted[:depth] == path:
+                    try:
+                        self._found[i] = PyPortal._json_traverse(value, wanted[depth:])
+                    except (KeyError, IndexError, TypeError):
+                        pass
+            if len(self._found) == len(self._paths):
+                self._state = self._DONE
+                return
+        self._state = self._NEXT if self._containers else self._DONE
+
+    def _close(self):
+        """The object or list we're in is complete"""
+        self._containers.pop()
+        self._state = self._NEXT if self._containers else self._DONE
+
+
 class PyPortal:
     """Class representing the Adafruit PyPortal.
 
@@ -148,6 +709,17 @@ class PyPortal:
     :param esp: A passed ESP32 object, Can be used in cases where the ESP32 chip needs to be used
                              before calling the pyportal class. Defaults to ``None``.
     :param busio.SPI external_spi: A previously declared spi object. Defaults to ``None``.
+    :param cache_responses: Keep replies on the filesystem (the SD card if there is one), using
+                            them without asking the server while their ``Cache-Control:
+                            max-age`` lasts, and after that asking the server to only send the
+                            data again if it has changed. Without an SD card this needs
+                            CIRCUITPY to be writable, otherwise replies aren't cached.
+                            Defaults to ``False``.
+    :param int image_cache_bytes: Keep up to this many bytes of the images fetched for
+                                  ``image_json_path`` or ``image_url_path`` on the filesystem (the
+                                  SD card if there is one), so an image that's been shown before
+                                  doesn't have to be converted and downloaded again. Defaults to
+                                  0, which only keeps the last one, as ``cache.bmp``.
     :param debug: Turn on debug print outs. Defaults to False.
 
     """
@@ -159,9 +731,16 @@ class PyPortal:
                  image_json_path=None, image_resize=None, image_position=None,
                  caption_text=None, caption_font=None, caption_position=None,
                  caption_color=0x808080, image_url_path=None,
-                 success_callback=None, esp=None, external_spi=None, debug=False):
+                 success_callback=None, esp=None, external_spi=None,
+                 cache_responses=False, image_cache_bytes=0, debug=False):
 
         self._debug = debug
+        # the time (ms since the epoch) at the tick of the last sync, and how much faster
+        # than our ticks real time goes, as a fraction
+        self._sync_time = None
+        self._sync_ticks = None
+        self._drift = None
+        self.time_sync_interval = TIME_SYNC_MIN_INTERVAL
 
         try:
             self._backlight = pulseio.PWMOut(board.TFT_BACKLIGHT)  # pylint: disable=no-member
@@ -201,7 +780,8 @@ class PyPortal:
         if self._debug:
             print("Init background")
         self._bg_group = displayio.Group(max_size=1)
-        self._bg_file = None
+        self.sprite_cache = SpriteCache()
+        self.frames = FrameScheduler(board.DISPLAY)
         self._default_bg = default_bg
         self.splash.append(self._bg_group)
 
@@ -214,7 +794,6 @@ class PyPortal:
                     self.set_backlight(i/100)
                     time.sleep(0.005)
                 self.set_background(bootscreen)
-                board.DISPLAY.wait_for_frame()
                 for i in range(100):  # dim up
                     self.set_backlight(i/100)
                     time.sleep(0.005)
@@ -283,6 +862,19 @@ class PyPortal:
         except OSError as error:
             print("No SD card found:", error)
 
+        self._response_cache = None
+        if cache_responses:
+            directory = "/sd/responses" if self._sdcard else "/responses"
+            if _writable(directory):
+                self._response_cache = requests.ResponseCache(directory)
+            else:
+                print("Can't write to", directory, "so replies won't be cached")
+
+        self._image_cache = None
+        if image_cache_bytes:
+            self._image_cache = ImageCache("/sd/images" if self._sdcard else "/images",
+                                           image_cache_bytes, on_remove=self.sprite_cache.forget)
+
         self._qr_group = None
         # Tracks whether we've hidden the background when we showed the QR code.
         self._qr_only = False
@@ -336,6 +928,9 @@ class PyPortal:
             self._text_font = None
             self._text = None
 
+        self._fetch_steps = None
+        self._fetch_result = None
+
         self._image_json_path = image_json_path
         self._image_url_path = image_url_path
         self._image_resize = image_resize
@@ -371,25 +966,16 @@ class PyPortal:
         print("Set background to ", file_or_color)
         while self._bg_group:
             self._bg_group.pop()
+        self.sprite_cache.pinned = None
 
         if not position:
             position = (0, 0)  # default in top corner
 
         if not file_or_color:
             return  # we're done, no background desired
-        if self._bg_file:
-            self._bg_file.close()
         if isinstance(file_or_color, str): # its a filenme:
-            self._bg_file = open(file_or_color, "rb")
-            background = displayio.OnDiskBitmap(self._bg_file)
-            try:
-                self._bg_sprite = displayio.TileGrid(background,
-                                                     pixel_shader=displayio.ColorConverter(),
-                                                     position=position)
-            except TypeError:
-                self._bg_sprite = displayio.TileGrid(background,
-                                                     pixel_shader=displayio.ColorConverter(),
-                                                     x=position[0], y=position[1])
+            self._bg_sprite = self.sprite_cache.get(file_or_color, position)
+            self.sprite_cache.pinned = file_or_color
         elif isinstance(file_or_color, int):
             # Make a background color fill
             color_bitmap = displayio.Bitmap(320, 240, 1)
@@ -406,9 +992,10 @@ class PyPortal:
         else:
             raise RuntimeError("Unknown type of background")
         self._bg_group.append(self._bg_sprite)
-        board.DISPLAY.refresh_soon()
+        self.frames.invalidate()
         gc.collect()
-        board.DISPLAY.wait_for_frame()
+        if not self.frames.deferred:
+            self.frames.update()
 
     def set_backlight(self, val):
         """Adjust the TFT backlight.
@@ -458,15 +1045,15 @@ class PyPortal:
 
         if self._caption:
             self._caption._update_text(str(caption_text))  # pylint: disable=protected-access
-            board.DISPLAY.refresh_soon()
-            board.DISPLAY.wait_for_frame()
-            return
-
-        self._caption = Label(self._caption_font, text=str(caption_text))
-        self._caption.x = caption_position[0]
-        self._caption.y = caption_position[1]
-        self._caption.color = caption_color
-        self.splash.append(self._caption)
+        else:
+            self._caption = Label(self._caption_font, text=str(caption_text))
+            self._caption.x = caption_position[0]
+            self._caption.y = caption_position[1]
+            self._caption.color = caption_color
+            self.splash.append(self._caption)
+        self.frames.invalidate_label(self._caption)
+        if not self.frames.deferred:
+            self.frames.update()
 
     def set_text(self, val, index=0):
         """Display text, with indexing into our list of text boxes.
@@ -566,70 +1153,225 @@ class PyPortal:
             api_url = TIME_SERVICE % (aio_username, aio_key)
         api_url += TIME_SERVICE_STRFTIME
         try:
+            start = _ticks_ms()
             response = requests.get(api_url)
+            try:
+                text = response.text
+                stop = _ticks_ms()
+            finally:
+                # now clean up
+                response.close()
+                response = None
+                gc.collect()
             if self._debug:
                 print("Time request: ", api_url)
-                print("Time reply: ", response.text)
-            times = response.text.split(' ')
+                print("Time reply: ", text)
+            times = text.split(' ')
             the_date = times[0]
             the_time = times[1]
             year_day = int(times[2])
             week_day = int(times[3])
-            is_dst = None  # no way to know yet
+            is_dst = -1  # no way to know yet
         except KeyError:
             raise KeyError("Was unable to lookup the time, try setting secrets['timezone'] according to http://worldtimeapi.org/timezones")  # pylint: disable=line-too-long
         year, month, mday = [int(x) for x in the_date.split('-')]
-        the_time = the_time.split('.')[0]
+        the_time, millis = the_time.split('.')
         hours, minutes, seconds = [int(x) for x in the_time.split(':')]
         now = time.struct_time((year, month, mday, hours, minutes, seconds, week_day, year_day,
                                 is_dst))
+        # the server read its clock about halfway through the round trip
+        self._sync(time.mktime(now) * 1000 + int(millis) + (stop - start) // 2, stop,
+                   (stop - start) / 2000)
+        now = self.localtime()
         print(now)
         rtc.RTC().datetime = now
 
-        # now clean up
-        response.close()
-        response = None
-        gc.collect()
-
-    def wget(self, url, filename, *, chunk_size=12000):
+    def _sync(self, measured, ticks, uncertainty):
+        """Take a new measurement of the time (ms since the epoch) at ticks: update the
+        drift estimate, and widen or narrow the sync interval depending on how far off
+        our prediction was"""
+        if self._sync_ticks is not None:
+            elapsed = ticks - self._sync_ticks
+            error = (measured - self.time_ms(ticks)) / 1000
+            if self._debug:
+                print("Clock was off by %0.3f s after %d s" % (error, elapsed // 1000))
+            if elapsed >= 600000:     # shorter gaps are too noisy to learn from
+                drift = (measured - self._sync_time - elapsed) / elapsed
+                if self._drift is None:
+                    self._drift = drift
+                else:
+                    self._drift = (self._drift + drift) / 2
+            if abs(error) <= max(TIME_SYNC_TOLERANCE, uncertainty):
+                self.time_sync_interval = min(self.time_sync_interval * 2, TIME_SYNC_MAX_INTERVAL)
+            else:
+                self.time_sync_interval = max(self.time_sync_interval // 2,
+                                              TIME_SYNC_MIN_INTERVAL)
+        self._sync_time = measured
+        self._sync_ticks = ticks
+
+    def time_ms(self, ticks=None):
+        """The current time in milliseconds since the epoch, based on the last
+        `get_local_time` and corrected for how fast or slow our clock has been running.
+        Returns ``None`` if the time hasn't been synced yet."""
+        if self._sync_ticks is None:
+            return None
+        if ticks is None:
+            ticks = _ticks_ms()
+        elapsed = ticks - self._sync_ticks
+        return self._sync_time + elapsed + int(elapsed * (self._drift or 0))
+
+    def localtime(self):
+        """Like ``time.localtime()``, but corrected for our clock's drift since the last
+        `get_local_time`. Falls back to the RTC if the time hasn't been synced yet."""
+        now = self.time_ms()
+        if now is None:
+            return time.localtime()
+        return time.localtime(now // 1000)
+
+    def wget(self, url, filename, *, chunk_size=12288, retries=3):
         """Download a url and save to filename location, like the command wget.
 
+        The data goes to ``filename + ".part"`` until it's all there, then replaces filename,
+        so a failed download never leaves half a file in its place. If the connection drops
+        part way, or a ``.part`` file is left from before, the download carries on from where
+        it stopped with an HTTP Range request, if the server takes them. The ETag or
+        Last-Modified date of the download is kept in ``filename + ".part.tag"`` and sent with
+        the Range request, so if the file has changed since, the server sends all of it again.
+
         :param url: The URL from which to obtain the data.
         :param filename: The name of the file to save the data to.
-        :param chunk_size: how much data to read/write at a time.
+        :param chunk_size: how much data to read/write at a time. The buffer is filled up
+                           before each write, so all but the last write are this size. Keep
+                           it a multiple of 512, the SD card's block size.
+        :param retries: how many times to carry on after the connection drops.
 
         """
         print("Fetching stream from", url)
-
-        self.neo_status((100, 100, 0))
-        r = requests.get(url, stream=True)
-
-        if self._debug:
-            print(r.headers)
-        content_length = int(r.headers['content-length'])
-        remaining = content_length
-        print("Saving data to ", filename)
+        partial = filename + ".part"
+        buffer = memoryview(bytearray(chunk_size))
         stamp = time.monotonic()
-        file = open(filename, "wb")
-        for i in r.iter_content(min(remaining, chunk_size)):  # huge chunks!
-            self.neo_status((0, 100, 100))
-            remaining -= len(i)
-            file.write(i)
-            if self._debug:
-                print("Read %d bytes, %d remaining" % (content_length-remaining, remaining))
-            else:
-                print(".", end='')
-            if not remaining:
+        for attempt in range(retries + 1):
+            before = self._file_size(partial)
+            try:
+                total = self._wget_part(url, partial, buffer)
+            except RuntimeError as error:
+                # only worth another go if this one got somewhere
+                if attempt == retries or self._file_size(partial) == before:
+                    raise
+                print("Download interrupted:", error)
+                continue
+            size = self._file_size(partial)
+            if total is None or size == total:
                 break
-            self.neo_status((100, 100, 0))
-        file.close()
+            if size > total or attempt == retries or size == before:
+                raise RuntimeError("Got %d of %d bytes from %s" % (size, total, url))
+            print("Download interrupted at %d of %d bytes" % (size, total))
 
-        r.close()
+        try:
+            os.remove(filename)
+        except OSError:
+            pass    # there wasn't one
+        os.rename(partial, filename)
+        try:
+            os.remove(partial + ".tag")
+        except OSError:
+            pass
         stamp = time.monotonic() - stamp
-        print("Created file of %d bytes in %0.1f seconds" % (os.stat(filename)[6], stamp))
+        print("Created file of %d bytes in %0.1f seconds" % (size, stamp))
         self.neo_status((0, 0, 0))
-        if not content_length == os.stat(filename)[6]:
-            raise RuntimeError
+
+    @staticmethod
+    def _file_size(filename):
+        try:
+            return os.stat(filename)[6]
+        except OSError:
+            return 0
+
+    def _wget_part(self, url, partial, buffer):
+        """Download url onto the end of the file partial, asking for only what it doesn't have
+        yet, reading into and writing out whole buffers. Returns the size of the whole
+        download, or None if the server didn't say."""
+        # pylint: disable=too-many-branches
+        offset = self._file_size(partial)
+        headers = {}
+        if offset:
+            # only carry on if we can tell the server which version of the file we have
+            try:
+                with open(partial + ".tag", "r") as file:
+                    validator = file.read()
+            except OSError:
+                validator = None
+            if validator:
+                headers["Range"] = "bytes=%d-" % offset
+                headers["If-Range"] = validator
+        self.neo_status((100, 100, 0))
+        r = requests.get(url, headers=headers, stream=True)
+        try:
+            if self._debug:
+                print(r.headers)
+            total = None
+            if r.status_code == 206:
+                # "bytes first-last/total"
+                content_range = r.headers.get("content-range", "")
+                if not content_range.startswith("bytes %d-" % offset):
+                    os.remove(partial)
+                    raise RuntimeError("Server sent the wrong range: " + content_range)
+                total = content_range.split("/")[-1]
+                total = int(total) if total.isdigit() else None
+                mode = "ab"
+            elif r.status_code == 200:
+                # all of it, either because we didn't ask for a range or the file changed
+                if "content-length" in r.headers:
+                    total = int(r.headers["content-length"])
+                offset = 0
+                mode = "wb"
+                # If-Range needs a strong ETag, otherwise the date will do
+                validator = r.headers.get("etag", "")
+                if validator.startswith("W/"):
+                    validator = ""
+                validator = validator or r.headers.get("last-modified", "")
+                if validator:
+                    with open(partial + ".tag", "w") as file:
+                        file.write(validator)
+                else:
+                    try:
+                        os.remove(partial + ".tag")
+                    except OSError:
+                        pass
+            else:
+                if r.status_code == 416 and offset:
+                    os.remove(partial)  # what we have doesn't fit what's there now
+                raise RuntimeError("HTTP error %d" % r.status_code)
+
+            print("Saving data to ", partial)
+            received = offset
+            filled = 0
+            with open(partial, mode) as file:
+                try:
+                    while True:
+                        count = r.readinto(buffer[filled:])
+                        filled += count
+                        if count and filled < len(buffer):
+                            continue
+                        if filled:
+                            self.neo_status((0, 100, 100))
+                            file.write(buffer[:filled])
+                            received += filled
+                            filled = 0
+                            if self._debug:
+                                print("Read %d bytes of %s" % (received, total))
+                            else:
+                                print(".", end='')
+                            self.neo_status((100, 100, 0))
+                        if not count:
+                            break
+                finally:
+                    if filled:
+                        # the connection failed, keep what did arrive for next time
+                        file.write(buffer[:filled])
+            return total
+        finally:
+            r.close()
 
     def _connect_esp(self):
         self.neo_status((0, 0, 100))
@@ -651,6 +1393,10 @@ class PyPortal:
                 print("Could not connect to internet", error)
                 print("Retrying in 3 seconds...")
                 time.sleep(3)
+                continue
+            # look up our data source now, rather than when it's time to fetch
+            if self._url and self._url.startswith("http:"):
+                socket.preresolve(self._url.split("/", 3)[2].split(":", 1)[0])
 
     @staticmethod
     def image_converter_url(image_url, width, height, color_depth=16):
@@ -715,9 +1461,6 @@ class PyPortal:
         """
         if refresh_url:
             self._url = refresh_url
-        json_out = None
-        image_url = None
-        values = []
 
         gc.collect()
         if self._debug:
@@ -734,24 +1477,168 @@ class PyPortal:
             print("Retrieving data...", end='')
             self.neo_status((100, 100, 0))   # yellow = fetching data
             gc.collect()
-            r = requests.get(self._url, headers=self._headers)
+            if self._response_cache:
+                r = self._response_cache.get(self._url, headers=self._headers)
+            else:
+                r = requests.get(self._url, headers=self._headers)
             gc.collect()
             self.neo_status((0, 0, 100))   # green = got data
             print("Reply is OK!")
 
+        return self._process_response(r)
+
+    def fetch_async(self, refresh_url=None):
+        """Start a `fetch` that is done a small step at a time by calling `poll`, so other
+        work can carry on while the data is on its way. Downloading an image found by
+        ``image_json_path`` still happens in a single step.
+        Optionally update the URL
+        """
+        if refresh_url:
+            self._url = refresh_url
+        self._fetch_result = None
+        self._fetch_steps = self._fetch_generator()
+
+    @property
+    def fetching(self):
+        """True while a fetch started by `fetch_async` hasn't finished"""
+        return self._fetch_steps is not None
+
+    def cancel_fetch(self):
+        """Abandon the fetch started by `fetch_async`, if there is one, closing its socket"""
+        if self._fetch_steps:
+            self._fetch_steps.close()
+            self._fetch_steps = None
+
+    def poll(self):
+        """Do the next step of the fetch started by `fetch_async`. Returns ``None`` until the
+        fetch is finished (`fetching` is False), then what `fetch` would have returned.
+        Errors are raised just like `fetch` raises them, and end the fetch."""
+        if not self._fetch_steps:
+            raise RuntimeError("No fetch in progress")
+        try:
+            next(self._fetch_steps)
+        except StopIteration:
+            self._fetch_steps = None
+            return self._fetch_result
+        except Exception:
+            self._fetch_steps = None
+            raise
+        return None
+
+    def _fetch_generator(self):
+        scanner = None
+        gc.collect()
         if self._debug:
+            print("Free mem: ", gc.mem_free())  # pylint: disable=no-member
+
+        r = None
+        if self._uselocal:
+            print("*** USING LOCALFILE FOR DATA - NOT INTERNET!!! ***")
+            r = Fake_Requests(LOCALFILE)
+
+        if not r:
+            self._connect_esp()
+            yield
+            # great, lets get the data
+            print("Retrieving data...", end='')
+            self.neo_status((100, 100, 0))   # yellow = fetching data
+            r = requests.Response(None)
+            if self._response_cache:
+                steps = self._response_cache.get_steps(r, self._url, headers=self._headers)
+            else:
+                steps = requests.request_steps(r, "GET", self._url, headers=self._headers)
+            try:
+                for _ in steps:
+                    yield
+                self.neo_status((0, 0, 100))   # green = got data
+                print("Reply is OK!")
+                # read the body a piece at a time as it arrives, straight into the json
+                # scanner if that's all it's needed for
+                if self._json_path and r.status_code == 200:
+                    scanner = _JSONPathScanner(self._scanned_paths())
+                    found = False
+                else:
+                    body = bytearray()
+                buffer = bytearray(256)
+                view = memoryview(buffer)
+                stamp = time.monotonic()
+                while True:
+                    count = r.readinto(buffer, wait=False)
+                    if count is None:
+                        if time.monotonic() - stamp > 5:
+                            raise RuntimeError("Didn't receive full response, failing out")
+                    elif not count:
+                        break
+                    elif scanner:
+                        found = found or scanner.feed(view[:count])
+                        if found and not self._response_cache:
+                            break   # that's everything we're after
+                        # otherwise read the rest, so the reply is cached whole
+                        stamp = time.monotonic()
+                    else:
+                        body.extend(view[:count])
+                        stamp = time.monotonic()
+                    yield
+                if not scanner:
+                    r._cached = body  # pylint: disable=protected-access
+                    body = None
+            except BaseException:    # including GeneratorExit, when the fetch is dropped
+                r.close()
+                raise
+            yield
+
+        self._fetch_result = self._process_response(r, scanner)
+
+    def _scanned_paths(self):
+        """The json paths to look for in a reply: json_path's, then image_json_path"""
+        paths = list(self._json_path or ())
+        if self._image_json_path:
+            paths.append(self._image_json_path)
+        return paths
+
+    def _process_response(self, r, scanner=None):
+        """Parse the reply to a fetch, then display text or graphics and return the values.
+        If the reply has already been fed through a _JSONPathScanner, pass that as scanner."""
+        json_out = None
+        image_url = None
+        values = []
+        # only the values are needed, so read them straight off the socket if we can
+        streaming = scanner or (self._json_path and getattr(r, "socket", None))
+
+        if self._debug and not streaming:
             print(r.text)
 
         if self._image_json_path or self._json_path:
+            paths = self._scanned_paths()
             try:
                 gc.collect()
-                json_out = r.json()
+                if not scanner:
+                    scanner = _JSONPathScanner(paths)
+                    if streaming:
+                        found = False
+                        for chunk in r.iter_content(256):
+                            found = found or scanner.feed(chunk)
+                            if found and not self._response_cache:
+                                break   # that's everything we're after
+                            # otherwise read the rest, so the reply is cached whole
+                    elif hasattr(r, "content"):
+                        scanner.feed(r.content)
+                    else:
+                        scanner.feed(r.text.encode())
+                json_out = scanner.values()
+                scanner = None
                 gc.collect()
             except ValueError:            # failed to parse?
-                print("Couldn't parse json: ", r.text)
+                if streaming:
+                    print("Couldn't parse json")
+                else:
+                    print("Couldn't parse json: ", r.text)
                 raise
             except MemoryError:
                 supervisor.reload()
+            finally:
+                if streaming:
+                    r.close()
 
         if self._regexp_path:
             import re
@@ -761,12 +1648,11 @@ class PyPortal:
 
         # extract desired text/values from json
         if self._json_path:
-            for path in self._json_path:
-                try:
-                    values.append(PyPortal._json_traverse(json_out, path))
-                except KeyError:
+            for i, path in enumerate(self._json_path):
+                if i not in json_out:
                     print(json_out)
-                    raise
+                    raise KeyError(path)
+                values.append(json_out[i])
         elif self._regexp_path:
             for regexp in self._regexp_path:
                 values.append(re.search(regexp, r.text).group(1))
@@ -774,10 +1660,9 @@ class PyPortal:
             values = r.text
 
         if self._image_json_path:
-            try:
-                image_url = PyPortal._json_traverse(json_out, self._image_json_path)
-            except KeyError as error:
-                print("Error finding image data. '" + error.args[0] + "' not found.")
+            image_url = json_out.get(len(paths) - 1)
+            if image_url is None:
+                print("Error finding image data. '%s' not found." % (self._image_json_path,))
                 self.set_background(self._default_bg)
 
         # we're done with the requests object, lets delete it so we can do more!
@@ -788,26 +1673,40 @@ class PyPortal:
         if image_url:
             try:
                 print("original URL:", image_url)
-                image_url = self.image_converter_url(image_url,
-                                                     self._image_resize[0],
-                                                     self._image_resize[1])
-                print("convert URL:", image_url)
-                # convert image to bitmap and cache
-                #print("**not actually wgetting**")
-                filename = "/cache.bmp"
-                chunk_size = 12000      # default chunk size is 12K (for QSPI)
-                if self._sdcard:
-                    filename = "/sd" + filename
-                    chunk_size = 512  # current bug in big SD writes -> stick to 1 block
-                try:
-                    self.wget(image_url, filename, chunk_size=chunk_size)
-                except OSError as error:
-                    print(error)
-                    raise OSError("""\n\nNo writable filesystem found for saving datastream. Insert an SD card or set internal filesystem to be unsafe by setting 'disable_concurrent_write_protection' in the mount options in boot.py""") # pylint: disable=line-too-long
-                except RuntimeError as error:
-                    print(error)
-                    raise RuntimeError("wget didn't write a complete file")
+                # what the converter makes of it: the image, its size and color depth
+                key = "%s %dx%d 16" % (image_url, self._image_resize[0], self._image_resize[1])
+                filename = self._image_cache and self._image_cache.get(key)
+                downloaded = not filename
+                if filename:
+                    print("Using cached image", filename)
+                else:
+                    image_url = self.image_converter_url(image_url,
+                                                         self._image_resize[0],
+                                                         self._image_resize[1])
+                    print("convert URL:", image_url)
+                    # convert image to bitmap and cache
+                    #print("**not actually wgetting**")
+                    filename = "/cache.bmp"
+                    if self._sdcard:
+                        filename = "/sd" + filename
+                    if self._image_cache:
+                        filename = self._image_cache.filename(key)
+                    # the file's about to change, so stop showing it before letting it go
+                    if self.sprite_cache.pinned == filename:
+                        self.set_background(self._default_bg)
+                    self.sprite_cache.forget(filename)
+                    try:
+                        self.wget(image_url, filename)
+                    except OSError as error:
+                        print(error)
+                        raise OSError("""\n\nNo writable filesystem found for saving datastream. Insert an SD card or set internal filesystem to be unsafe by setting 'disable_concurrent_write_protection' in the mount options in boot.py""") # pylint: disable=line-too-long
+                    except RuntimeError as error:
+                        print(error)
+                        raise RuntimeError("wget didn't write a complete file")
                 self.set_background(filename, self._image_position)
+                # only once the new image is showing, as adding it can delete the old one
+                if downloaded and self._image_cache:
+                    self._image_cache.add(key)
             except ValueError as error:
                 print("Error displaying cached image. " + error.args[0])
                 self.set_background(self._default_bg)
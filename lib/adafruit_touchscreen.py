@@ -43,6 +43,7 @@ Implementation Notes
 __version__ = "1.0.0"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Touchscreen.git"
 
+import time
 from digitalio import DigitalInOut
 from analogio import AnalogIn
 
@@ -96,24 +97,45 @@ class Touchscreen:
         self._calib = calibration
         self._size = size
         self._zthresh = z_threshhold
+        # y1 is only ever driven, never read, so it can keep its DigitalInOut
+        self._y_m = DigitalInOut(y1_pin)
+
+    def deinit(self):
+        """Release the pin this keeps hold of"""
+        self._y_m.deinit()
 
     @property
     def touch_point(self): # pylint: disable=too-many-locals
         """A tuple that represents the x, y and z (touch pressure) coordinates
         of a touch. Or, None if no touch is detected"""
+        y_m = self._y_m
+        # Check the pressure first: when nothing's touching that's all we need to read
+        with DigitalInOut(self._xp_pin) as x_p:
+            x_p.switch_to_output(False)
+            y_m.switch_to_output(True)
+            with AnalogIn(self._xm_pin) as x_m:
+                z_1 = x_m.value
+            with AnalogIn(self._yp_pin) as y_p:
+                z_2 = y_p.value
+        #print(z_1, z_2)
+        z = 65535 - (z_2-z_1)
+        if z <= self._zthresh:
+            y_m.switch_to_input()
+            return None
+
         with DigitalInOut(self._yp_pin) as y_p:
-            with DigitalInOut(self._ym_pin) as y_m:
-                with AnalogIn(self._xp_pin) as x_p:
-                    y_p.switch_to_output(True)
-                    y_m.switch_to_output(False)
-                    for i in range(len(self._xsamples)):
-                        self._xsamples[i] = x_p.value
+            with AnalogIn(self._xp_pin) as x_p:
+                y_p.switch_to_output(True)
+                y_m.switch_to_output(False)
+                for i in range(len(self._xsamples)):
+                    self._xsamples[i] = x_p.value
         x = sum(self._xsamples) / len(self._xsamples)
         x_size = 65535
         if self._size:
             x_size = self._size[0]
         x = int(map_range(x, self._calib[0][0], self._calib[0][1], 0, x_size))
 
+        y_m.switch_to_input()   # let y1 float while the y plate is read
         with DigitalInOut(self._xp_pin) as x_p:
             with DigitalInOut(self._xm_pin) as x_m:
                 with AnalogIn(self._yp_pin) as y_p:
@@ -126,18 +148,150 @@ class Touchscreen:
         if self._size:
             y_size = self._size[1]
         y = int(map_range(y, self._calib[1][0], self._calib[1][1], 0, y_size))
+        return (x, y, z)
 
-        z_1 = z_2 = z = None
-        with DigitalInOut(self._xp_pin) as x_p:
-            x_p.switch_to_output(False)
-            with DigitalInOut(self._ym_pin) as y_m:
-                y_m.switch_to_output(True)
-                with AnalogIn(self._xm_pin) as x_m:
-                    z_1 = x_m.value
-                with AnalogIn(self._yp_pin) as y_p:
-                    z_2 = y_p.value
-        #print(z_1, z_2)
-        z = 65535 - (z_2-z_1)
-        if z > self._zthresh:
-            return (x, y, z)
+
+class TouchEvent:
+    """Something that happened on the touchscreen.
+
+    ``kind`` is one of `TouchSampler`'s ``DOWN``, ``MOVE``, ``UP``, ``TAP`` or ``SWIPE``.
+    ``x``, ``y`` and ``z`` are where (and how hard) the touch was. ``dx`` and ``dy`` are how
+    far it moved: since the last ``MOVE`` (or the ``DOWN``) for a ``MOVE``, since the ``DOWN``
+    for the rest. ``time`` is the `time.monotonic` time of the sample it came from."""
+
+    # pylint: disable=too-few-public-methods,too-many-arguments,invalid-name
+    def __init__(self, kind, x, y, z, dx, dy, when):
+        self.kind = kind
+        self.x = x
+        self.y = y
+        self.z = z
+        self.dx = dx
+        self.dy = dy
+        self.time = when
+
+    def __repr__(self):
+        return "TouchEvent(%s, %d, %d, dx=%d, dy=%d)" % (self.kind, self.x, self.y,
+                                                          self.dx, self.dy)
+
+
+class TouchSampler:
+    """Samples a `Touchscreen` at a steady rate and turns what it sees into a queue of
+    `TouchEvent`, so the touch can be read between other work rather than polled as fast
+    as possible. Call `poll` often (it only samples when one is due) and take the events
+    with `get` or `events`.
+
+    :param Touchscreen touchscreen: The touchscreen to read.
+    :param int rate: Samples per second.
+    :param int queue_size: The most events to hold. The oldest are dropped once it's full.
+    :param int move_distance: How far a touch has to move, in either direction, for a
+                              ``MOVE`` event.
+    :param float tap_time: The longest a touch can last and still be a ``TAP``.
+    :param int tap_distance: The furthest a touch can move and still be a ``TAP``.
+    :param int swipe_distance: The least a touch has to move to be a ``SWIPE``.
+    :param float swipe_time: The longest a touch can last and still be a ``SWIPE``.
+    :param int release_samples: How many samples in a row have to see no touch before it's
+                                an ``UP``, which rides out the odd dropped sample.
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    DOWN = "down"
+    MOVE = "move"
+    UP = "up"
+    TAP = "tap"
+    SWIPE = "swipe"
+
+    def __init__(self, touchscreen, *, rate=50, queue_size=16, move_distance=5,
+                 tap_time=0.3, tap_distance=10, swipe_distance=40, swipe_time=0.6,
+                 release_samples=2):
+        # pylint: disable=too-many-arguments
+        self.touchscreen = touchscreen
+        self.interval = 1 / rate
+        self.queue_size = queue_size
+        self.move_distance = move_distance
+        self.tap_time = tap_time
+        self.tap_distance = tap_distance
+        self.swipe_distance = swipe_distance
+        self.swipe_time = swipe_time
+        self.release_samples = release_samples
+        self._queue = []
+        self._next_sample = 0
+        self._down = None       # the DOWN event of the touch in progress
+        self._last = None       # where the touch was last reported as being
+        self._last_time = None  # and when
+        self._moved = None      # the touch point of the last DOWN or MOVE
+        self._misses = 0
+
+    def poll(self, now=None):
+        """Take a sample if one is due, queueing any events it brings. Returns how many
+        seconds until the next sample is due."""
+        if now is None:
+            now = time.monotonic()
+        if now < self._next_sample:
+            return self._next_sample - now
+        self._next_sample = max(self._next_sample + self.interval, now)
+        self.sample(now)
+        return self.interval
+
+    def sample(self, now=None):
+        """Read the touchscreen now, queueing any events that brings."""
+        if now is None:
+            now = time.monotonic()
+        point = self.touchscreen.touch_point
+        if point:
+            self._misses = 0
+            self._last = point
+            self._last_time = now
+            if self._down is None:
+                self._down = self._queue_event(self.DOWN, point, 0, 0, now)
+                self._moved = point
+                return
+            d_x = point[0] - self._moved[0]
+            d_y = point[1] - self._moved[1]
+            if max(abs(d_x), abs(d_y)) >= self.move_distance:
+                self._queue_event(self.MOVE, point, d_x, d_y, now)
+                self._moved = point
+            return
+        if self._down is None:
+            return
+        self._misses += 1
+        if self._misses < self.release_samples:
+            return
+        down = self._down
+        self._down = None
+        d_x = self._last[0] - down.x
+        d_y = self._last[1] - down.y
+        self._queue_event(self.UP, self._last, d_x, d_y, now)
+        distance = max(abs(d_x), abs(d_y))
+        duration = self._last_time - down.time
+        if duration <= self.tap_time and distance <= self.tap_distance:
+            self._queue_event(self.TAP, (down.x, down.y, down.z), d_x, d_y, now)
+        elif duration <= self.swipe_time and distance >= self.swipe_distance:
+            self._queue_event(self.SWIPE, self._last, d_x, d_y, now)
+
+    def _queue_event(self, kind, point, d_x, d_y, now):
+        # pylint: disable=too-many-arguments
+        event = TouchEvent(kind, point[0], point[1], point[2], d_x, d_y, now)
+        if len(self._queue) >= self.queue_size:
+            self._queue.pop(0)
+        self._queue.append(event)
+        return event
+
+    @property
+    def touching(self):
+        """Whether there's a touch in progress"""
+        return self._down is not None
+
+    def get(self):
+        """The oldest queued event, or None if there aren't any"""
+        if self._queue:
+            return self._queue.pop(0)
         return None
+
+    def events(self):
+        """Take all the queued events, oldest first"""
+        while self._queue:
+            yield self._queue.pop(0)
+
+    def clear(self):
+        """Throw away the queued events"""
+        self._queue = []
@@ -0,0 +1,112 @@
+"""
+Convert BDF fonts into the pre-rasterized BBF format read by
+``adafruit_bitmap_font.bbf``.
+
+Run this on your computer, not on the PyPortal:
+
+    python3 tools/bdf2bbf.py fonts/*.bdf
+
+Each ``name.bdf`` is written out as ``name.bbf`` next to it. Pass ``--chars`` to
+only keep the glyphs you use, which makes the file much smaller.
+
+Licensed under the MIT license.
+"""
+
+import argparse
+import struct
+
+# These must match adafruit_bitmap_font/bbf.py
+MAGIC = b"BBF\x00"
+VERSION = 1
+HEADER = "<4sHhhhhI"
+ENTRY = "<IHHhhhhI"
+
+
+def read_bdf(filename, wanted=None):
+    """Parse a BDF file. Returns the bounding box and a list of glyphs, each a tuple
+    of (code point, width, height, dx, dy, shift_x, shift_y, rows)."""
+    bounding_box = None
+    glyphs = []
+    with open(filename, "rb") as bdf:
+        lines = iter(bdf.readlines())
+    for line in lines:
+        if line.startswith(b"FONTBOUNDINGBOX "):
+            bounding_box = tuple(int(value) for value in line.split()[1:5])
+        elif line.startswith(b"STARTCHAR"):
+            code_point = None
+            shift = (0, 0)
+            bounds = (0, 0, 0, 0)
+            rows = []
+            for line in lines:
+                if line.startswith(b"ENDCHAR"):
+                    break
+                if line.startswith(b"ENCODING"):
+                    code_point = int(line.split()[1])
+                elif line.startswith(b"DWIDTH"):
+                    shift = tuple(int(value) for value in line.split()[1:3])
+                elif line.startswith(b"BBX"):
+                    bounds = tuple(int(value) for value in line.split()[1:5])
+                elif line.startswith(b"BITMAP"):
+                    for _ in range(bounds[1]):
+                        rows.append(next(lines).strip())
+            if code_point is None or code_point < 0:
+                continue
+            if wanted is not None and code_point not in wanted:
+                continue
+            glyphs.append((code_point,) + bounds + shift + (rows,))
+    if bounding_box is None:
+        raise ValueError("%s has no FONTBOUNDINGBOX" % filename)
+    glyphs.sort()
+    return bounding_box, glyphs
+
+
+def pack_rows(width, rows):
+    """Pack hex BDF rows as 1 bit per pixel rows, MSB first, padded to 32 bits"""
+    stride = ((width + 31) // 32) * 4
+    data = bytearray()
+    for row in rows:
+        packed = bytes.fromhex(row.decode("ascii"))[:stride]
+        packed = bytearray(packed + bytes(stride - len(packed)))
+        # clear any bits past the glyph width
+        for x in range(width, stride * 8):
+            packed[x >> 3] &= ~(0x80 >> (x & 7)) & 0xFF
+        data += packed
+    return bytes(data)
+
+
+def write_bbf(filename, bounding_box, glyphs):
+    """Write the glyphs out as a BBF file"""
+    header_size = struct.calcsize(HEADER)
+    entry_size = struct.calcsize(ENTRY)
+    offset = header_size + entry_size * len(glyphs)
+    table = bytearray()
+    bitmaps = bytearray()
+    for code_point, width, height, dx, dy, shift_x, shift_y, rows in glyphs:
+        data = pack_rows(width, rows)
+        table += struct.pack(ENTRY, code_point, width, height, dx, dy, shift_x, shift_y,
+                             offset + len(bitmaps))
+        bitmaps += data
+    with open(filename, "wb") as bbf:
+        bbf.write(struct.pack(HEADER, MAGIC, VERSION, *bounding_box, len(glyphs)))
+        bbf.write(table)
+        bbf.write(bitmaps)
+
+
+def main():
+    """Convert each BDF file named on the command line"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("fonts", nargs="+", help="BDF files to convert")
+    parser.add_argument("--chars", help="only keep these characters")
+    args = parser.parse_args()
+    wanted = None
+    if args.chars:
+        wanted = set(ord(character) for character in args.chars)
+    for bdf_name in args.fonts:
+        bbf_name = bdf_name[:-4] + ".bbf" if bdf_name.endswith(".bdf") else bdf_name + ".bbf"
+        bounding_box, glyphs = read_bdf(bdf_name, wanted)
+        write_bbf(bbf_name, bounding_box, glyphs)
+        print("%s: %d glyphs -> %s" % (bdf_name, len(glyphs), bbf_name))
+
+
+if __name__ == "__main__":
+    main()
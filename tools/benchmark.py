@@ -0,0 +1,333 @@
+"""
+Time the library code the clock leans on, with the stand-ins in ``tools/host`` in
+place of the PyPortal's hardware, and compare against the saved baselines:
+
+    python3 tools/benchmark.py
+    python3 tools/benchmark.py --update         # save these results as the baselines
+
+For each operation this reports the best time per call, the peak memory a call
+takes on top of what was already in use (as ``tracemalloc`` sees it), and how many
+allocated blocks a call leaves behind. The ``esp32spi`` ones run the real ESP32
+driver against a mock ESP32 on the SPI bus (``tools/host/fake_nina.py``), and also
+count the SPI transactions a call takes, which on the board cost far more than
+the host time suggests. CPython can't count allocations as they
+happen, so the count is the fewest blocks still allocated after a call, with the
+garbage collector held off.
+
+Host timings only say how code compares with itself, not how fast it is on the
+board, so compare against baselines taken on the same computer. Results more than
+``--time-tolerance`` slower, or ``--memory-tolerance`` bigger, than the baselines
+are listed and make the exit status 1.
+
+Licensed under the MIT license.
+"""
+
+import argparse
+import gc
+import glob
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+TOOLS = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(TOOLS)
+HOST = os.path.join(TOOLS, "host")
+BASELINES = os.path.join(TOOLS, "benchmark_baselines.json")
+
+# what code.py loads, and the times its labels show
+GLYPHS = b"0123456789:"
+TIMES = ["%2d:%02d" % (hour, minute) for hour in (1, 9, 10, 12) for minute in range(0, 60, 7)]
+QR_DATA = b"https://io.adafruit.com/api/v2/time/strftime?x-aio-key=0123456789abcdef"
+CAPTION = ("The weather in Chicago is clear sky, 68 degrees, with a light breeze from the "
+           "southwest and nothing but sun until the evening")
+
+
+def font_benchmark(filename):
+    """Load a font and the glyphs code.py uses"""
+    from adafruit_bitmap_font import bitmap_font     # pylint: disable=import-outside-toplevel
+
+    def run():
+        font = bitmap_font.load_font(filename)
+        font.load_glyphs(GLYPHS)
+        font.file.close()
+    return run
+
+
+def label_benchmark():
+    """Show one time after another on a Label in the big clock font"""
+    from adafruit_bitmap_font import bitmap_font     # pylint: disable=import-outside-toplevel
+    from adafruit_display_text.label import Label    # pylint: disable=import-outside-toplevel
+    font = bitmap_font.load_font("/fonts/Anton-Regular-104.bbf")
+    font.load_glyphs(GLYPHS)
+    label = Label(font, max_glyphs=5)
+    times = iter(TIMES * 1000000)
+
+    def run():
+        label.text = next(times)
+    return run
+
+
+def image_benchmark(filename, region=None):
+    """Load a BMP, or the region of it, into a Bitmap and Palette"""
+    # pylint: disable=import-outside-toplevel
+    import adafruit_imageload
+    import displayio
+
+    def run():
+        adafruit_imageload.load(filename, bitmap=displayio.Bitmap, palette=displayio.Palette,
+                                region=region)
+    return run
+
+
+def qr_benchmark():
+    """Make the matrix of a QR code the size of an Adafruit IO URL"""
+    import adafruit_miniqr                          # pylint: disable=import-outside-toplevel
+
+    def run():
+        code = adafruit_miniqr.QRCode()
+        code.add_data(QR_DATA)
+        code.make()
+    return run
+
+
+def wrap_benchmark():
+    """Wrap a caption to 20 characters a line"""
+    from adafruit_pyportal import PyPortal          # pylint: disable=import-outside-toplevel
+
+    def run():
+        PyPortal.wrap_nicely(CAPTION, 20)
+    return run
+
+
+def requests_benchmark():
+    """Get a reply with a screenful of headers, from the fake ESP32 with no latency"""
+    # pylint: disable=import-outside-toplevel
+    import fake_esp
+    from adafruit_esp32spi import adafruit_esp32spi_requests as requests
+    headers = {"Content-Type": "application/json; charset=utf-8",
+               "Cache-Control": "max-age=600, private",
+               "Date": "Mon, 01 Jul 2019 12:00:00 GMT",
+               "Server": "openresty",
+               "Vary": "Accept-Encoding, Origin",
+               "X-Cache-Key": "/data/2.5/weather?q=chicago,us",
+               "Access-Control-Allow-Origin": "*",
+               "Access-Control-Allow-Credentials": "true",
+               "Access-Control-Allow-Methods": "GET, POST",
+               "Strict-Transport-Security": "max-age=31536000; includeSubDomains"}
+    fake_esp.server.add("example.com", "/", lambda request: fake_esp.Reply(
+        200, b"{}", dict(headers)))
+    requests.set_interface(fake_esp.ESP_SPIcontrol(None, None, None, None, latency=0))
+
+    def run():
+        reply = requests.get("http://example.com/headers")
+        if len(reply.headers) < len(headers):
+            raise RuntimeError("headers went missing")
+        reply.close()
+    return run
+
+
+def _nina(reply):
+    """The real ESP32 driver, on a bus with a mock ESP32 answering every request with
+    reply"""
+    # pylint: disable=import-outside-toplevel
+    import fake_nina
+    from adafruit_esp32spi.adafruit_esp32spi import ESP_SPIcontrol
+    spi, pins = fake_nina.bus(reply)
+    return spi, ESP_SPIcontrol(spi, *pins)
+
+
+def socket_benchmark(size):
+    """Read a reply of size bytes off a socket, through the ESP32 driver"""
+    # pylint: disable=import-outside-toplevel
+    from adafruit_esp32spi import adafruit_esp32spi_socket as socket
+    spi, esp = _nina(b"x" * size)
+    socket.set_interface(esp)
+    buffer = bytearray(socket.MAX_PACKET)
+
+    def run():
+        sock = socket.socket()
+        sock.connect(("example.com", 80))
+        sock.write(b"GET / HTTP/1.0\r\n\r\n")
+        left = size
+        while left:
+            left -= sock.readinto(buffer, min(left, len(buffer)))
+        sock.close()
+    run.bus = spi
+    return run
+
+
+def nina_requests_benchmark(size):
+    """Get a reply with a body of size bytes, through the ESP32 driver"""
+    # pylint: disable=import-outside-toplevel
+    from adafruit_esp32spi import adafruit_esp32spi_requests as requests
+    body = b"x" * size
+    spi, esp = _nina(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                     b"Content-Length: %d\r\n\r\n" % size + body)
+    requests.set_interface(esp)
+
+    def run():
+        reply = requests.get("http://example.com/")
+        if reply.content != body:
+            raise RuntimeError("the body came back wrong")
+        reply.close()
+    run.bus = spi
+    return run
+
+
+def benchmarks():
+    """(name, function making the operation to time) for everything to time"""
+    found = []
+    for pattern in ("/fonts/*.bdf", "/fonts/*.bbf"):
+        for filename in sorted(glob.glob(REPO + pattern)):
+            name = filename[len(REPO):]
+            if not os.path.basename(name).startswith("._"):
+                found.append(("load_font " + name, lambda name=name: font_benchmark(name)))
+    found.append(("Label._update_text", label_benchmark))
+    for filename in sorted(glob.glob(REPO + "/icons/*.bmp")):
+        name = filename[len(REPO):]
+        if not os.path.basename(name).startswith("._"):
+            found.append(("imageload " + name, lambda name=name: image_benchmark(name)))
+    found.append(("imageload /icons/pyportal_splash.bmp region",
+                  lambda: image_benchmark("/icons/pyportal_splash.bmp", (135, 95, 50, 50))))
+    found.append(("QRCode.make", qr_benchmark))
+    found.append(("PyPortal.wrap_nicely", wrap_benchmark))
+    found.append(("requests.get headers", requests_benchmark))
+    found.append(("esp32spi socket.readinto 64 kB", lambda: socket_benchmark(65536)))
+    found.append(("esp32spi requests.get 2 kB", lambda: nina_requests_benchmark(2048)))
+    return found
+
+
+def measure(run, repeat):
+    """The best seconds per call, peak bytes and blocks left behind per call of run"""
+    run()       # once to warm caches up, and to fail early
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    seconds = min(timer.repeat(repeat, number)) / number
+
+    gc.collect()
+    gc.disable()
+    try:
+        blocks = []
+        for _ in range(repeat):
+            before = sys.getallocatedblocks()
+            run()
+            blocks.append(sys.getallocatedblocks() - before)
+        bus = getattr(run, "bus", None)
+        sent = bus and bus.transactions
+        tracemalloc.start()
+        start = tracemalloc.get_traced_memory()[0]
+        run()
+        peak = tracemalloc.get_traced_memory()[1] - start
+        tracemalloc.stop()
+    finally:
+        gc.enable()
+    result = {"seconds": seconds, "peak": peak, "blocks": min(blocks)}
+    if bus:
+        result["transactions"] = bus.transactions - sent
+    return result
+
+
+def regressions(name, result, baseline, time_tolerance, memory_tolerance):
+    """What's got worse in result compared with baseline, as strings"""
+    worse = []
+    if "error" in result:
+        if result["error"] != baseline.get("error"):
+            worse.append("%s: %s, was %s" % (name, result["error"],
+                                             baseline.get("error", "working")))
+        return worse
+    if "error" in baseline:
+        return worse        # works now, which is only better
+    if result["seconds"] > baseline["seconds"] * (1 + time_tolerance):
+        worse.append("%s: %s a call, was %s" % (name, _seconds(result["seconds"]),
+                                                _seconds(baseline["seconds"])))
+    # a little slack so tiny numbers don't trip over the odd stray allocation
+    if result["peak"] > baseline["peak"] * (1 + memory_tolerance) + 256:
+        worse.append("%s: peak %d bytes, was %d" % (name, result["peak"], baseline["peak"]))
+    if result["blocks"] > baseline["blocks"] * (1 + memory_tolerance) + 4:
+        worse.append("%s: %d blocks kept, was %d" % (name, result["blocks"],
+                                                     baseline["blocks"]))
+    # these are counted, not measured, so any more is worse
+    if result.get("transactions", 0) > baseline.get("transactions", result.get("transactions", 0)):
+        worse.append("%s: %d SPI transactions, was %d" % (name, result["transactions"],
+                                                          baseline["transactions"]))
+    return worse
+
+
+def _seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e3), ("us", 1e6)):
+        if seconds * scale >= 1:
+            return "%0.3g %s" % (seconds * scale, unit)
+    return "%0.3g ns" % (seconds * 1e9)
+
+
+def main():
+    """Run the benchmarks, and compare them with or save them as the baselines"""
+    # pylint: disable=too-many-locals
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--update", action="store_true",
+                        help="save the results as the baselines")
+    parser.add_argument("--baselines", default=BASELINES, help="the baselines file")
+    parser.add_argument("--only", default="",
+                        help="only run benchmarks with this in their names")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="how many rounds of timing to take the best of")
+    parser.add_argument("--time-tolerance", type=float, default=0.25,
+                        help="how much slower than the baseline counts as slower, "
+                             "e.g. 0.25 for 25%%")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10,
+                        help="how much bigger than the baseline counts as bigger")
+    args = parser.parse_args()
+    baselines_file = os.path.abspath(args.baselines)
+
+    sys.path[:0] = [HOST, os.path.join(REPO, "lib")]
+    import emulator                 # pylint: disable=import-outside-toplevel
+    import run_on_host              # pylint: disable=import-outside-toplevel
+    run_on_host.load_secrets(REPO)
+    emulator.Drive(REPO, host_paths=(os.path.dirname(baselines_file),)).install()
+
+    try:
+        with open(baselines_file) as file:
+            baselines = json.load(file)
+    except FileNotFoundError:
+        baselines = {}
+
+    results = {}
+    worse = []
+    print("%-46s %10s %10s %7s %7s" % ("", "per call", "peak", "blocks", "SPI"))
+    for name, make in benchmarks():
+        if args.only not in name:
+            continue
+        try:
+            result = measure(make(), args.repeat)
+        except (NotImplementedError, RuntimeError, ValueError, OSError) as error:
+            result = {"error": "%s: %s" % (type(error).__name__, error)}
+        results[name] = result
+        if "error" in result:
+            print("%-46s %s" % (name, result["error"]))
+        else:
+            print("%-46s %10s %10d %7d %7s" % (name, _seconds(result["seconds"]), result["peak"],
+                                               result["blocks"],
+                                               result.get("transactions", "")))
+        if name in baselines:
+            worse += regressions(name, result, baselines[name], args.time_tolerance,
+                                 args.memory_tolerance)
+
+    if args.update:
+        baselines.update(results)
+        with open(baselines_file, "w") as file:
+            json.dump(baselines, file, indent=2, sort_keys=True)
+            file.write("\n")
+        print("\nSaved %d results to %s" % (len(results), baselines_file))
+        return 0
+    if worse:
+        print("\nWorse than the baselines:")
+        for line in worse:
+            print("  " + line)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+Host stand-in for ``analogio``. The light sensor reads ``emulator.light`` and the
+touchscreen pins read whatever ``emulator.touch`` makes of the pins being driven.
+
+Licensed under the MIT license.
+"""
+
+import emulator
+
+
+class AnalogIn:
+    """An analog input"""
+
+    def __init__(self, pin):
+        self._name = pin.name
+        self.reference_voltage = 3.3
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.deinit()
+
+    def deinit(self):
+        """Let go of the pin"""
+
+    @property
+    def value(self):
+        """The reading, from 0 to 65535"""
+        if self._name.startswith("TOUCH_"):
+            emulator.touch.update(emulator.clock.now)
+            return emulator.touch.reading(self._name, emulator.driven)
+        if self._name == "LIGHT":
+            return emulator.light
+        return 0
+
+
+class AnalogOut:
+    """An analog output"""
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, pin):
+        self._name = pin.name
+        self.value = 0
+
+    def deinit(self):
+        """Let go of the pin"""
@@ -0,0 +1,53 @@
+"""
+Host stand-in for ``audioio``. Nothing is heard: playing a file takes as long as
+the file lasts on the virtual clock, and is logged in ``played``.
+
+Licensed under the MIT license.
+"""
+
+import emulator
+
+# (monotonic time, file name) of everything played
+played = []
+
+
+class WaveFile:
+    """A WAV file to play"""
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, file):
+        self.file = file
+        file.seek(0)
+        header = file.read(44)
+        if header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            raise ValueError("Invalid WAVE")
+        self.sample_rate = int.from_bytes(header[24:28], "little")
+        byte_rate = int.from_bytes(header[28:32], "little")
+        file.seek(0, 2)
+        self.duration = (file.tell() - 44) / byte_rate if byte_rate else 0
+
+
+class AudioOut:
+    """Plays samples out of the speaker pin"""
+
+    def __init__(self, pin):
+        self._pin = pin
+        self._until = 0
+
+    def play(self, sample, *, loop=False):
+        """Start playing sample"""
+        # pylint: disable=unused-argument
+        played.append((emulator.clock.now, getattr(sample.file, "name", None)))
+        self._until = emulator.clock.now + getattr(sample, "duration", 0)
+
+    def stop(self):
+        """Stop playing"""
+        self._until = 0
+
+    @property
+    def playing(self):
+        """Whether something is still playing"""
+        return emulator.clock.now < self._until
+
+    def deinit(self):
+        """Let go of the pin"""
@@ -0,0 +1,32 @@
+"""
+Host stand-in for the PyPortal's ``board`` module: its pins, and ``DISPLAY``.
+
+Licensed under the MIT license.
+"""
+
+import displayio
+
+
+class Pin:
+    """A pin, known by its name on the board"""
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return "board.%s" % self.name
+
+
+_PINS = ("A0", "A1", "A2", "A3", "A4", "D0", "D1", "D2", "D3", "D4", "D13",
+         "SCK", "MOSI", "MISO", "SCL", "SDA", "TX", "RX", "NEOPIXEL", "LIGHT",
+         "SPEAKER", "SPEAKER_ENABLE", "AUDIO_OUT", "SD_CS", "SD_CARD_DETECT",
+         "ESP_CS", "ESP_BUSY", "ESP_GPIO0", "ESP_RESET", "ESP_RTS", "ESP_TX", "ESP_RX",
+         "TFT_BACKLIGHT", "TFT_CS", "TFT_DC", "TFT_RESET", "TFT_RD", "TFT_WR", "TFT_TE",
+         "TFT_DATA0", "TOUCH_XL", "TOUCH_XR", "TOUCH_YD", "TOUCH_YU", "L3V3")
+
+for _name in _PINS:
+    globals()[_name] = Pin(_name)
+del _name
+
+DISPLAY = displayio.Display(320, 240)
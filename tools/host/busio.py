@@ -0,0 +1,66 @@
+"""
+Host stand-in for ``busio``. Nothing answers on these buses, so an SD card, say,
+comes out as missing.
+
+Licensed under the MIT license.
+"""
+
+
+class SPI:
+    """An SPI bus with nothing on it"""
+
+    def __init__(self, clock, MOSI=None, MISO=None):  # pylint: disable=invalid-name
+        self.frequency = 0
+
+    def try_lock(self):     # pylint: disable=no-self-use
+        """Take the bus"""
+        return True
+
+    def unlock(self):
+        """Give the bus back"""
+
+    def configure(self, *, baudrate=100000, polarity=0, phase=0, bits=8):
+        """Set the bus speed and mode"""
+        # pylint: disable=unused-argument
+        self.frequency = baudrate
+
+    def write(self, buffer, *, start=0, end=None):
+        """Send bytes to no one"""
+
+    def readinto(self, buffer, *, start=0, end=None, write_value=0):
+        """Read back the idle level of the bus"""
+        # pylint: disable=unused-argument
+        if end is None:
+            end = len(buffer)
+        for i in range(start, end):
+            buffer[i] = 0xFF
+
+    def write_readinto(self, buffer_out, buffer_in, *, out_start=0, out_end=None,
+                       in_start=0, in_end=None):
+        """Send bytes to no one and read the idle level of the bus back"""
+        # pylint: disable=unused-argument,too-many-arguments
+        self.readinto(buffer_in, start=in_start, end=in_end)
+
+    def deinit(self):
+        """Let go of the pins"""
+
+
+class I2C:
+    """An I2C bus with nothing on it"""
+
+    def __init__(self, scl, sda, *, frequency=400000):
+        self.frequency = frequency
+
+    def try_lock(self):     # pylint: disable=no-self-use
+        """Take the bus"""
+        return True
+
+    def unlock(self):
+        """Give the bus back"""
+
+    def scan(self):         # pylint: disable=no-self-use
+        """The addresses that answer, which is none"""
+        return []
+
+    def deinit(self):
+        """Let go of the pins"""
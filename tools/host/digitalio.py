@@ -0,0 +1,86 @@
+"""
+Host stand-in for ``digitalio``. Outputs are recorded in ``emulator.driven`` by pin
+name, and inputs read ``emulator.inputs``.
+
+Licensed under the MIT license.
+"""
+
+import emulator
+
+
+class Direction:
+    """Which way a pin goes"""
+    # pylint: disable=too-few-public-methods
+    INPUT = "INPUT"
+    OUTPUT = "OUTPUT"
+
+
+class Pull:
+    """Which way an input is pulled"""
+    # pylint: disable=too-few-public-methods
+    UP = "UP"
+    DOWN = "DOWN"
+
+
+class DriveMode:
+    """How an output is driven"""
+    # pylint: disable=too-few-public-methods
+    PUSH_PULL = "PUSH_PULL"
+    OPEN_DRAIN = "OPEN_DRAIN"
+
+
+class DigitalInOut:
+    """A digital pin"""
+
+    def __init__(self, pin):
+        self._name = pin.name
+        self._direction = Direction.INPUT
+        self.pull = None
+        self.drive_mode = DriveMode.PUSH_PULL
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.deinit()
+
+    def deinit(self):
+        """Let go of the pin"""
+        emulator.driven.pop(self._name, None)
+
+    def switch_to_output(self, value=False, drive_mode=DriveMode.PUSH_PULL):
+        """Drive the pin"""
+        self._direction = Direction.OUTPUT
+        self.drive_mode = drive_mode
+        emulator.driven[self._name] = bool(value)
+
+    def switch_to_input(self, pull=None):
+        """Read the pin"""
+        self._direction = Direction.INPUT
+        self.pull = pull
+        emulator.driven.pop(self._name, None)
+
+    @property
+    def direction(self):
+        """`Direction.INPUT` or `Direction.OUTPUT`"""
+        return self._direction
+
+    @direction.setter
+    def direction(self, direction):
+        if direction == Direction.OUTPUT:
+            self.switch_to_output()
+        else:
+            self.switch_to_input()
+
+    @property
+    def value(self):
+        """The level on the pin"""
+        if self._direction == Direction.OUTPUT:
+            return emulator.driven[self._name]
+        return emulator.inputs.get(self._name, self.pull == Pull.UP)
+
+    @value.setter
+    def value(self, value):
+        if self._direction != Direction.OUTPUT:
+            raise AttributeError("Cannot set value when direction is input.")
+        emulator.driven[self._name] = bool(value)
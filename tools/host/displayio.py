@@ -0,0 +1,376 @@
+"""
+Host stand-in for ``displayio``.
+
+Groups, TileGrids, Bitmaps and Palettes keep the rules the firmware does (a full
+Group raises, a layer can only be in one Group, a Bitmap value has to fit its
+value count), and the `Display` draws the shown Group into an RGB565 framebuffer
+pixel for pixel, which can be saved as a PPM image.
+
+Licensed under the MIT license.
+"""
+
+from array import array
+
+import emulator
+
+
+def _rgb(color):
+    """A color given as an int, or a sequence of r, g, b, as an 0xRRGGBB int"""
+    if isinstance(color, int):
+        return color & 0xFFFFFF
+    return (color[0] << 16) | (color[1] << 8) | color[2]
+
+
+def _rgb565(color):
+    return ((color >> 8) & 0xF800) | ((color >> 5) & 0x07E0) | ((color >> 3) & 0x001F)
+
+
+class Bitmap:
+    """Stores values of a certain size in a 2D array"""
+
+    def __init__(self, width, height, value_count):
+        if not 1 <= value_count <= 65536:
+            raise ValueError("value_count must be > 0 and <= 65536")
+        self.width = width
+        self.height = height
+        self.value_count = value_count
+        self._data = array("H", bytes(2 * width * height))
+
+    def _index(self, index):
+        if isinstance(index, tuple):
+            x, y = index
+            if not (0 <= x < self.width and 0 <= y < self.height):
+                raise IndexError("pixel coordinates out of bounds")
+            return y * self.width + x
+        return index
+
+    def __getitem__(self, index):
+        return self._data[self._index(index)]
+
+    def __setitem__(self, index, value):
+        if value >= self.value_count:
+            raise ValueError("pixel value requires too many bits")
+        self._data[self._index(index)] = value
+
+    def _pixel(self, x, y):
+        return self._data[y * self.width + x]
+
+
+class Palette:
+    """Maps Bitmap values to colors"""
+
+    def __init__(self, color_count):
+        self._colors = [0] * color_count
+        self._transparent = [False] * color_count
+
+    def __len__(self):
+        return len(self._colors)
+
+    def __setitem__(self, index, color):
+        self._colors[index] = _rgb(color)
+
+    def __getitem__(self, index):
+        return self._colors[index]
+
+    def make_transparent(self, index):
+        """Leave pixels with this value undrawn"""
+        self._transparent[index] = True
+
+    def make_opaque(self, index):
+        """Draw pixels with this value again"""
+        self._transparent[index] = False
+
+    def _color(self, value):
+        if value >= len(self._colors) or self._transparent[value]:
+            return None
+        return _rgb565(self._colors[value])
+
+
+class ColorConverter:
+    """Converts 0xRRGGBB colors to the display's RGB565"""
+
+    def convert(self, color):    # pylint: disable=no-self-use
+        """The RGB565 value color ends up as"""
+        return _rgb565(_rgb(color))
+
+    _color = convert
+
+
+class OnDiskBitmap:
+    """A BMP file, decoded when it's opened. Pixel values come out as 0xRRGGBB, for a
+    `ColorConverter` to show."""
+
+    def __init__(self, file):
+        self._file = file
+        file.seek(0)
+        data = file.read()
+        if data[:2] != b"BM":
+            raise ValueError("Invalid BMP file")
+        word = lambda at, size: int.from_bytes(data[at:at + size], "little")
+        start = word(0x0A, 4)
+        header_size = word(0x0E, 4)
+        self.width = word(0x12, 4)
+        height = int.from_bytes(data[0x16:0x1A], "little", signed=True)
+        self.height = abs(height)
+        depth = word(0x1C, 2)
+        compression = word(0x1E, 4)
+        colors = word(0x2E, 4) or (1 << depth if depth <= 8 else 0)
+        if compression not in (0, 3):
+            raise ValueError("Unsupported BMP compression %d" % compression)
+        masks = (0x7C00, 0x03E0, 0x001F)
+        if compression == 3:
+            masks = (word(0x36, 4), word(0x3A, 4), word(0x3E, 4))
+        palette = [word(0x0E + header_size + 4 * i, 4) & 0xFFFFFF for i in range(colors)]
+        stride = (self.width * depth + 31) // 32 * 4
+        self._pixels = pixels = array("I", [0]) * (self.width * self.height)
+        for row in range(self.height):
+            y = row if height < 0 else self.height - 1 - row
+            at = start + row * stride
+            for x in range(self.width):
+                if depth <= 8:
+                    bit = x * depth
+                    value = (data[at + bit // 8] >> (8 - depth - bit % 8)) & ((1 << depth) - 1)
+                    color = palette[value]
+                elif depth == 16:
+                    color = _from_masks(word(at + 2 * x, 2), masks)
+                elif depth == 24:
+                    color = word(at + 3 * x, 3)
+                else:
+                    color = word(at + 4 * x, 4) & 0xFFFFFF
+                pixels[y * self.width + x] = color
+
+    def _pixel(self, x, y):
+        return self._pixels[y * self.width + x]
+
+
+def _from_masks(value, masks):
+    """Spread a pixel packed with the given r, g, b bit masks out to 0xRRGGBB"""
+    color = 0
+    for mask in masks:
+        shift = (mask & -mask).bit_length() - 1
+        bits = mask.bit_length() - shift
+        color = (color << 8) | ((value & mask) >> shift) * 255 // ((1 << bits) - 1)
+    return color
+
+
+class Glyph:
+    """A glyph of a font: where it is in its bitmap and how it sits on the line"""
+    # pylint: disable=too-few-public-methods,too-many-arguments
+
+    def __init__(self, bitmap, tile_index, width, height, dx, dy, shift_x, shift_y):
+        self.bitmap = bitmap
+        self.tile_index = tile_index
+        self.width = width
+        self.height = height
+        self.dx = dx
+        self.dy = dy
+        self.shift_x = shift_x
+        self.shift_y = shift_y
+
+
+class _Layer:
+    """What TileGrid and Group share: a position, and a parent"""
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.hidden = False
+        self._parent = None
+
+    @property
+    def position(self):
+        """The (x, y) of this layer within its Group"""
+        return (self.x, self.y)
+
+    @position.setter
+    def position(self, position):
+        self.x, self.y = position
+
+
+class TileGrid(_Layer):
+    """A grid of tiles cut from a bitmap"""
+
+    def __init__(self, bitmap, *, pixel_shader, default_tile=0, tile_width=None,
+                 tile_height=None, width=1, height=1, x=0, y=0, position=None):
+        # pylint: disable=too-many-arguments
+        if position is not None:
+            x, y = position
+        super().__init__(x, y)
+        self.bitmap = bitmap
+        self.pixel_shader = pixel_shader
+        self.tile_width = tile_width or bitmap.width
+        self.tile_height = tile_height or bitmap.height
+        self.width = width
+        self.height = height
+        self._tiles = [default_tile] * (width * height)
+
+    def _index(self, index):
+        if isinstance(index, tuple):
+            return index[1] * self.width + index[0]
+        return index
+
+    def __getitem__(self, index):
+        return self._tiles[self._index(index)]
+
+    def __setitem__(self, index, tile):
+        self._tiles[self._index(index)] = tile
+
+
+class Group(_Layer):
+    """Layers drawn in order, offset by the Group's position and scaled by its scale"""
+
+    def __init__(self, *, max_size=4, scale=1, x=0, y=0):
+        super().__init__(x, y)
+        self.max_size = max_size
+        self.scale = scale
+        self._layers = []
+
+    def _adopt(self, layer):
+        if not isinstance(layer, _Layer):
+            raise ValueError("Layer must be a Group or TileGrid subclass.")
+        if layer._parent is not None:   # pylint: disable=protected-access
+            raise ValueError("Layer already in a group.")
+        layer._parent = self            # pylint: disable=protected-access
+
+    def append(self, layer):
+        """Add layer on top of the others"""
+        self.insert(len(self._layers), layer)
+
+    def insert(self, index, layer):
+        """Add layer at index"""
+        if len(self._layers) >= self.max_size:
+            raise RuntimeError("Group full")
+        self._adopt(layer)
+        self._layers.insert(index, layer)
+
+    def pop(self, index=-1):
+        """Remove and return the layer at index"""
+        layer = self._layers.pop(index)
+        layer._parent = None            # pylint: disable=protected-access
+        return layer
+
+    def remove(self, layer):
+        """Remove layer"""
+        self.pop(self.index(layer))
+
+    def index(self, layer):
+        """Where layer is in this Group"""
+        for i, other in enumerate(self._layers):
+            if other is layer:
+                return i
+        raise ValueError("object not in sequence")
+
+    def __len__(self):
+        return len(self._layers)
+
+    def __getitem__(self, index):
+        return self._layers[index]
+
+    def __setitem__(self, index, layer):
+        if layer is self._layers[index]:
+            return
+        self._adopt(layer)
+        self._layers[index]._parent = None  # pylint: disable=protected-access
+        self._layers[index] = layer
+
+    def __delitem__(self, index):
+        self.pop(index)
+
+
+class Display:
+    """A display, as ``board.DISPLAY``. On top of the firmware's API it counts refreshes,
+    can hand each one to `on_refresh`, and renders what's shown into `framebuffer`.
+
+    :param float frame_time: How long a refresh keeps the board busy, which is added
+                             to the virtual clock.
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, width, height, *, frame_time=1 / 60):
+        self.width = width
+        self.height = height
+        self.frame_time = frame_time
+        self.rotation = 0
+        self.brightness = 1.0
+        self.auto_brightness = False
+        self.auto_refresh = True
+        self.refreshes = 0
+        self.on_refresh = None
+        self._group = None
+
+    def show(self, group):
+        """Show group, or nothing if it's None"""
+        self._group = group
+
+    def refresh(self, *, target_frames_per_second=60, minimum_frames_per_second=1):
+        """Draw the display now"""
+        # pylint: disable=unused-argument
+        self.refreshes += 1
+        emulator.clock.advance(self.frame_time)
+        if self.on_refresh:
+            self.on_refresh(self)
+
+    def refresh_soon(self):
+        """Draw the display on the next frame"""
+        self.refresh()
+
+    def wait_for_frame(self):
+        """Wait until the next frame"""
+        emulator.clock.advance(self.frame_time)
+
+    @property
+    def framebuffer(self):
+        """What's on the screen, as an array of RGB565 pixels, row by row"""
+        pixels = array("H", bytes(2 * self.width * self.height))
+        if self._group is not None and not self._group.hidden:
+            self._draw(pixels, self._group, 0, 0, 1)
+        return pixels
+
+    def save(self, filename):
+        """Write what's on the screen to filename as a PPM image"""
+        data = bytearray()
+        for pixel in self.framebuffer:
+            red, green, blue = pixel >> 11, (pixel >> 5) & 0x3F, pixel & 0x1F
+            data += bytes(((red << 3) | (red >> 2), (green << 2) | (green >> 4),
+                           (blue << 3) | (blue >> 2)))
+        with open(filename, "wb") as file:
+            file.write(b"P6\n%d %d\n255\n" % (self.width, self.height))
+            file.write(data)
+
+    def _draw(self, pixels, layer, left, top, scale):
+        # pylint: disable=too-many-arguments
+        left += layer.x * scale
+        top += layer.y * scale
+        if isinstance(layer, Group):
+            for child in layer:
+                if not child.hidden:
+                    self._draw(pixels, child, left, top, scale * layer.scale)
+            return
+        bitmap = layer.bitmap
+        if not layer.tile_width or not layer.tile_height:
+            return      # e.g. a space in a Label
+        shader = layer.pixel_shader._color      # pylint: disable=protected-access
+        columns = bitmap.width // layer.tile_width
+        for tile_y in range(layer.height):
+            for tile_x in range(layer.width):
+                tile = layer[tile_x, tile_y]
+                source_x = (tile % columns) * layer.tile_width
+                source_y = (tile // columns) * layer.tile_height
+                for y in range(layer.tile_height):
+                    for x in range(layer.tile_width):
+                        color = shader(bitmap._pixel(source_x + x,  # pylint: disable=protected-access
+                                                     source_y + y))
+                        if color is None:
+                            continue
+                        screen_x = left + (tile_x * layer.tile_width + x) * scale
+                        screen_y = top + (tile_y * layer.tile_height + y) * scale
+                        for y_2 in range(screen_y, screen_y + scale):
+                            if 0 <= y_2 < self.height:
+                                row = y_2 * self.width
+                                for x_2 in range(screen_x, screen_x + scale):
+                                    if 0 <= x_2 < self.width:
+                                        pixels[row + x_2] = color
+
+
+def release_displays():
+    """Nothing to release on the host"""
@@ -0,0 +1,222 @@
+"""
+Shared state for the host stand-ins: a virtual clock, the CIRCUITPY drive and the
+inputs the board can read.
+
+The stand-in modules in this directory (``board``, ``displayio``, ``digitalio``,
+...) all look here, so a test or the ``run_on_host.py`` runner can set the light
+level, press the snooze button or touch the screen, and move time along, in one
+place. Nothing here is needed on the PyPortal.
+
+Licensed under the MIT license.
+"""
+
+import builtins
+import importlib.abc
+import importlib.util
+import os
+import sys
+import time
+
+# the real functions, before Clock.install() and Drive.install() swap them out
+_monotonic = time.monotonic
+_sleep = time.sleep
+_localtime = time.localtime
+_open = builtins.open
+
+
+class EmulationOver(Exception):
+    """Raised from inside the emulated program once the clock reaches its end time"""
+
+
+class Clock:
+    """Virtual time: ``time.monotonic()`` only moves when something sleeps (plus a
+    tiny step per call, so busy-wait loops still get somewhere), and the wall clock
+    starts wherever you say. Runs are the same every time however fast the host is.
+
+    :param float wall: The wall clock time at the start, in seconds since the epoch.
+    :param float end: Raise `EmulationOver` once monotonic time passes this.
+    :param float step: How far each call to ``time.monotonic()`` moves the clock.
+    :param float drift: How much faster the board's clock runs than the wall clock,
+                        as a fraction, e.g. 50e-6 for 50 ppm fast.
+    """
+
+    def __init__(self, wall=1561982400.0, end=None, step=10e-6, drift=0.0):
+        self.now = 10.0     # boards have been up a moment by the time code.py runs
+        self.end = end
+        self.step = step
+        self.drift = drift
+        self._wall_start = wall
+        self._rtc_offset = 0.0
+        self.slept = 0.0
+
+    def monotonic(self):
+        """Stands in for ``time.monotonic``"""
+        self.now += self.step
+        self._check_end()
+        return self.now
+
+    def monotonic_ns(self):
+        """Stands in for ``time.monotonic_ns``"""
+        return int(self.monotonic() * 1000000000)
+
+    def sleep(self, seconds):
+        """Stands in for ``time.sleep``: moves the clock instead of waiting"""
+        if seconds > 0:
+            self.now += seconds
+            self.slept += seconds
+        self._check_end()
+
+    def advance(self, seconds):
+        """Move the clock along without anyone sleeping, e.g. to account for work
+        something would take on the board"""
+        self.now += seconds
+
+    def wall_time(self):
+        """The true time, in seconds since the epoch, that servers will report"""
+        return self._wall_start + self.now
+
+    def time(self):
+        """Stands in for ``time.time``: the board's idea of the time, which runs at its
+        own rate and can be set through ``rtc.RTC().datetime``"""
+        return self._wall_start + self.now * (1 + self.drift) + self._rtc_offset
+
+    def set_time(self, seconds):
+        """Set the board's clock, as ``rtc.RTC().datetime = ...`` does"""
+        self._rtc_offset += seconds - self.time()
+
+    def localtime(self, secs=None):
+        """Stands in for ``time.localtime``"""
+        if secs is None:
+            secs = self.time()
+        return _localtime(int(secs))
+
+    def _check_end(self):
+        if self.end is not None and self.now >= self.end:
+            raise EmulationOver("%0.1f seconds emulated" % self.now)
+
+    def install(self):
+        """Swap this clock in for the ``time`` module's. The board has no time zones,
+        so everything runs in UTC."""
+        os.environ["TZ"] = "UTC"
+        time.tzset()
+        time.monotonic = self.monotonic
+        time.monotonic_ns = self.monotonic_ns
+        time.sleep = self.sleep
+        time.time = self.time
+        time.localtime = self.localtime
+
+
+class Drive:
+    """Makes absolute paths like ``/icons/01d.bmp`` refer to a directory on the host,
+    the way they refer to the CIRCUITPY drive on the board.
+
+    :param str root: The directory standing in for the drive.
+    :param host_paths: Absolute paths that are left alone because they're on the host,
+                       like where Python and the libraries are.
+    """
+
+    def __init__(self, root, host_paths=()):
+        self.root = os.path.abspath(root)
+        self._host_paths = tuple(os.path.abspath(path) for path in host_paths) + (
+            self.root, sys.prefix, sys.base_prefix)
+
+    def path(self, path):
+        """Where path on the board is on the host"""
+        if isinstance(path, str) and path.startswith("/") and \
+           not path.startswith(self._host_paths):
+            return os.path.join(self.root, path.lstrip("/"))
+        return path
+
+    def install(self):
+        """Route ``open`` and the ``os`` file functions through this drive, and make it
+        the current directory, as ``/`` is on the board"""
+        def wrap(function):
+            def wrapped(path, *args, **kwargs):
+                return function(self.path(path), *args, **kwargs)
+            return wrapped
+        builtins.open = wrap(_open)
+        for name in ("stat", "listdir", "mkdir", "rmdir", "remove", "unlink", "statvfs"):
+            setattr(os, name, wrap(getattr(os, name)))
+        rename = os.rename
+        os.rename = lambda old, new: rename(self.path(old), self.path(new))
+        os.chdir(self.root)
+        sys.meta_path.append(_AnyCaseFinder())
+
+
+class _AnyCaseFinder(importlib.abc.MetaPathFinder):
+    """Finds modules whatever the case of their names, as imports do from the board's
+    FAT filesystem. Only asked once the usual finders have given up."""
+
+    def find_spec(self, fullname, path, target=None):    # pylint: disable=no-self-use
+        """The spec of a module whose file name matches fullname, ignoring case"""
+        # pylint: disable=unused-argument
+        wanted = fullname.rpartition(".")[2].lower()
+        for directory in path or sys.path:
+            try:
+                entries = os.listdir(directory)
+            except (OSError, TypeError):
+                continue
+            for entry in entries:
+                base, extension = os.path.splitext(entry)
+                if base.lower() != wanted:
+                    continue
+                location = os.path.join(directory, entry)
+                if extension == ".py":
+                    return importlib.util.spec_from_file_location(fullname, location)
+                package = os.path.join(location, "__init__.py")
+                if not extension and os.path.exists(package):
+                    return importlib.util.spec_from_file_location(
+                        fullname, package, submodule_search_locations=[location])
+        return None
+
+
+class TouchPanel:
+    """A finger on the resistive touchscreen, as the analog readings the touchscreen
+    driver will get. Set `point` to an (x, y) in screen pixels, or None to let go.
+
+    The raw readings are spread over the calibration PyPortal gives the driver, so
+    touches come out where they were put."""
+
+    def __init__(self, size=(320, 240), calibration=((5200, 59000), (5800, 57000))):
+        self.size = size
+        self.calibration = calibration
+        self.point = None
+        self._script = []
+
+    def script(self, touches):
+        """Touch the screen on a timetable: touches is a list of (start, end, x, y, x2,
+        y2) in monotonic seconds, the finger sliding from (x, y) to (x2, y2)"""
+        self._script = sorted(touches)
+
+    def update(self, now):
+        """Put the finger wherever the script says it is at now"""
+        self.point = None
+        for start, end, x_1, y_1, x_2, y_2 in self._script:
+            if start <= now <= end:
+                part = (now - start) / (end - start) if end > start else 0
+                self.point = (int(x_1 + (x_2 - x_1) * part), int(y_1 + (y_2 - y_1) * part))
+
+    def reading(self, read_pin, driven):
+        """What the analog pin read_pin would read, given the {pin name: level} of the
+        pins being driven"""
+        if self.point is None:
+            # no contact between the plates, so the pressure reading comes out at 0
+            return 0 if read_pin == "TOUCH_XL" else 65535
+        x, y = self.point
+        if driven.get("TOUCH_YU") is True and driven.get("TOUCH_YD") is False:
+            low, high = self.calibration[0]
+            return int(low + (high - low) * x / self.size[0])
+        if driven.get("TOUCH_XR") is True and driven.get("TOUCH_XL") is False:
+            low, high = self.calibration[1]
+            return int(low + (high - low) * y / self.size[1])
+        # a firm press, measured across the plates
+        return 20000 if read_pin == "TOUCH_XL" else 30000
+
+
+# The one of each that the stand-ins share
+clock = Clock()
+touch = TouchPanel()
+# pins driven as outputs, by board pin name, and the levels inputs read
+driven = {}
+inputs = {"D3": True}           # the snooze button, pulled up
+light = 1500                    # the light sensor reading
@@ -0,0 +1,405 @@
+"""
+A stand-in for ``adafruit_esp32spi.ESP_SPIcontrol`` that answers HTTP requests
+from canned replies instead of the network.
+
+Replies come from the `Server` in ``server``: add routes to it, each a host, a
+path prefix and a function taking the `Request` and returning a `Reply`. Replies
+arrive ``latency`` seconds of virtual time after the request has been sent, so
+code that polls for them gets to see them coming in.
+
+Licensed under the MIT license.
+"""
+
+import json
+import time
+import zlib
+
+import emulator
+
+# pylint: disable=invalid-name
+WL_IDLE_STATUS = 0
+WL_CONNECTED = 3
+SOCKET_CLOSED = 0
+SOCKET_ESTABLISHED = 4
+SOCKET_CLOSE_WAIT = 7
+
+
+class Request:
+    """An HTTP request as it was sent"""
+    # pylint: disable=too-few-public-methods,too-many-arguments
+
+    def __init__(self, method, path, version, headers, body, host, port):
+        self.method = method
+        self.path = path
+        self.version = version
+        self.headers = headers      # with lowercase names
+        self.body = body
+        self.host = host
+        self.port = port
+
+
+class Reply:
+    """An HTTP reply to send back.
+
+    :param int status: The status code.
+    :param body: The body, as bytes or str.
+    :param dict headers: Headers to send, other than Content-Length or
+                         Transfer-Encoding which are added to suit.
+    :param int chunked: Send the body with chunked transfer encoding, in pieces of
+                        this size, instead of with a Content-Length.
+    """
+    # pylint: disable=too-few-public-methods
+
+    REASONS = {200: "OK", 204: "No Content", 304: "Not Modified", 404: "Not Found",
+               500: "Internal Server Error"}
+
+    def __init__(self, status=200, body=b"", headers=None, *, chunked=0):
+        self.status = status
+        self.body = body.encode("utf-8") if isinstance(body, str) else body
+        self.headers = headers or {}
+        self.chunked = chunked
+
+    def encode(self, request):
+        """The reply as it goes over the wire, in answer to request"""
+        no_body = request.method == "HEAD" or self.status in (204, 304)
+        lines = ["HTTP/1.1 %d %s" % (self.status, self.REASONS.get(self.status, "Unknown"))]
+        for name, value in self.headers.items():
+            lines.append("%s: %s" % (name, value))
+        body = b""
+        if not no_body:
+            if self.chunked:
+                lines.append("Transfer-Encoding: chunked")
+                for start in range(0, len(self.body), self.chunked):
+                    piece = self.body[start:start + self.chunked]
+                    body += b"%x\r\n%s\r\n" % (len(piece), piece)
+                body += b"0\r\n\r\n"
+            else:
+                lines.append("Content-Length: %d" % len(self.body))
+                body = self.body
+        if not _keep_alive(request):
+            lines.append("Connection: close")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8") + body
+
+
+def _keep_alive(request):
+    connection = request.headers.get("connection", "").lower()
+    if request.version == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+
+def etagged(reply_function):
+    """Wrap a route so its replies carry an ETag, and a request that already has the
+    same reply gets a 304 instead"""
+    def route(request):
+        reply = reply_function(request)
+        if reply.status != 200:
+            return reply
+        tag = '"%08x"' % zlib.crc32(reply.body)
+        if request.headers.get("if-none-match") == tag:
+            return Reply(304, headers={"ETag": tag})
+        reply.headers["ETag"] = tag
+        return reply
+    return route
+
+
+def openweathermap(icon="01d", kelvin=293.15):
+    """A route answering like openweathermap.org's current weather API"""
+    def route(request):
+        # pylint: disable=unused-argument
+        weather = {"coord": {"lon": -87.65, "lat": 41.85},
+                   "weather": [{"id": 800, "main": "Clear", "description": "clear sky",
+                                "icon": icon}],
+                   "base": "stations",
+                   "main": {"temp": kelvin, "pressure": 1016, "humidity": 40,
+                            "temp_min": kelvin - 2, "temp_max": kelvin + 2},
+                   "visibility": 16093, "wind": {"speed": 3.1, "deg": 230},
+                   "clouds": {"all": 1}, "dt": 1561982400,
+                   "sys": {"type": 1, "id": 4861, "country": "US"},
+                   "timezone": -18000, "id": 4887398, "name": "Chicago", "cod": 200}
+        return Reply(200, json.dumps(weather), {"Content-Type": "application/json"})
+    return etagged(route)
+
+
+def adafruit_io_time(request):
+    """A route answering like io.adafruit.com's strftime time service, in UTC, with the
+    format PyPortal asks for"""
+    # pylint: disable=unused-argument
+    now = emulator.clock.wall_time()
+    stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(int(now)))
+    day = time.gmtime(int(now))
+    text = "%s.%03d %03d %d +0000 UTC" % (stamp, int(now * 1000) % 1000, day.tm_yday,
+                                          day.tm_wday + 1)
+    return Reply(200, text, {"Content-Type": "text/plain"})
+
+
+class Server:
+    """The canned internet: routes by host and path prefix"""
+
+    def __init__(self):
+        self.routes = []
+        self.log = []       # (monotonic time, method, host + path, status)
+
+    def add(self, host, path, route):
+        """Answer requests to host for paths starting with path with route(request).
+        Routes added later are tried first."""
+        self.routes.insert(0, (host, path, route))
+
+    def knows(self, host):
+        """Whether there are any routes for host"""
+        return any(route_host == host for route_host, _, _ in self.routes)
+
+    def answer(self, request):
+        """The Reply to request"""
+        reply = None
+        for host, path, route in self.routes:
+            if host == request.host and request.path.startswith(path):
+                reply = route(request)
+                break
+        if reply is None:
+            reply = Reply(404, "Not Found")
+        self.log.append((emulator.clock.now, request.method, request.host + request.path,
+                         reply.status))
+        return reply
+
+
+def default_server():
+    """A Server with the services the clock uses"""
+    default = Server()
+    default.add("api.openweathermap.org", "/data/2.5/weather", openweathermap())
+    default.add("io.adafruit.com", "/api/v2/", adafruit_io_time)
+    return default
+
+
+server = default_server()
+
+
+class _Socket:
+    """One of the ESP32's sockets"""
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.sent = bytearray()
+        self.replies = []       # [time it arrives, bytes]
+        self.inbox = bytearray()
+        self.closing = False    # the server will hang up once the inbox is read
+
+
+class ESP_SPIcontrol:
+    """Takes the place of the real ``ESP_SPIcontrol``, taking the same arguments"""
+    # pylint: disable=too-many-public-methods,unused-argument
+    TCP_MODE = 0
+    UDP_MODE = 1
+    TLS_MODE = 2
+
+    def __init__(self, spi, cs_pin, ready_pin, reset_pin, gpio0_pin=None, *, debug=False,
+                 latency=0.05):
+        self._debug = debug
+        self.latency = latency
+        self.server = server
+        self._status = WL_IDLE_STATUS
+        self._sockets = {}
+        self._hosts = {}        # fake ip -> host name
+
+    def reset(self):
+        """Reset the ESP32: everything disconnects"""
+        self._status = WL_IDLE_STATUS
+        self._sockets = {}
+
+    @property
+    def status(self):
+        """The WiFi status"""
+        return self._status
+
+    @property
+    def firmware_version(self):
+        """The firmware version"""
+        return bytearray(b"1.4.0\x00")
+
+    @property
+    def MAC_address(self):
+        """The MAC address"""
+        return bytearray(b"\x11\x22\x33\x44\x55\x66")
+
+    @property
+    def is_connected(self):
+        """Whether we're connected to an access point"""
+        return self._status == WL_CONNECTED
+
+    def connect(self, secrets):
+        """Connect to the access point in secrets"""
+        self.connect_AP(secrets["ssid"], secrets["password"])
+
+    def connect_AP(self, ssid, password):
+        """Connect to an access point, which always works"""
+        emulator.clock.advance(1.0)
+        self._status = WL_CONNECTED
+        return self._status
+
+    @property
+    def ip_address(self):
+        """Our IP address"""
+        return bytearray(b"\xc0\xa8\x01\x17")
+
+    @property
+    def network_data(self):
+        """Our IP address, netmask and gateway"""
+        return {"ip_addr": self.ip_address, "netmask": bytearray(b"\xff\xff\xff\x00"),
+                "gateway": bytearray(b"\xc0\xa8\x01\x01")}
+
+    @property
+    def ssid(self):
+        """The access point we're connected to"""
+        return bytearray(b"host")
+
+    @property
+    def rssi(self):
+        """The signal strength"""
+        return -50
+
+    def scan_networks(self):
+        """The access points around, of which there's just the one"""
+        return [{"ssid": b"host", "bssid": self.MAC_address, "rssi": -50, "channel": 6,
+                 "encryption": 4}]
+
+    def pretty_ip(self, ip):        # pylint: disable=no-self-use
+        """A bytearray IP address as a dotted quad"""
+        return "%d.%d.%d.%d" % (ip[0], ip[1], ip[2], ip[3])
+
+    def unpretty_ip(self, ip):      # pylint: disable=no-self-use
+        """A dotted quad as a bytearray IP address"""
+        return bytes(int(x) for x in ip.split("."))
+
+    def get_host_by_name(self, hostname):
+        """The made up address of a host there are routes for"""
+        if isinstance(hostname, (bytes, bytearray)):
+            hostname = str(hostname, "utf-8")
+        if not self.server.knows(hostname):
+            raise RuntimeError("Failed to request hostname")
+        address = bytearray(b"\x0a" + zlib.crc32(hostname.encode("utf-8")).to_bytes(4, "big")[1:])
+        self._hosts[bytes(address)] = hostname
+        return address
+
+    def ping(self, dest, ttl=250):
+        """The round trip time to dest, in ms"""
+        return int(self.latency * 1000)
+
+    def get_socket(self):
+        """A free socket number"""
+        for number in range(4):
+            if number not in self._sockets:
+                self._sockets[number] = None
+                return number
+        raise RuntimeError("No sockets available")
+
+    def socket_open(self, socket_num, dest, port, conn_mode=TCP_MODE):
+        """Connect socket_num to dest, an IP address or (for TLS) a host name"""
+        if isinstance(dest, str):
+            host = dest
+        else:
+            host = self._hosts.get(bytes(dest))
+        if host is None or not self.server.knows(host):
+            raise RuntimeError("Could not connect to remote server")
+        self._sockets[socket_num] = _Socket(host, port)
+
+    def socket_connect(self, socket_num, dest, port, conn_mode=TCP_MODE):
+        """Open a socket and check it connected"""
+        self.socket_open(socket_num, dest, port, conn_mode)
+        return True
+
+    def _arrived(self, sock):
+        """Move replies that have arrived by now into the inbox"""
+        while sock.replies and sock.replies[0][0] <= emulator.clock.now:
+            sock.inbox += sock.replies.pop(0)[1]
+
+    def socket_status(self, socket_num):
+        """SOCKET_ESTABLISHED, SOCKET_CLOSE_WAIT once the server has hung up, or
+        SOCKET_CLOSED"""
+        sock = self._sockets.get(socket_num)
+        if sock is None:
+            return SOCKET_CLOSED
+        self._arrived(sock)
+        if sock.closing and not sock.replies and not sock.inbox:
+            return SOCKET_CLOSE_WAIT
+        return SOCKET_ESTABLISHED
+
+    def socket_connected(self, socket_num):
+        """Whether the socket's still connected"""
+        return self.socket_status(socket_num) == SOCKET_ESTABLISHED
+
+    def socket_write(self, socket_num, buffer):
+        """Send buffer, answering any requests it completes"""
+        sock = self._sockets.get(socket_num)
+        if sock is None or sock.closing:
+            raise RuntimeError("Failed to send %d bytes (sent 0)" % len(buffer))
+        sock.sent += buffer
+        while True:
+            request = self._take_request(sock)
+            if request is None:
+                break
+            reply = self.server.answer(request)
+            sock.replies.append([emulator.clock.now + self.latency, reply.encode(request)])
+            if not _keep_alive(request):
+                sock.closing = True
+
+    @staticmethod
+    def _take_request(sock):
+        """The first complete request sent on sock, if there is one"""
+        end = sock.sent.find(b"\r\n\r\n")
+        if end < 0:
+            return None
+        lines = bytes(sock.sent[:end]).decode("utf-8").split("\r\n")
+        method, path, version = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        if len(sock.sent) < end + 4 + length:
+            return None
+        body = bytes(sock.sent[end + 4:end + 4 + length])
+        sock.sent[:end + 4 + length] = b""
+        host = headers.get("host", sock.host).split(":")[0]
+        return Request(method, path, version, headers, body, host, sock.port)
+
+    def socket_available(self, socket_num):
+        """How many bytes are waiting"""
+        sock = self._sockets.get(socket_num)
+        if sock is None:
+            return 0
+        self._arrived(sock)
+        return min(len(sock.inbox), 4000)
+
+    def socket_read(self, socket_num, size):
+        """Up to size bytes that have arrived"""
+        sock = self._sockets.get(socket_num)
+        if sock is None:
+            return b""
+        self._arrived(sock)
+        data = bytes(sock.inbox[:size])
+        sock.inbox[:size] = b""
+        return data
+
+    def socket_readinto(self, socket_num, buffer):
+        """Read what's arrived into buffer, returning how much"""
+        data = self.socket_read(socket_num, len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def socket_close(self, socket_num):
+        """Close the socket"""
+        self._sockets.pop(socket_num, None)
+
+    def set_esp_debug(self, enabled):
+        """Nothing to debug"""
+
+    def set_pin_mode(self, pin, mode):
+        """The ESP32's own pins aren't emulated"""
+
+    def set_digital_write(self, pin, value):
+        """The ESP32's own pins aren't emulated"""
+
+    def set_analog_write(self, pin, analog_value):
+        """The ESP32's own pins aren't emulated"""
@@ -0,0 +1,173 @@
+"""
+An ESP32 running the NINA firmware, on the far end of an SPI bus, for running the
+real ``adafruit_esp32spi.ESP_SPIcontrol`` without the board. Unlike `fake_esp`, which
+stands in for the whole of ``ESP_SPIcontrol``, this answers the command packets the
+driver sends, so the driver's own packing, parsing and chunking all run.
+
+Every socket answers a complete HTTP request with the same ``reply`` bytes, and
+``transactions`` counts the commands sent, the number that matters on the board,
+where each one waits on the ESP32 to be ready.
+
+    spi, pins = fake_nina.bus(reply)
+    esp = ESP_SPIcontrol(spi, *pins)
+
+Licensed under the MIT license.
+"""
+
+import struct
+
+_START = 0xE0
+_END = 0xEE
+_REPLY = 0x80
+_ESTABLISHED = 4
+# commands that send parameters with 16 bit lengths
+_LONG_PARAMS = (0x44, 0x45)
+_GET_DATABUF = 0x45
+
+
+class Pin:
+    """A pin the driver drives, which nothing listens to"""
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.direction = None
+        self.value = True
+
+    def switch_to_output(self, value=False, **kwargs):
+        """Drive the pin"""
+        # pylint: disable=unused-argument
+        self.value = value
+
+
+class ReadyPin:
+    """The ESP32's busy line. The driver reads it low before selecting the ESP32 and
+    high once it has, so it flips on every read"""
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.direction = None
+        self._high = True
+
+    @property
+    def value(self):
+        """The level on the pin"""
+        self._high = not self._high
+        return self._high
+
+
+class NINA:
+    """The SPI bus with an ESP32 on it, answering every HTTP request with reply"""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.transactions = 0
+        self._sent = {}         # socket number -> request bytes so far
+        self._pending = {}      # socket number -> view of the reply bytes not yet read
+        self._out = b""         # the reply to the last command
+        self._read = 0
+
+    def try_lock(self):     # pylint: disable=no-self-use
+        """Take the bus"""
+        return True
+
+    def unlock(self):
+        """Give the bus back"""
+
+    def configure(self, **kwargs):
+        """Set the bus speed and mode"""
+
+    def write(self, buffer, *, start=0, end=None):
+        """Take a command packet from the driver, and get the reply to it ready"""
+        packet = bytes(buffer[start:end])
+        if packet[0] != _START:
+            raise ValueError("Not a command: %r" % packet[:4])
+        cmd = packet[1]
+        params = []
+        i = 3
+        for _ in range(packet[2]):
+            if cmd in _LONG_PARAMS:
+                length = (packet[i] << 8) | packet[i + 1]
+                i += 2
+            else:
+                length = packet[i]
+                i += 1
+            params.append(packet[i:i + length])
+            i += length
+        if packet[i] != _END:
+            raise ValueError("Command %02X doesn't end properly" % cmd)
+        self.transactions += 1
+        self._out = self._answer(cmd, params)
+        self._read = 0
+
+    def readinto(self, buffer, *, start=0, end=None, write_value=0):
+        """Read back the reply to the last command, then the idle level of the bus"""
+        # pylint: disable=unused-argument
+        if end is None:
+            end = len(buffer)
+        count = min(end - start, len(self._out) - self._read)
+        buffer[start:start + count] = self._out[self._read:self._read + count]
+        self._read += count
+        for i in range(start + count, end):
+            buffer[i] = 0xFF
+
+    def _answer(self, cmd, params):
+        """The bytes the ESP32 answers cmd with"""
+        # pylint: disable=too-many-return-statements
+        if cmd == 0x3F:                         # get a socket
+            socket = min(set(range(len(self._sent) + 1)) - set(self._sent))
+            self._sent[socket] = b""
+            return self._packet(cmd, (bytes((socket,)),))
+        if cmd == 0x2D:                         # connect
+            socket = params[-2][0]
+            self._sent[socket] = b""
+            self._pending[socket] = b""
+            return self._packet(cmd, (b"\x01",))
+        if cmd == 0x2F:                         # connection state
+            return self._packet(cmd, (bytes((_ESTABLISHED,)),))
+        if cmd == 0x44:                         # send
+            socket = params[0][0]
+            self._sent[socket] += params[1]
+            if self._sent[socket].endswith(b"\r\n\r\n"):
+                self._sent[socket] = b""
+                if self._pending[socket]:
+                    self._pending[socket] = memoryview(bytes(self._pending[socket]) + self.reply)
+                else:
+                    self._pending[socket] = memoryview(self.reply)
+            return self._packet(cmd, (bytes((len(params[1]),)),))
+        if cmd == 0x2B:                         # how much has arrived
+            available = min(len(self._pending[params[0][0]]), 0xFFFF)
+            return self._packet(cmd, (struct.pack("<H", available),))
+        if cmd == _GET_DATABUF:
+            socket = params[0][0]
+            size = params[1][0] | (params[1][1] << 8)
+            data = self._pending[socket][:size]
+            self._pending[socket] = self._pending[socket][size:]
+            return self._packet(cmd, (data,))
+        if cmd == 0x2E:                         # close
+            self._sent.pop(params[0][0], None)
+            self._pending.pop(params[0][0], None)
+            return self._packet(cmd, (b"\x01",))
+        if cmd == 0x35:                         # the address looked up
+            return self._packet(cmd, (b"\x0a\x00\x00\x01",))
+        if cmd == 0x20:                         # wifi status
+            return self._packet(cmd, (b"\x03",))
+        # sent, look up and the rest just say they worked
+        return self._packet(cmd, (b"\x01",))
+
+    @staticmethod
+    def _packet(cmd, params):
+        out = bytearray((_START, cmd | _REPLY, len(params)))
+        for param in params:
+            if cmd == _GET_DATABUF:
+                out += struct.pack(">H", len(param))
+            else:
+                out.append(len(param))
+            out += param
+        out.append(_END)
+        return bytes(out)
+
+
+def bus(reply):
+    """The `NINA` answering with reply, and the chip select, ready and reset pins to
+    make an ``ESP_SPIcontrol`` on it with"""
+    return NINA(reply), (Pin(), ReadyPin(), Pin())
@@ -0,0 +1,25 @@
+"""
+Host stand-in for ``microcontroller``.
+
+Licensed under the MIT license.
+"""
+
+import emulator
+
+
+class _Processor:
+    """The processor"""
+    # pylint: disable=too-few-public-methods
+    frequency = 120000000
+    temperature = 25.0
+    voltage = 3.3
+    uid = b"host"
+
+
+cpu = _Processor()
+nvm = bytearray(8192)
+
+
+def reset():
+    """Restart the board. On the host that ends the run."""
+    raise emulator.EmulationOver("microcontroller.reset()")
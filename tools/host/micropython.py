@@ -0,0 +1,10 @@
+"""
+Host stand-in for ``micropython``.
+
+Licensed under the MIT license.
+"""
+
+
+def const(value):
+    """A constant, which only the firmware's compiler does anything special with"""
+    return value
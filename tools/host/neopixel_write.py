@@ -0,0 +1,13 @@
+"""
+Host stand-in for ``neopixel_write``: the last bytes sent out of each pin (the
+``DigitalInOut`` it was sent through) are kept in ``pixels``.
+
+Licensed under the MIT license.
+"""
+
+pixels = {}
+
+
+def neopixel_write(pin, buffer):
+    """Send the pixel data in buffer out of pin"""
+    pixels[pin] = bytes(buffer)
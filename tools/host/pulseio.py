@@ -0,0 +1,19 @@
+"""
+Host stand-in for ``pulseio``.
+
+Licensed under the MIT license.
+"""
+
+
+class PWMOut:
+    """A PWM output, e.g. the backlight"""
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, pin, *, duty_cycle=0, frequency=500, variable_frequency=False):
+        # pylint: disable=unused-argument
+        self.pin = pin
+        self.duty_cycle = duty_cycle
+        self.frequency = frequency
+
+    def deinit(self):
+        """Let go of the pin"""
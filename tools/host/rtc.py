@@ -0,0 +1,28 @@
+"""
+Host stand-in for ``rtc``: setting the time sets ``emulator.clock``.
+
+Licensed under the MIT license.
+"""
+
+import time
+
+import emulator
+
+
+class RTC:
+    """The board's real time clock"""
+    # pylint: disable=too-few-public-methods
+
+    @property
+    def datetime(self):
+        """The time, as a ``time.struct_time``"""
+        return time.localtime()
+
+    @datetime.setter
+    def datetime(self, value):
+        emulator.clock.set_time(time.mktime(value))
+
+
+def set_time_source(source):
+    """Where ``time.time()`` comes from, which on the host is always the RTC"""
+    # pylint: disable=unused-argument
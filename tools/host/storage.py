@@ -0,0 +1,37 @@
+"""
+Host stand-in for ``storage``. The drive is always writable, and mounts are only
+remembered.
+
+Licensed under the MIT license.
+"""
+
+_mounts = {}
+
+
+class VfsFat:
+    """A FAT filesystem on a block device"""
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, block_device):
+        self.block_device = block_device
+
+
+def mount(filesystem, mount_path, *, readonly=False):
+    """Mount filesystem at mount_path"""
+    # pylint: disable=unused-argument
+    _mounts[mount_path] = filesystem
+
+
+def umount(mount):
+    """Unmount what's at mount"""
+    _mounts.pop(mount, None)
+
+
+def remount(mount_path, readonly=False):
+    """Change whether the drive is read only, which on the host it never is"""
+    # pylint: disable=unused-argument
+
+
+def getmount(mount_path):
+    """What's mounted at mount_path"""
+    return _mounts[mount_path]
@@ -0,0 +1,30 @@
+"""
+Host stand-in for ``supervisor``.
+
+Licensed under the MIT license.
+"""
+
+import emulator
+
+
+class _Runtime:
+    """What the supervisor knows about how we're running"""
+    # pylint: disable=too-few-public-methods
+    serial_connected = True
+    serial_bytes_available = False
+
+
+runtime = _Runtime()
+
+
+def reload():
+    """Restart code.py. On the host that ends the run."""
+    raise emulator.EmulationOver("supervisor.reload()")
+
+
+def enable_autoreload():
+    """Nothing reloads on the host"""
+
+
+def disable_autoreload():
+    """Nothing reloads on the host"""
@@ -0,0 +1,157 @@
+"""
+Run code.py on your computer, with the stand-ins in ``tools/host`` in place of
+the PyPortal's hardware:
+
+    python3 tools/run_on_host.py --seconds 3600 --screenshot clock.ppm
+
+Time is virtual, so an hour of the clock takes as long as the work in it, and two
+runs with the same options do the same thing. Web requests are answered from
+canned replies (see ``tools/host/fake_esp.py``). The files code.py uses are copied
+to a scratch directory that stands in for the CIRCUITPY drive and is deleted
+afterwards, unless you give a directory to use with ``--drive``.
+
+Licensed under the MIT license.
+"""
+
+import argparse
+import os
+import runpy
+import shutil
+import sys
+import tempfile
+import time
+
+TOOLS = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(TOOLS)
+HOST = os.path.join(TOOLS, "host")
+
+
+def make_drive():
+    """A scratch copy of the files on the CIRCUITPY drive, without the libraries"""
+    root = tempfile.mkdtemp(prefix="circuitpy-")
+    for name in os.listdir(REPO):
+        if name in ("lib", "tools", "__pycache__") or name.startswith(".") or \
+           name.endswith(".jsonl"):
+            continue
+        source = os.path.join(REPO, name)
+        if os.path.isdir(source):
+            shutil.copytree(source, os.path.join(root, name))
+        else:
+            shutil.copy(source, root)
+    return root
+
+
+def load_secrets(root):
+    """The secrets module, from secrets.py on the drive or else secrets.example"""
+    for name in ("secrets.py", "secrets.example"):
+        path = os.path.join(root, name)
+        if os.path.exists(path):
+            break
+    module = type(sys)("secrets")
+    with open(path) as file:
+        exec(file.read(), module.__dict__)     # pylint: disable=exec-used
+    module.secrets.setdefault("timezone", "UTC")
+    sys.modules["secrets"] = module
+
+
+def parse_touch(text):
+    """start,end,x,y[,x2,y2] as a touch for emulator.TouchPanel.script"""
+    values = [float(value) for value in text.split(",")]
+    if len(values) == 4:
+        values += values[2:4]
+    if len(values) != 6:
+        raise argparse.ArgumentTypeError("expected start,end,x,y[,x2,y2]")
+    return tuple(values)
+
+
+def main():
+    """Run code.py until the virtual time is up"""
+    # pylint: disable=too-many-locals,too-many-statements
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=600,
+                        help="how many seconds of virtual time to run for")
+    parser.add_argument("--start", type=float, default=1561982400,
+                        help="the wall clock time to start at, in seconds since the epoch")
+    parser.add_argument("--drift", type=float, default=0.0,
+                        help="how much fast the board's clock runs, e.g. 50e-6")
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="seconds before a web request is answered")
+    parser.add_argument("--drive", help="a directory to use as the CIRCUITPY drive")
+    parser.add_argument("--light", type=int, default=1500, help="the light sensor reading")
+    parser.add_argument("--touch", type=parse_touch, action="append", default=[],
+                        metavar="START,END,X,Y[,X2,Y2]",
+                        help="touch the screen from START to END seconds (monotonic "
+                             "time, which starts at 10), sliding to X2,Y2 if given")
+    parser.add_argument("--weather", default="01d,293.15", metavar="ICON,KELVIN",
+                        help="what the weather service says")
+    parser.add_argument("--frames", help="save every refresh as a PPM image in this directory")
+    parser.add_argument("--screenshot", help="save the display at the end as a PPM image")
+    parser.add_argument("--memory", type=int, metavar="BYTES",
+                        help="trace allocations, and report gc.mem_free() as if the heap "
+                             "was this big")
+    args = parser.parse_args()
+
+    root = os.path.abspath(args.drive) if args.drive else make_drive()
+    here = os.getcwd()
+    frames = args.frames and os.path.abspath(args.frames)
+    screenshot = args.screenshot and os.path.abspath(args.screenshot)
+    sys.path[:0] = [HOST, os.path.join(REPO, "lib")]
+    import emulator                 # pylint: disable=import-outside-toplevel
+    emulator.clock = emulator.Clock(wall=args.start - 10.0, drift=args.drift)
+    emulator.clock.end = emulator.clock.now + args.seconds
+    emulator.light = args.light
+    emulator.touch.script(args.touch)
+    load_secrets(root)
+    outputs = tuple(os.path.dirname(path) for path in (screenshot, frames) if path)
+    emulator.Drive(root, host_paths=(REPO, here) + outputs).install()
+    emulator.clock.install()
+
+    import gc                       # pylint: disable=import-outside-toplevel
+    if args.memory:
+        import tracemalloc          # pylint: disable=import-outside-toplevel
+        tracemalloc.start()
+        gc.mem_free = lambda: args.memory - tracemalloc.get_traced_memory()[0]
+        gc.mem_alloc = lambda: tracemalloc.get_traced_memory()[0]
+
+    import fake_esp                 # pylint: disable=import-outside-toplevel
+    from adafruit_esp32spi import adafruit_esp32spi  # pylint: disable=import-outside-toplevel
+    icon, kelvin = args.weather.split(",")
+    fake_esp.server.add("api.openweathermap.org", "/data/2.5/weather",
+                        fake_esp.openweathermap(icon, float(kelvin)))
+    adafruit_esp32spi.ESP_SPIcontrol = lambda *pins, **kwargs: fake_esp.ESP_SPIcontrol(
+        *pins, latency=args.latency, **kwargs)
+
+    import board                    # pylint: disable=import-outside-toplevel
+    if frames:
+        os.makedirs(frames, exist_ok=True)
+        board.DISPLAY.on_refresh = lambda display: display.save(
+            os.path.join(frames, "%09.3f.ppm" % emulator.clock.now))
+
+    started = time.perf_counter()
+    ended = "the end of code.py"
+    try:
+        runpy.run_path(os.path.join(root, "code.py"), run_name="__main__")
+    except emulator.EmulationOver as reason:
+        ended = str(reason)
+    host_seconds = time.perf_counter() - started
+
+    if screenshot:
+        board.DISPLAY.save(screenshot)
+    import audioio                  # pylint: disable=import-outside-toplevel
+    print()
+    print("Ran until %s, in %0.2f seconds on this computer" % (ended, host_seconds))
+    print("Display refreshes: %d" % board.DISPLAY.refreshes)
+    print("Slept: %0.1f seconds" % emulator.clock.slept)
+    print("Sounds played: %d" % len(audioio.played))
+    print("Web requests:")
+    for when, method, url, status in fake_esp.server.log:
+        print("  %10.3f %s %s -> %d" % (when, method, url, status))
+    if args.memory:
+        print("Peak traced memory: %d bytes" % tracemalloc.get_traced_memory()[1])
+    if not args.drive:
+        os.chdir(here)
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()